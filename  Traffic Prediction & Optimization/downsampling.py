@@ -0,0 +1,143 @@
+"""
+Downsampling langer Zeitreihen für die Darstellung.
+
+Ein Diagramm kann nicht mehr Punkte zeigen, als es Pixel breit ist. Statt
+jahrelange Stundenwerte komplett an den Browser zu schicken, wird pro Reihe
+einmal eine Auflösungspyramide vorberechnet (Min/Max je Bucket, damit
+Spitzen erhalten bleiben). Für einen Ausschnitt wird die feinste Ebene
+gewählt, die noch wenige Punkte liefert, und per LTTB
+(Largest-Triangle-Three-Buckets) auf die gewünschte Punktzahl reduziert.
+
+Benchmark::
+
+    python downsampling.py --points 2000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def minmax_indices(y, n_buckets):
+    """Indizes von Minimum und Maximum je Bucket (vollständig vektorisiert, ≤ 2 Punkte pro Bucket)."""
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+    size = n // n_buckets
+    body = np.asarray(y[: size * n_buckets]).reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    idx = np.concatenate([offsets + body.argmin(axis=1), offsets + body.argmax(axis=1), [n - 1]])
+    if size * n_buckets < n:
+        tail = np.asarray(y[size * n_buckets:])
+        idx = np.concatenate([idx, size * n_buckets + np.array([tail.argmin(), tail.argmax()])])
+    return np.unique(idx)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: wählt `n_out` Punkte, die die Form erhalten.
+
+    Erster und letzter Punkt bleiben immer erhalten. Die Bucket-Mittelwerte
+    werden vorab mit `np.add.reduceat` berechnet; die Schleife läuft nur
+    über die Buckets, nicht über die Punkte.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _as_float(x)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(np.append(edges, n - 1))
+    valid = counts > 0
+    sums_x = np.add.reduceat(x, edges[valid]) if valid.any() else np.empty(0)
+    sums_y = np.add.reduceat(y, edges[valid]) if valid.any() else np.empty(0)
+    mean_x = np.full(len(edges), x[-1])
+    mean_y = np.full(len(edges), y[-1])
+    mean_x[valid] = sums_x / counts[valid]
+    mean_y[valid] = sums_y / counts[valid]
+
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+        # Mittelwert des nächsten Buckets (beim letzten Bucket: der letzte Punkt)
+        cx, cy = (mean_x[i + 1], mean_y[i + 1]) if i + 2 < len(edges) else (x[-1], y[-1])
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+
+class SeriesPyramid:
+    """
+    Mehrstufige Min/Max-Pyramide einer Zeitreihe.
+
+    Ebene 0 sind die Rohdaten, jede weitere Ebene hat etwa `factor`-mal
+    weniger Punkte. `query()` liefert Indizes in die Rohdaten.
+    """
+
+    def __init__(self, x, y, factor=4, min_points=1000):
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        self._xf = _as_float(self.x)
+        self.levels = [np.arange(len(self.y))]
+        while len(self.levels[-1]) > min_points * factor:
+            prev = self.levels[-1]
+            self.levels.append(prev[minmax_indices(self.y[prev], len(prev) // (2 * factor))])
+        # Zeitachsen je Ebene vorhalten, damit `query` nur noch binär sucht
+        self._level_x = [self._xf] + [self._xf[level] for level in self.levels[1:]]
+
+    def query(self, x_min=None, x_max=None, n_points=1500, oversample=4):
+        """Indizes für den Ausschnitt [x_min, x_max] mit höchstens `n_points` Punkten."""
+        lo_val = self._xf[0] if x_min is None else _as_float(np.array([x_min], dtype=self.x.dtype))[0]
+        hi_val = self._xf[-1] if x_max is None else _as_float(np.array([x_max], dtype=self.x.dtype))[0]
+        for level, xs in zip(self.levels, self._level_x):
+            lo, hi = np.searchsorted(xs, lo_val, "left"), np.searchsorted(xs, hi_val, "right")
+            if hi - lo <= n_points * oversample or level is self.levels[-1]:
+                # Nachbarpunkte außerhalb mitnehmen, damit die Linie bis an den Rand reicht
+                sel = level[max(lo - 1, 0):min(hi + 1, len(level))]
+                break
+        if len(sel) > n_points:
+            sel = sel[lttb_indices(self._xf[sel], self.y[sel], n_points)]
+        return sel
+
+    @property
+    def nbytes(self):
+        return sum(level.nbytes + xs.nbytes for level, xs in zip(self.levels[1:], self._level_x[1:]))
+
+
+def benchmark(n_points=2_000_000, width=1500):
+    rng = np.random.default_rng(0)
+    x = np.datetime64("2000-01-01T00", "h") + np.arange(n_points)
+    t = np.arange(n_points)
+    y = 50 + 30 * np.sin(t * 2 * np.pi / 24) + 10 * np.sin(t * 2 * np.pi / 168) + rng.normal(0, 5, n_points)
+
+    t0 = time.perf_counter()
+    pyramid = SeriesPyramid(x, y)
+    print(f"{n_points:,} Punkte, Pyramide mit {len(pyramid.levels)} Ebenen in "
+          f"{1000 * (time.perf_counter() - t0):.0f} ms ({pyramid.nbytes / 1024 ** 2:.1f} MB Zusatzspeicher)")
+    for label, lo, hi in [("Gesamt", None, None), ("1 Jahr", x[-24 * 365], x[-1]),
+                          ("1 Woche", x[-168], x[-1])]:
+        t0 = time.perf_counter()
+        idx = pyramid.query(lo, hi, width)
+        print(f"{label:<8} -> {len(idx):>5} Punkte in {1000 * (time.perf_counter() - t0):6.1f} ms")
+    t0 = time.perf_counter()
+    lttb_indices(x, y, width)
+    print(f"Zum Vergleich: LTTB direkt auf allen Rohdaten {1000 * (time.perf_counter() - t0):.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Downsampling-Benchmark")
+    parser.add_argument("--points", type=int, default=2_000_000)
+    parser.add_argument("--width", type=int, default=1500)
+    args = parser.parse_args()
+    benchmark(args.points, args.width)
@@ -0,0 +1,211 @@
+"""
+Batch-Vorhersagen für viele Sensoren.
+
+Pro Sensor wird ein eigenes Modell angepasst. Die Fits laufen in einem
+Prozess-Pool; fertige Vorhersagen werden per Generator zurückgegeben, sobald
+sie vorliegen, damit die UI sie schrittweise anzeigen kann. Angepasste
+Modelle werden nach (Sensor, Modell, Hash des Datenfensters) gecacht — ein
+erneuter Aufruf mit unverändertem Fenster braucht keinen Fit.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+try:
+    from prophet import Prophet
+    from prophet.serialize import model_from_json, model_to_json
+
+    PROPHET_AVAILABLE = True
+except ImportError:
+    PROPHET_AVAILABLE = False
+
+from lag_models import BoostedLags, RidgeLags
+
+
+# ---------------------------------------------------------------------------
+# Modelle
+# ---------------------------------------------------------------------------
+
+class SeasonalBaseline:
+    """Mittelwert je Stunde des Tages."""
+
+    parallel = False  # Fit kostet weniger als das Pickeln in einen Worker-Prozess
+
+    def fit(self, ds, y):
+        hours = ds.hour.to_numpy()
+        counts = np.bincount(hours, minlength=24)
+        self.profile = np.bincount(hours, weights=y, minlength=24) / np.maximum(counts, 1)
+        self.last = ds[-1]
+        return self
+
+    def predict(self, horizon):
+        future = pd.date_range(self.last, periods=horizon + 1, freq="h")[1:]
+        return pd.DataFrame({"ds": future, "yhat": self.profile[future.hour.to_numpy()]})
+
+
+class FastSeasonal:
+    """
+    Wochenprofil (168 Stunden-Slots) plus abklingende Niveau-Korrektur.
+
+    Das Profil wird mit `np.bincount` in einem Durchlauf berechnet; die
+    mittlere Abweichung der letzten 24 Stunden wird in die Zukunft
+    fortgeschrieben und klingt mit `decay` pro Stunde ab.
+    """
+
+    parallel = False
+
+    def __init__(self, decay=0.95):
+        self.decay = decay
+
+    def fit(self, ds, y):
+        slots = (ds.dayofweek.to_numpy() * 24 + ds.hour.to_numpy())
+        counts = np.bincount(slots, minlength=168)
+        week = np.bincount(slots, weights=y, minlength=168) / np.maximum(counts, 1)
+        # Leere Slots (kurze Historie) mit dem Tagesprofil auffüllen
+        daily = SeasonalBaseline().fit(ds, y).profile
+        self.profile = np.where(counts > 0, week, np.tile(daily, 7))
+        self.level = float(np.mean((y - self.profile[slots])[-24:]))
+        self.last = ds[-1]
+        return self
+
+    def predict(self, horizon):
+        future = pd.date_range(self.last, periods=horizon + 1, freq="h")[1:]
+        slots = future.dayofweek.to_numpy() * 24 + future.hour.to_numpy()
+        correction = self.level * self.decay ** np.arange(1, horizon + 1)
+        return pd.DataFrame({"ds": future, "yhat": self.profile[slots] + correction})
+
+
+class ProphetModel:
+    """Prophet mit Tagessaisonalität; serialisiert sich als JSON (statt Pickle) für den Prozess-Pool."""
+
+    parallel = True
+
+    def fit(self, ds, y):
+        self.model = Prophet(yearly_seasonality=False, daily_seasonality=True)
+        self.model.fit(pd.DataFrame({"ds": ds, "y": y}))
+        return self
+
+    def predict(self, horizon):
+        future = self.model.make_future_dataframe(periods=horizon, freq="h")
+        return self.model.predict(future).tail(horizon)[["ds", "yhat"]].reset_index(drop=True)
+
+    def __getstate__(self):
+        return {"model": model_to_json(self.model)}
+
+    def __setstate__(self, state):
+        self.model = model_from_json(state["model"])
+
+
+MODELS = {
+    "Einfache Baseline": SeasonalBaseline,
+    "Saisonal (schnell)": FastSeasonal,
+    "Ridge (Lags)": RidgeLags,
+    "Gradient Boosting (Lags)": BoostedLags,
+}
+if PROPHET_AVAILABLE:
+    MODELS["Prophet"] = ProphetModel
+
+
+def data_hash(df):
+    """Stabiler Hash über Zeitstempel und Werte eines Datenfensters."""
+    h = hashlib.sha1()
+    h.update(np.ascontiguousarray(df["ds"].to_numpy(dtype="datetime64[ns]")).tobytes())
+    h.update(np.ascontiguousarray(df["y"].to_numpy(dtype=np.float64)).tobytes())
+    return h.hexdigest()
+
+
+def fit_model(model_name, df):
+    """Passt ein Modell an einen Sensor-Datensatz an (läuft im Worker-Prozess)."""
+    ds = pd.DatetimeIndex(df["ds"])
+    return MODELS[model_name]().fit(ds, df["y"].to_numpy(dtype=np.float64))
+
+
+def _fit_and_predict(sensor, model_name, df, horizon):
+    model = fit_model(model_name, df)
+    return sensor, model, model.predict(horizon)
+
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+
+class ForecastEngine:
+    """
+    Verteilt Fits über einen Prozess-Pool und cacht angepasste Modelle.
+
+    Der Pool wird beim ersten Bedarf gestartet und wiederverwendet; die
+    Engine ist daher für `st.cache_resource` gedacht. Modelle mit
+    `parallel = False` (billige Fits) laufen immer im eigenen Prozess.
+    """
+
+    def __init__(self, max_workers=None, max_models=512):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_models = max_models
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def cached_model(self, sensor, model_name, key):
+        with self._lock:
+            model = self._models.get((sensor, model_name, key))
+            if model is not None:
+                self._models.move_to_end((sensor, model_name, key))
+            return model
+
+    def _store(self, sensor, model_name, key, model):
+        with self._lock:
+            self._models[(sensor, model_name, key)] = model
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+
+    def forecast_many(self, frames, model_name, horizon):
+        """
+        Vorhersagen für mehrere Sensoren.
+
+        `frames` bildet Sensor-IDs auf DataFrames mit `ds`/`y` ab. Liefert
+        `(sensor, forecast_df, from_cache)` in Fertigstellungs-Reihenfolge.
+        """
+        todo = []
+        for sensor, df in frames.items():
+            key = data_hash(df)
+            model = self.cached_model(sensor, model_name, key)
+            if model is not None:
+                yield sensor, model.predict(horizon), True
+            else:
+                todo.append((sensor, key, df))
+
+        # Einzelne oder sehr billige Fits lohnen den Prozess-Overhead nicht
+        if len(todo) <= 1 or self.max_workers == 1 or not MODELS[model_name].parallel:
+            for sensor, key, df in todo:
+                _, model, forecast = _fit_and_predict(sensor, model_name, df, horizon)
+                self._store(sensor, model_name, key, model)
+                yield sensor, forecast, False
+            return
+
+        keys = {sensor: key for sensor, key, _ in todo}
+        futures = [self._executor().submit(_fit_and_predict, sensor, model_name, df[["ds", "y"]], horizon)
+                   for sensor, _, df in todo]
+        for future in as_completed(futures):
+            sensor, model, forecast = future.result()
+            self._store(sensor, model_name, keys[sensor], model)
+            yield sensor, forecast, False
+
+    def forecast(self, df, model_name, horizon, sensor="default"):
+        """Vorhersage für eine einzelne Zeitreihe."""
+        return next(self.forecast_many({sensor: df}, model_name, horizon))[1]
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
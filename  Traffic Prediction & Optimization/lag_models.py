@@ -0,0 +1,204 @@
+"""
+Schnelle Vorhersagemodelle auf Lag- und Rolling-Window-Features.
+
+Alle Features für Zielstunde t stammen aus Werten, die mindestens `offset`
+(Standard: 24) Stunden zurückliegen. Damit lassen sich die nächsten 24
+Stunden direkt — ohne rekursives Einsetzen eigener Vorhersagen — in einem
+vektorisierten Schritt vorhersagen, und ein Walk-Forward-Backtest braucht
+pro Fold genau einen Fit.
+
+Die Lag-Spalten werden aus einer `sliding_window_view` (kein Kopieren)
+gelesen und spaltenweise direkt in eine vorallokierte Design-Matrix
+geschrieben; Rolling-Mittel kommen aus einer kumulierten Summe.
+
+Modellvergleich mit Walk-Forward-Backtest::
+
+    python lag_models.py --days 120
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.linear_model import Ridge
+
+DEFAULT_LAGS = (24, 25, 26, 48, 72, 168)
+DEFAULT_WINDOWS = (24, 168)
+# Mindestzahl an Trainingszeilen (Zielstunden mit vollständigen Features) für einen Fit
+MIN_FIT_ROWS = 24
+
+
+def lag_features(y, hours, weekend, lags=DEFAULT_LAGS, windows=DEFAULT_WINDOWS, offset=24):
+    """
+    Design-Matrix für alle Zielstunden t in [max_back, len(y) + offset).
+
+    `hours`/`weekend` beschreiben genau diese Zielstunden (inkl. der
+    `offset` Stunden nach dem letzten Wert). Gibt (X, max_back) zurück.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    max_back = max(max(lags), offset + max(windows) - 1)
+    window_len = max_back - offset + 1
+    # W[j] = y[j : j + window_len]; Zielstunde t = j + max_back, Lag k liegt in Spalte max_back - k
+    W = sliding_window_view(y, window_len)
+    n_rows = W.shape[0]
+    if len(hours) != n_rows:
+        raise ValueError(f"{n_rows} Zielstunden erwartet, {len(hours)} Kalendereinträge erhalten")
+
+    X = np.zeros((n_rows, len(lags) + len(windows) + 25))
+    for c, k in enumerate(lags):
+        X[:, c] = W[:, max_back - k]
+    csum = np.concatenate([[0.0], np.cumsum(y)])
+    end = np.arange(n_rows) + window_len  # exklusives Ende = t - offset + 1
+    for c, w in enumerate(windows, start=len(lags)):
+        X[:, c] = (csum[end] - csum[end - w]) / w
+    base = len(lags) + len(windows)
+    X[np.arange(n_rows), base + np.asarray(hours)] = 1.0
+    X[:, -1] = weekend
+    return X, max_back
+
+
+class LagRegressor:
+    """
+    Direktes 24h-Modell auf Lag-Features (Ridge oder Histogram-Gradient-Boosting).
+
+    Schnittstelle wie die Modelle in `forecasting.py`: `fit(ds, y)` und
+    `predict(horizon)`. Horizonte > `offset` werden blockweise vorhergesagt,
+    wobei jeder Block die Vorhersagen des vorherigen als Historie nutzt.
+    Braucht mindestens `min_history` Stunden Historie (`offset` +
+    `MIN_FIT_ROWS`), sonst wirft `fit` einen ValueError.
+    """
+
+    parallel = True  # Fit teuer genug für den Prozess-Pool (siehe ForecastEngine)
+
+    def __init__(self, estimator="ridge", lags=DEFAULT_LAGS, windows=DEFAULT_WINDOWS, offset=24):
+        self.estimator = estimator
+        self.lags = lags
+        self.windows = windows
+        self.offset = offset
+
+    @property
+    def min_history(self):
+        return self.offset + MIN_FIT_ROWS
+
+    def _make_estimator(self):
+        if self.estimator == "ridge":
+            return Ridge(alpha=1.0)
+        return HistGradientBoostingRegressor(max_iter=200, learning_rate=0.1, max_leaf_nodes=31,
+                                             early_stopping=False, random_state=0)
+
+    @staticmethod
+    def _calendar(ds):
+        return ds.hour.to_numpy(), (ds.dayofweek.to_numpy() >= 5).astype(float)
+
+    def fit(self, ds, y):
+        ds = pd.DatetimeIndex(ds)
+        y = np.asarray(y, dtype=np.float64)
+        if len(y) < self.min_history:
+            raise ValueError(f"{len(y)} Stunden Historie sind zu wenig für ein Lag-Modell "
+                             f"(mindestens {self.min_history})")
+        # Kurze Historien: zu lange Lags/Fenster weglassen
+        self.lags_ = tuple(k for k in self.lags if k <= len(y) // 2) or (self.offset,)
+        self.windows_ = tuple(w for w in self.windows if self.offset + w <= len(y) // 2) or (1,)
+        self.max_back = max(max(self.lags_), self.offset + max(self.windows_) - 1)
+        future = pd.date_range(ds[-1], periods=self.offset + 1, freq="h")[1:]
+        hours, weekend = self._calendar(ds.append(future)[self.max_back:])
+        X, _ = lag_features(y, hours, weekend, self.lags_, self.windows_, self.offset)
+        self.model = self._make_estimator().fit(X[:len(y) - self.max_back], y[self.max_back:])
+        self.history = y[-self.max_back:].copy()
+        self.last = ds[-1]
+        return self
+
+    def predict(self, horizon):
+        history = self.history
+        last = self.last
+        preds = []
+        for _ in range(int(np.ceil(horizon / self.offset))):
+            future = pd.date_range(last, periods=self.offset + 1, freq="h")[1:]
+            X, _ = lag_features(history, *self._calendar(future), self.lags_, self.windows_, self.offset)
+            block = self.model.predict(X)
+            preds.append(block)
+            history = np.concatenate([history, block])[-self.max_back:]
+            last = future[-1]
+        future = pd.date_range(self.last, periods=horizon + 1, freq="h")[1:]
+        return pd.DataFrame({"ds": future, "yhat": np.concatenate(preds)[:horizon]})
+
+
+class RidgeLags(LagRegressor):
+    def __init__(self):
+        super().__init__("ridge")
+
+
+class BoostedLags(LagRegressor):
+    def __init__(self):
+        super().__init__("hgb")
+
+
+# ---------------------------------------------------------------------------
+# Walk-Forward-Backtest
+# ---------------------------------------------------------------------------
+
+def walk_forward(model_factory, df, start, horizon=24):
+    """
+    Walk-Forward-Backtest ab Index `start`.
+
+    Für jeden Ursprung (alle `horizon` Stunden) wird auf allen Daten davor
+    angepasst und der folgende Block vorhergesagt. Gibt MAE, RMSE, die
+    mittlere Fit-Zeit und die Vorhersagen zurück. Modelle mit
+    `min_history` > `start` werfen einen ValueError, bevor gerechnet wird.
+    """
+    min_history = getattr(model_factory(), "min_history", 1)
+    if start < min_history:
+        raise ValueError(f"erster Fold hat {start} Stunden Historie, Modell braucht {min_history}")
+    ds = pd.DatetimeIndex(df["ds"])
+    y = df["y"].to_numpy(dtype=np.float64)
+    preds = np.empty(len(y) - start)
+    fit_times = []
+    for origin in range(start, len(y), horizon):
+        block = min(horizon, len(y) - origin)
+        t0 = time.perf_counter()
+        model = model_factory().fit(ds[:origin], y[:origin])
+        fit_times.append(time.perf_counter() - t0)
+        preds[origin - start:origin - start + block] = model.predict(block)["yhat"].to_numpy()
+    err = y[start:] - preds
+    return {"MAE": float(np.mean(np.abs(err))), "RMSE": float(np.sqrt(np.mean(err ** 2))),
+            "Fit-Zeit (s)": float(np.mean(fit_times)), "Folds": len(fit_times), "yhat": preds}
+
+
+def compare_models(df, start, models, horizon=24):
+    """
+    Backtest mehrerer Modelle (`{Name: Factory}`) als Vergleichstabelle.
+
+    Modelle, für die die Historie vor `start` nicht reicht, bleiben mit
+    leeren Metriken in der Tabelle; "Hinweis" nennt den Grund.
+    """
+    rows = []
+    for name, factory in models.items():
+        t0 = time.perf_counter()
+        try:
+            res = walk_forward(factory, df, start, horizon)
+        except ValueError as exc:
+            rows.append({"Modell": name, "MAE": np.nan, "RMSE": np.nan, "Fit-Zeit (s)": np.nan,
+                         "Backtest (s)": np.nan, "Folds": 0, "Hinweis": str(exc)})
+            continue
+        rows.append({"Modell": name, "MAE": res["MAE"], "RMSE": res["RMSE"],
+                     "Fit-Zeit (s)": res["Fit-Zeit (s)"], "Backtest (s)": time.perf_counter() - t0,
+                     "Folds": res["Folds"], "Hinweis": ""})
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    from forecasting import MODELS
+    from traffic_data import generate_sensor_data
+
+    parser = argparse.ArgumentParser(description="Walk-Forward-Vergleich der Vorhersagemodelle")
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--test-days", type=int, default=14)
+    args = parser.parse_args()
+
+    end = pd.Timestamp("2024-01-01") + pd.Timedelta(days=args.days) - pd.Timedelta(hours=1)
+    data = generate_sensor_data(["S0000"], start="2024-01-01", end=end)
+    with pd.option_context("display.float_format", "{:.3f}".format):
+        print(compare_models(data, len(data) - args.test_days * 24, MODELS).to_string(index=False))
@@ -0,0 +1,243 @@
+"""
+Inkrementelle Vorhersagen für laufend eintreffende Messwerte.
+
+Jeder neue Stundenwert aktualisiert in O(1):
+
+* das Wochenprofil (168 Stunden-Slots, exponentiell gewichteter Mittelwert),
+* eine Niveau-Korrektur (gleitender Mittelwert der Residuen),
+* MAE/RMSE der Ein-Schritt-Vorhersage (laufende Summen).
+
+Ein vollständiger Refit (Prophet, falls installiert, sonst das schnelle
+Saisonmodell) wird nur ausgelöst, wenn der Fehler driftet oder seit dem
+letzten Refit zu viele Stunden vergangen sind. Vorhersagen werden nur für
+Sensoren neu berechnet, die seit dem letzten Abruf neue Werte bekommen haben.
+
+Replay-Benchmark (ein Jahr Stunde für Stunde)::
+
+    python streaming.py --days 365
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from forecasting import MODELS, PROPHET_AVAILABLE, fit_model
+
+HOURS_PER_WEEK = 168
+DEFAULT_REFIT_MODEL = "Prophet" if PROPHET_AVAILABLE else "Saisonal (schnell)"
+
+
+def week_slot(ts):
+    return ts.dayofweek * 24 + ts.hour
+
+
+class OnlineState:
+    """Zustand eines Sensors; alle Updates sind O(1)."""
+
+    def __init__(self, history_hours, alpha, level_alpha):
+        self.alpha = alpha
+        self.level_alpha = level_alpha
+        self.profile = np.zeros(HOURS_PER_WEEK)
+        self.level = 0.0
+        # Fehlermetriken: gesamt und exponentiell gewichtet (für Drift)
+        self.n = 0
+        self.sum_abs = 0.0
+        self.sum_sq = 0.0
+        self.ew_abs = None
+        # Ringpuffer der letzten Werte für Refits
+        self.buf_ds = np.empty(history_hours, dtype="datetime64[ns]")
+        self.buf_y = np.empty(history_hours)
+        self.buf_len = 0
+        self.buf_pos = 0
+        self.last_ds = None
+        self.updates_since_refit = 0
+        self.refits = 0
+        self.dirty = True
+        self.forecast = None
+
+    def push(self, ds, y):
+        self.buf_ds[self.buf_pos] = ds
+        self.buf_y[self.buf_pos] = y
+        self.buf_pos = (self.buf_pos + 1) % len(self.buf_y)
+        self.buf_len = min(self.buf_len + 1, len(self.buf_y))
+
+    def history(self):
+        cap = len(self.buf_y)
+        order = np.arange(self.buf_pos, self.buf_pos + cap) % cap if self.buf_len == cap else np.arange(self.buf_len)
+        return pd.DataFrame({"ds": self.buf_ds[order], "y": self.buf_y[order]})
+
+    def update(self, ds, y):
+        slot = week_slot(ds)
+        err = y - (self.profile[slot] + self.level)
+        self.n += 1
+        self.sum_abs += abs(err)
+        self.sum_sq += err * err
+        self.ew_abs = abs(err) if self.ew_abs is None else 0.97 * self.ew_abs + 0.03 * abs(err)
+        # Profil-Slot und Niveau nachziehen
+        self.profile[slot] += self.alpha * (y - self.level - self.profile[slot])
+        self.level += self.level_alpha * (y - self.profile[slot] - self.level)
+        self.push(ds, y)
+        self.last_ds = ds
+        self.updates_since_refit += 1
+        self.dirty = True
+
+    @property
+    def mae(self):
+        return self.sum_abs / self.n if self.n else float("nan")
+
+    @property
+    def rmse(self):
+        return np.sqrt(self.sum_sq / self.n) if self.n else float("nan")
+
+
+class StreamingForecaster:
+    """
+    Hält einen `OnlineState` pro Sensor.
+
+    `ingest()` verarbeitet einen einzelnen Wert, `ingest_frame()` nur die
+    Zeilen eines DataFrames, die neuer sind als der zuletzt gesehene Wert.
+    Endet ein DataFrame vor dem zuletzt gesehenen Wert (Zeitfenster in die
+    Vergangenheit verschoben), beginnt der Sensor mit einem Kaltstart neu.
+    """
+
+    def __init__(self, refit_model=DEFAULT_REFIT_MODEL, refit_every=HOURS_PER_WEEK, drift_ratio=1.5,
+                 history_hours=8 * HOURS_PER_WEEK, alpha=0.1, level_alpha=0.2, decay=0.95):
+        if refit_model not in MODELS:
+            raise ValueError(f"Unbekanntes Modell: {refit_model}")
+        self.refit_model = refit_model
+        self.refit_every = refit_every
+        self.drift_ratio = drift_ratio
+        self.history_hours = history_hours
+        self.alpha = alpha
+        self.level_alpha = level_alpha
+        self.decay = decay
+        self.states = {}
+
+    def _state(self, sensor):
+        if sensor not in self.states:
+            self.states[sensor] = OnlineState(self.history_hours, self.alpha, self.level_alpha)
+        return self.states[sensor]
+
+    def reset(self, sensor):
+        """Verwirft den Zustand eines Sensors; der nächste `ingest_frame` startet kalt."""
+        self.states.pop(sensor, None)
+
+    def needs_refit(self, state):
+        if state.updates_since_refit >= self.refit_every:
+            return True
+        # Drift: jüngster Fehler deutlich über dem Langzeit-Fehler (frühestens 24h nach einem Refit)
+        return (state.n >= 48 and state.updates_since_refit >= 24
+                and state.ew_abs > self.drift_ratio * state.mae)
+
+    def refit(self, sensor):
+        """Vollständiger Refit auf dem Ringpuffer; setzt das Wochenprofil neu."""
+        state = self.states[sensor]
+        history = state.history()
+        model = fit_model(self.refit_model, history)
+        future = model.predict(HOURS_PER_WEEK)
+        state.profile[week_slot(pd.DatetimeIndex(future["ds"])).to_numpy()] = future["yhat"].to_numpy()
+        state.level = 0.0
+        state.updates_since_refit = 0
+        state.refits += 1
+        state.dirty = True
+
+    def ingest(self, sensor, ds, y):
+        """Verarbeitet einen neuen Messwert. Gibt True zurück, wenn ein Refit lief."""
+        state = self._state(sensor)
+        ds = pd.Timestamp(ds)
+        if state.last_ds is not None and ds <= state.last_ds:
+            return False
+        state.update(ds, float(y))
+        if self.needs_refit(state):
+            self.refit(sensor)
+            return True
+        return False
+
+    def ingest_frame(self, sensor, df):
+        """Übernimmt nur neue Zeilen; der erste Aufruf initialisiert per Refit. Gibt die Anzahl neuer Zeilen zurück."""
+        state = self._state(sensor)
+        if state.last_ds is not None and len(df) and df["ds"].iloc[-1] < state.last_ds:
+            self.reset(sensor)
+            state = self._state(sensor)
+        if state.last_ds is not None:
+            df = df[df["ds"] > state.last_ds]
+        if df.empty:
+            return 0
+        n_new = len(df)
+        if state.last_ds is None:
+            # Kaltstart: auf dem älteren Teil voll anpassen, die letzte Woche
+            # (höchstens die Hälfte) online nachspielen, damit MAE/RMSE vorliegen
+            split = n_new - min(HOURS_PER_WEEK, n_new // 2)
+            init = df.iloc[:split]
+            for ds, y in zip(init["ds"].to_numpy()[-self.history_hours:], init["y"].to_numpy()[-self.history_hours:]):
+                state.push(ds, y)
+            state.last_ds = pd.Timestamp(init["ds"].iloc[-1])
+            self.refit(sensor)
+            df = df.iloc[split:]
+        for ds, y in zip(df["ds"], df["y"]):
+            self.ingest(sensor, ds, y)
+        return n_new
+
+    def forecast(self, sensor, horizon):
+        """Vorhersage ab dem letzten Wert; wird nur nach neuen Daten neu berechnet."""
+        state = self.states[sensor]
+        if state.dirty or state.forecast is None or len(state.forecast) < horizon:
+            future = pd.date_range(state.last_ds, periods=max(horizon, HOURS_PER_WEEK) + 1, freq="h")[1:]
+            correction = state.level * self.decay ** np.arange(1, len(future) + 1)
+            state.forecast = pd.DataFrame({"ds": future,
+                                           "yhat": state.profile[week_slot(future).to_numpy()] + correction})
+            state.dirty = False
+            return state.forecast.head(horizon), False
+        return state.forecast.head(horizon), True
+
+    def forecast_many(self, frames, horizon):
+        """Liefert `(sensor, forecast_df, from_cache)` wie `ForecastEngine.forecast_many`."""
+        for sensor, df in frames.items():
+            self.ingest_frame(sensor, df)
+            forecast, cached = self.forecast(sensor, horizon)
+            yield sensor, forecast, cached
+
+    def metrics(self, sensor):
+        state = self.states[sensor]
+        return {"MAE": state.mae, "RMSE": state.rmse, "Updates": state.n, "Refits": state.refits}
+
+
+# ---------------------------------------------------------------------------
+# Replay-Benchmark
+# ---------------------------------------------------------------------------
+
+def replay_benchmark(days=365, warmup_days=28, refit_model=DEFAULT_REFIT_MODEL):
+    from traffic_data import generate_sensor_data
+
+    end = pd.Timestamp("2023-01-01") + pd.Timedelta(days=days) - pd.Timedelta(hours=1)
+    df = generate_sensor_data(["S0000"], start="2023-01-01", end=end)
+    warmup = warmup_days * 24
+
+    stream = StreamingForecaster(refit_model=refit_model)
+    stream.ingest_frame("S0000", df.iloc[:warmup])
+
+    latencies, refit_latencies = [], []
+    for ds, y in zip(df["ds"].iloc[warmup:], df["y"].iloc[warmup:]):
+        t0 = time.perf_counter()
+        refitted = stream.ingest("S0000", ds, y)
+        stream.forecast("S0000", 24)
+        (refit_latencies if refitted else latencies).append(time.perf_counter() - t0)
+
+    lat = np.array(latencies) * 1e6
+    print(f"Replay: {len(df) - warmup:,} Stunden, Refit-Modell: {refit_model}")
+    print(f"Update + Vorhersage: median {np.median(lat):.0f} µs, p99 {np.percentile(lat, 99):.0f} µs, "
+          f"max {lat.max():.0f} µs")
+    if refit_latencies:
+        print(f"Refits: {len(refit_latencies)}, je {1000 * np.mean(refit_latencies):.1f} ms im Mittel")
+    m = stream.metrics("S0000")
+    print(f"Online-MAE {m['MAE']:.2f}, Online-RMSE {m['RMSE']:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stündliches Replay mit Online-Updates")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--refit-model", default=DEFAULT_REFIT_MODEL, choices=list(MODELS))
+    args = parser.parse_args()
+    replay_benchmark(args.days, refit_model=args.refit_model)
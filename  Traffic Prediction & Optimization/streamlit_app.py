@@ -8,22 +8,20 @@ from sklearn.preprocessing import MinMaxScaler
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 import warnings
 
-warnings.filterwarnings('ignore')
-
-# MLflow und Prophet optional
-try:
-    from prophet import Prophet
-
-    PROPHET_AVAILABLE = True
-except:
-    PROPHET_AVAILABLE = False
+from traffic_data import TrafficStore, DEFAULT_DATA_DIR
+from forecasting import ForecastEngine, MODELS, SeasonalBaseline, data_hash
+from downsampling import SeriesPyramid
+from lag_models import compare_models
+from routing import synthetic_city
+from tracking import ExperimentTracker
+from streaming import StreamingForecaster
+
+ONLINE_MODEL = "Online (inkrementell)"
+CITY_SIZE = 40
+# Kürzere Fenster reichen den Lag-Modellen und dem Backtest nicht als Historie
+MIN_WINDOW_DAYS = 3
 
-try:
-    import mlflow
-
-    MLFLOW_AVAILABLE = True
-except:
-    MLFLOW_AVAILABLE = False
+warnings.filterwarnings('ignore')
 
 # Konfiguration
 st.set_page_config(
@@ -40,6 +38,8 @@ with st.sidebar:
     st.header("Navigation")
     page = st.radio("Wählen Sie eine Seite:",
                     ["Dashboard", "Vorhersage", "Optimierung", "Modell-Training"])
+    # Mehr Punkte als Pixel in der Breite sind im Diagramm nicht sichtbar
+    max_points = st.select_slider("Diagrammpunkte:", [500, 1000, 1500, 2500, 5000], value=1500)
 
 
 # Beispieldaten generieren
@@ -62,7 +62,82 @@ def generate_sample_data(days=14):
     return df
 
 
-data = generate_sample_data()
+@st.cache_data
+def backtest_table(df, start, model_names):
+    return compare_models(df, start, {name: MODELS[name] for name in model_names})
+
+
+@st.cache_resource
+def get_store(root=DEFAULT_DATA_DIR):
+    # Ein Store pro Prozess: der Partition-Cache überlebt Reruns
+    return TrafficStore(root)
+
+
+@st.cache_resource
+def get_forecast_engine():
+    # Prozess-Pool und Modell-Cache über Reruns hinweg wiederverwenden
+    return ForecastEngine()
+
+
+@st.cache_resource
+def get_stream():
+    # Online-Zustand pro Sensor: Reruns verarbeiten nur neue Messwerte
+    return StreamingForecaster()
+
+
+@st.cache_resource(max_entries=8)
+def get_network(hourly_profile):
+    # Landmarken einmal pro Profil vorberechnen; Anfragen brauchen dann nur A*.
+    # Jedes Datenfenster liefert ein eigenes Profil, daher begrenzt
+    return synthetic_city(CITY_SIZE, CITY_SIZE, hourly_profile=hourly_profile).precompute_landmarks(8)
+
+
+@st.cache_resource(max_entries=32)
+def get_pyramid(key, _df):
+    # Pyramide einmal pro Datenfenster; Zoom-Änderungen fragen nur noch ab
+    return SeriesPyramid(_df["ds"].to_numpy(), _df["y"].to_numpy())
+
+
+def downsample(df, n_points, start=None, end=None):
+    """Zeilen von `df` für den Ausschnitt [start, end], reduziert auf höchstens `n_points`."""
+    if len(df) <= n_points and start is None and end is None:
+        return df
+    idx = get_pyramid(data_hash(df), df).query(start, end, n_points)
+    return df.iloc[idx]
+
+
+@st.cache_resource
+def get_tracker():
+    # Ein Hintergrund-Thread pro Server-Prozess
+    return ExperimentTracker()
+
+
+store = get_store()
+
+# Partitionierter Parquet-Datensatz (falls vorhanden), sonst Beispieldaten
+if store.exists():
+    with st.sidebar:
+        st.header("Datenquelle")
+        sensor = st.selectbox("Sensor:", store.sensors())
+        first_ts, last_ts = store.time_range(sensor)
+        window = st.date_input("Zeitraum:",
+                               value=(max(first_ts, last_ts - pd.Timedelta(days=14)).date(), last_ts.date()),
+                               min_value=first_ts.date(), max_value=last_ts.date())
+    if isinstance(window, tuple) and len(window) == 2:
+        window_start, window_end = window
+    else:
+        window_start = window_end = window[0] if isinstance(window, tuple) else window
+    if (window_end - window_start).days + 1 < MIN_WINDOW_DAYS:
+        # Zu kurzes Fenster nach vorn verlängern, am Anfang der Daten nach hinten
+        min_span = timedelta(days=MIN_WINDOW_DAYS - 1)
+        window_start = max(first_ts.date(), window_end - min_span)
+        window_end = min(last_ts.date(), window_start + min_span)
+        st.sidebar.info(f"Zeitraum auf mindestens {MIN_WINDOW_DAYS} Tage erweitert: "
+                        f"{window_start:%d.%m.%Y} – {window_end:%d.%m.%Y}")
+    data = store.load(sensor, start=pd.Timestamp(window_start),
+                      end=pd.Timestamp(window_end) + pd.Timedelta(hours=23))
+else:
+    data = generate_sample_data()
 
 # Dashboard
 if page == "Dashboard":
@@ -80,11 +155,20 @@ if page == "Dashboard":
 
     st.markdown("---")
 
-    # Verkehrstrend
-    fig = px.line(data, x="ds", y="y",
+    # Verkehrstrend: nur so viele Punkte wie sichtbar; ein engerer Ausschnitt zeigt mehr Details
+    first, last = data["ds"].iloc[0].to_pydatetime(), data["ds"].iloc[-1].to_pydatetime()
+    if first < last:
+        view_start, view_end = st.slider("Ausschnitt:", min_value=first, max_value=last,
+                                         value=(first, last), step=timedelta(hours=1),
+                                         format="DD.MM.YYYY HH:mm")
+    else:
+        view_start, view_end = first, last
+    view = downsample(data, max_points, pd.Timestamp(view_start), pd.Timestamp(view_end))
+    fig = px.line(view, x="ds", y="y",
                   title="Verkehrsaufkommen - Historisch",
                   labels={"y": "Aufkommen (%)", "ds": "Zeit"})
     st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"{len(view):,} von {len(data):,} Messwerten dargestellt")
 
     # Tägliches Muster
     data['Stunde'] = data['ds'].dt.hour
@@ -102,75 +186,131 @@ elif page == "Vorhersage":
     with col1:
         stunden = st.slider("Vorhersage für nächste Stunden:", 1, 168, 24)
     with col2:
-        modell = st.selectbox("Modell wählen:",
-                              ["Einfache Baseline", "Prophet"] if PROPHET_AVAILABLE else ["Einfache Baseline"])
+        modell = st.selectbox("Modell wählen:", list(MODELS) + [ONLINE_MODEL])
     with col3:
         st.info(f"Horizont: {stunden}h")
 
-    # Baseline: Saisonalität
-    if modell == "Einfache Baseline":
-        forecast_values = []
-        for h in range(stunden):
-            stunde_des_tages = (h + data['ds'].max().hour) % 24
-            avg_für_stunde = data[data['ds'].dt.hour == stunde_des_tages]['y'].mean()
-            noise = np.random.normal(0, 3)
-            forecast_values.append(avg_für_stunde + noise)
-
-        forecast_data = pd.DataFrame({
-            "ds": pd.date_range(data["ds"].max(), periods=stunden + 1, freq="H")[1:],
-            "yhat": forecast_values
-        })
-
-    # Prophet
-    elif modell == "Prophet" and PROPHET_AVAILABLE:
-        with st.spinner("Prophet-Modell trainiert..."):
-            model = Prophet(yearly_seasonality=False,
-                            monthly_seasonality=False,
-                            daily_seasonality=True)
-            model.fit(data[['ds', 'y']])
-            future = model.make_future_dataframe(periods=stunden, freq='H')
-            forecast_data = model.predict(future).tail(stunden)[['ds', 'yhat']]
-
-    # Plot
+    engine = get_forecast_engine()
+
+    # Mehrere Sensoren: Fits laufen parallel im Prozess-Pool
+    if store.exists():
+        sensoren = st.multiselect("Sensoren:", store.sensors(), default=[sensor])
+        frames = {s: (data if s == sensor else
+                      store.load(s, start=pd.Timestamp(window_start),
+                                 end=pd.Timestamp(window_end) + pd.Timedelta(hours=23)))
+                  for s in sensoren}
+    else:
+        frames = {"Beispieldaten": data}
+
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=data["ds"], y=data["y"],
-                             name="Historisch", mode="lines"))
-    fig.add_trace(go.Scatter(x=forecast_data["ds"], y=forecast_data["yhat"],
-                             name="Vorhersage", mode="lines+markers",
-                             line=dict(dash="dash")))
-    fig.update_layout(title=f"Verkehrsvorhersage ({modell})",
-                      xaxis_title="Zeit",
-                      yaxis_title="Aufkommen (%)",
-                      hovermode="x unified")
-    st.plotly_chart(fig, use_container_width=True)
+    chart = st.empty()
+    progress = st.progress(0.0)
+    summary = []
+    if modell == ONLINE_MODEL:
+        results = get_stream().forecast_many(frames, stunden)
+    else:
+        results = engine.forecast_many(frames, modell, stunden)
+    for i, (name, forecast_data, cached) in enumerate(results, start=1):
+        # Fertige Vorhersagen sofort anzeigen, nicht erst nach dem letzten Fit
+        history = downsample(frames[name], max_points)
+        fig.add_trace(go.Scatter(x=history["ds"], y=history["y"],
+                                 name=f"{name} (historisch)", mode="lines"))
+        fig.add_trace(go.Scatter(x=forecast_data["ds"], y=forecast_data["yhat"],
+                                 name=f"{name} (Vorhersage)", mode="lines+markers",
+                                 line=dict(dash="dash")))
+        fig.update_layout(title=f"Verkehrsvorhersage ({modell})",
+                          xaxis_title="Zeit",
+                          yaxis_title="Aufkommen (%)",
+                          hovermode="x unified")
+        chart.plotly_chart(fig, use_container_width=True)
+        progress.progress(i / len(frames), text=f"{i}/{len(frames)} Sensoren fertig")
+        summary.append({"Sensor": name,
+                        "Ø Vorhersage": forecast_data["yhat"].mean(),
+                        "Spitze": forecast_data["yhat"].max(),
+                        "Spitzenzeit": forecast_data.loc[forecast_data["yhat"].idxmax(), "ds"],
+                        "Aus Cache": cached,
+                        **(get_stream().metrics(name) if modell == ONLINE_MODEL else {})})
+
+    if len(summary) > 1 or modell == ONLINE_MODEL:
+        st.dataframe(pd.DataFrame(summary), use_container_width=True)
 
 # Optimierung
 elif page == "Optimierung":
     st.header("⚙️ Verkehrsoptimierung")
 
-    st.subheader("Aktuelle Engpässe & Empfehlungen")
+    # Tagesprofil aus den aktuellen Daten treibt die Kantengewichte des Netzes
+    hourly_profile = SeasonalBaseline().fit(pd.DatetimeIndex(data["ds"]), data["y"].to_numpy()).profile
+    network = get_network(tuple(np.round(hourly_profile, 1)))
+    size = CITY_SIZE
 
-    roads = ["Hauptstraße", "Ringstraße", "Bundesstraße", "Schnellstraße"]
-    congestion = [75, 45, 30, 60]
+    orte = {"Nordwest": (0, 0), "Nordost": (0, size - 1), "Zentrum": (size // 2, size // 2),
+            "Südwest": (size - 1, 0), "Südost": (size - 1, size - 1), "Bahnhof": (size // 3, 2 * size // 3)}
 
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        start_ort = st.selectbox("Start:", list(orte), index=0)
+    with col2:
+        ziel_ort = st.selectbox("Ziel:", list(orte), index=4)
+    with col3:
+        stunde = st.slider("Abfahrt (Stunde):", 0, 23, 8)
+
+    def node_of(ort):
+        r, c = orte[ort]
+        return r * size + c
+
+    depart = stunde * 3600
+    route = network.route(node_of(start_ort), node_of(ziel_ort), depart)
+    alternative, staus = network.reroute(route, depart) if route else (None, [])
+
+    st.subheader("Aktuelle Engpässe & Empfehlungen")
     col1, col2 = st.columns(2)
 
     with col1:
-        fig = px.bar(x=roads, y=congestion,
-                     title="Verkehrsaufkommen nach Straße",
-                     labels={"x": "Straße", "y": "Aufkommen (%)"},
-                     color=congestion,
-                     color_continuous_scale="RdYlGn_r")
+        occupancy = network.occupancy(stunde)
+        fig = go.Figure()
+        # Kanten nach Auslastung in drei Klassen, je eine Linien-Trace (None trennt Segmente)
+        for label, lo, hi, color in [("frei", 0, 50, "#2ca02c"), ("erhöht", 50, 70, "#ffbf00"),
+                                     ("Stau", 70, 101, "#d62728")]:
+            idx = np.nonzero((occupancy >= lo) & (occupancy < hi) & (network.src < network.dst))[0]
+            xs = np.column_stack([network.xy[network.src[idx], 0], network.xy[network.dst[idx], 0],
+                                  np.full(len(idx), np.nan)]).ravel()
+            ys = np.column_stack([network.xy[network.src[idx], 1], network.xy[network.dst[idx], 1],
+                                  np.full(len(idx), np.nan)]).ravel()
+            fig.add_trace(go.Scatter(x=xs, y=ys, mode="lines", name=label,
+                                     line=dict(color=color, width=1), hoverinfo="skip"))
+        if route:
+            fig.add_trace(go.Scatter(x=network.xy[route["nodes"], 0], y=network.xy[route["nodes"], 1],
+                                     mode="lines", name="Schnellste Route", line=dict(color="#1f77b4", width=5)))
+        if staus:
+            fig.add_trace(go.Scatter(x=network.xy[alternative["nodes"], 0], y=network.xy[alternative["nodes"], 1],
+                                     mode="lines", name="Umleitung", line=dict(color="#9467bd", width=4, dash="dash")))
+        fig.update_layout(title=f"Straßennetz um {stunde}:00 Uhr", height=500,
+                          xaxis=dict(visible=False), yaxis=dict(visible=False, scaleanchor="x"))
         st.plotly_chart(fig, use_container_width=True)
 
     with col2:
+        if route:
+            m1, m2 = st.columns(2)
+            m1.metric("Fahrzeit", f"{route['travel_time'] / 60:.1f} min")
+            if staus:
+                m2.metric("Umleitung ohne Stau-Segmente", f"{alternative['travel_time'] / 60:.1f} min",
+                          delta=f"{(alternative['travel_time'] - route['travel_time']) / 60:+.1f} min",
+                          delta_color="inverse")
+            else:
+                m2.metric("Stau-Segmente auf Route", 0)
+
+        # Auslastung je benannter Straße (Mittel über ihre Segmente)
+        named = network.edge_name > 0
+        roads = pd.DataFrame({"Straße": np.array(network.names)[network.edge_name[named]],
+                              "Auslastung": occupancy[named]}).groupby("Straße")["Auslastung"].mean()
+        roads = roads.sort_values(ascending=False).head(6)
         st.write("**Empfohlene Maßnahmen:**")
         recommendations = []
-        for i, road in enumerate(roads):
-            if congestion[i] > 70:
+        for road, congestion in roads.items():
+            if congestion > 70:
                 st.warning(f"🔴 {road}: Umleitungen empfohlen")
-                recommendations.append(f"{road} (Auslastung: {congestion[i]}%)")
-            elif congestion[i] > 50:
+                recommendations.append(f"{road} (Auslastung: {congestion:.0f}%)")
+            elif congestion > 50:
                 st.info(f"🟡 {road}: Erhöhte Belastung")
             else:
                 st.success(f"🟢 {road}: Normal")
@@ -217,97 +357,35 @@ elif page == "Modell-Training":
 
     st.markdown("---")
 
-    # MLflow Integration
-    if MLFLOW_AVAILABLE:
-        if st.button("🚀 Training starten & zu MLflow loggen"):
-            with st.spinner("Training läuft..."):
-                try:
-                    # MLflow Tracking URI setzen
-                    mlflow.set_tracking_uri("file:///app/mlruns")
-                    # Experiment erstellen oder abrufen
-                    mlflow.set_experiment("Traffic Prediction")
-
-                    with mlflow.start_run():
-                        mlflow.log_param("train_size", train_size)
-                        mlflow.log_param("epochs", epochs)
-                        mlflow.log_metric("mae", mae)
-                        mlflow.log_metric("rmse", rmse)
-                    st.success("✅ Experiment zu MLflow geloggt!")
-                except Exception as e:
-                    st.error(f"❌ MLflow Fehler: {str(e)}")
-    else:
-        st.warning("⚠️ MLflow nicht installiert. Installieren Sie: `pip install mlflow`")
-
-    # Modell-Vergleich
-    st.subheader("Modell-Vergleich")
-    comparison_data = pd.DataFrame({
-        "Modell": ["Baseline (Durchschnitt)", "Prophet", "LSTM"],
-        "MAE": [mae, mae * 0.85, mae * 0.75],
-        "RMSE": [rmse, rmse * 0.85, rmse * 0.75],
-        "Trainingszeit": ["< 1s", "5-10s", "30-120s"]
-    })
-    st.dataframe(comparison_data, use_container_width=True)# Modell-Training
-elif page == "Modell-Training":
-    st.header("🤖 Modell-Training & Experiment-Tracking")
-
-    col1, col2 = st.columns(2)
-
-    with col1:
-        st.subheader("Training-Konfiguration")
-        train_size = st.slider("Trainings-Testdaten Split (%):", 60, 90, 80)
-        epochs = st.slider("Epochs:", 10, 100, 50) if st.checkbox("LSTM aktivieren") else 0
-
-    with col2:
-        st.subheader("Metriken")
-
-        # Train-Test Split
-        split_idx = int(len(data) * train_size / 100)
-        train_data = data[:split_idx]
-        test_data = data[split_idx:]
-
-        # Baseline-Modell
-        baseline_pred = []
-        for idx in test_data.index:
-            stunde = test_data.loc[idx, 'ds'].hour
-            avg = train_data[train_data['ds'].dt.hour == stunde]['y'].mean()
-            baseline_pred.append(avg)
-
-        mae = mean_absolute_error(test_data['y'].values, baseline_pred)
-        rmse = np.sqrt(mean_squared_error(test_data['y'].values, baseline_pred))
-
-        col_m1, col_m2, col_m3 = st.columns(3)
-        with col_m1:
-            st.metric("MAE", f"{mae:.2f}")
-        with col_m2:
-            st.metric("RMSE", f"{rmse:.2f}")
-        with col_m3:
-            st.metric("Datensätze", len(data))
-
-    st.markdown("---")
-
-    # MLflow Integration
-    if MLFLOW_AVAILABLE:
-        if st.button("🚀 Training starten & zu MLflow loggen"):
-            with st.spinner("Training läuft..."):
-                mlflow.start_run()
-                mlflow.log_param("train_size", train_size)
-                mlflow.log_param("epochs", epochs)
-                mlflow.log_metric("mae", mae)
-                mlflow.log_metric("rmse", rmse)
-                mlflow.end_run()
-                st.success("✅ Experiment zu MLflow geloggt!")
-    else:
-        st.warning("⚠️ MLflow nicht installiert. Installieren Sie: `pip install mlflow`")
-
-    # Modell-Vergleich
+    # Experiment-Tracking: Einträge landen in einer Queue und werden im
+    # Hintergrund gebündelt geschrieben, der Button blockiert die UI nicht
+    tracker = get_tracker()
+    if st.button("🚀 Training starten & zu MLflow loggen"):
+        run = tracker.start_run({"train_size": train_size, "epochs": epochs}, run_name="Baseline")
+        run.log_metrics({"mae": mae, "rmse": rmse})
+        run.log_series("abs_error", np.abs(test_data['y'].values - np.array(baseline_pred)))
+        run.end()
+        st.success("✅ Experiment wird im Hintergrund geloggt!")
+    if tracker.fallback_active:
+        grund = tracker.last_error or "MLflow nicht installiert (`pip install mlflow`)"
+        st.warning(f"⚠️ {grund} – Experimente werden lokal nach `{tracker.fallback_path}` geschrieben.")
+    st.caption(f"Tracking: {tracker.written} Einträge geschrieben, {tracker.pending} ausstehend")
+
+    # Modell-Vergleich: echte Walk-Forward-Backtests auf dem Test-Split
+    # Teure Modelle (Prozess-Pool-Kandidaten, siehe `parallel`) nur auf Wunsch
     st.subheader("Modell-Vergleich")
-    comparison_data = pd.DataFrame({
-        "Modell": ["Baseline (Durchschnitt)", "Prophet", "LSTM"],
-        "MAE": [mae, mae * 0.85, mae * 0.75],
-        "RMSE": [rmse, rmse * 0.85, rmse * 0.75],
-        "Trainingszeit": ["< 1s", "5-10s", "30-120s"]
-    })
-    st.dataframe(comparison_data, use_container_width=True)
+    backtest_models = st.multiselect("Modelle:", list(MODELS),
+                                     default=[name for name, model in MODELS.items() if not model.parallel])
+    n_folds = -(-(len(data) - split_idx) // 24)
+    if st.button(f"📊 Backtest starten ({n_folds} Folds)", disabled=not backtest_models):
+        with st.spinner("Backtest läuft..."):
+            comparison_data = backtest_table(data[["ds", "y"]], split_idx, tuple(backtest_models))
+        comparison_data["Trainingszeit"] = comparison_data["Fit-Zeit (s)"].map(
+            lambda t: "–" if pd.isna(t) else f"{t * 1000:.0f} ms" if t < 1 else f"{t:.1f} s")
+        st.dataframe(comparison_data[["Modell", "MAE", "RMSE", "Trainingszeit", "Folds", "Hinweis"]],
+                     use_container_width=True)
+    st.caption("Walk-Forward-Backtest: pro Fold Fit auf allen Daten davor, Vorhersage der nächsten 24 Stunden. "
+               "Trainingszeit = mittlere Fit-Zeit pro Fold.")
 
 st.markdown("---")
 st.caption("Traffic Prediction & Optimization • MLflow + Prophet/LSTM Integration")
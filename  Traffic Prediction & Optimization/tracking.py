@@ -0,0 +1,288 @@
+"""
+Asynchrones, gebündeltes Experiment-Tracking.
+
+Aufrufe wie `run.log_metric()` legen nur einen Eintrag in eine Queue und
+kehren sofort zurück. Ein Hintergrund-Thread sammelt Parameter, Metriken und
+Schrittreihen und schreibt sie mit `MlflowClient.log_batch` in wenigen
+großen Anfragen. Ist MLflow nicht installiert oder nicht erreichbar, landen
+die Einträge als JSON-Zeilen in einer lokalen Append-only-Datei — der
+Aufrufer (z. B. der Streamlit-Thread) bemerkt davon nichts.
+
+Messung des Logging-Overheads (synchron vs. gebündelt)::
+
+    python tracking.py --points 5000
+"""
+
+import argparse
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+
+try:
+    from mlflow.entities import Metric, Param
+    from mlflow.tracking import MlflowClient
+
+    MLFLOW_AVAILABLE = True
+except ImportError:
+    MLFLOW_AVAILABLE = False
+
+DEFAULT_TRACKING_URI = os.environ.get("MLFLOW_TRACKING_URI", "file:///app/mlruns")
+DEFAULT_FALLBACK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mlruns", "fallback.jsonl")
+
+# Obergrenzen von MLflow für eine einzelne log_batch-Anfrage
+MAX_METRICS_PER_BATCH = 1000
+MAX_PARAMS_PER_BATCH = 100
+
+_STOP = object()
+
+
+class TrackedRun:
+    """Handle auf einen Run; alle Methoden sind nicht-blockierend."""
+
+    def __init__(self, tracker, run_id):
+        self._tracker = tracker
+        self.run_id = run_id
+
+    def log_param(self, key, value):
+        self._tracker._put(self.run_id, "param", key, str(value))
+
+    def log_params(self, params):
+        for key, value in params.items():
+            self.log_param(key, value)
+
+    def log_metric(self, key, value, step=0):
+        self._tracker._put(self.run_id, "metric", key, float(value), step)
+
+    def log_metrics(self, metrics, step=0):
+        for key, value in metrics.items():
+            self.log_metric(key, value, step)
+
+    def log_series(self, key, values, start_step=0):
+        """Schrittreihe (z. B. Loss pro Epoche) als ein Queue-Eintrag."""
+        self._tracker._put(self.run_id, "series", key, [float(v) for v in values], start_step)
+
+    def end(self, status="FINISHED"):
+        self._tracker._put(self.run_id, "end", None, status)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end("FAILED" if exc_type else "FINISHED")
+
+
+class ExperimentTracker:
+    """
+    Bündelt Logging-Aufrufe und schreibt sie aus einem Hintergrund-Thread.
+
+    Der Thread sammelt Einträge bis `flush_interval` Sekunden vergangen sind
+    oder `max_pending` Einträge anliegen und schreibt dann pro Run eine
+    Folge von `log_batch`-Anfragen. Fehler beim Schreiben nach MLflow
+    schalten dauerhaft auf die lokale Datei um (`self.fallback_active`);
+    bereits vollständig geschriebene Runs landen dabei nicht noch einmal in
+    der Datei, angefangene MLflow-Runs werden als FAILED beendet. Scheitert
+    auch die Datei, werden die Einträge verworfen (`self.dropped`) — der
+    Thread läuft weiter und `flush()` kehrt trotzdem zurück.
+    """
+
+    def __init__(self, tracking_uri=DEFAULT_TRACKING_URI, experiment="Traffic Prediction",
+                 fallback_path=DEFAULT_FALLBACK_PATH, flush_interval=0.5, max_pending=5000):
+        self.tracking_uri = tracking_uri
+        self.experiment = experiment
+        self.fallback_path = fallback_path
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.fallback_active = not MLFLOW_AVAILABLE
+        self.last_error = None
+        self.written = 0
+        self.dropped = 0
+        self._queue = queue.Queue()
+        self._client = None
+        self._experiment_id = None
+        self._mlflow_run_ids = {}
+        self._thread = threading.Thread(target=self._worker, name="experiment-tracker", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # API für den aufrufenden Thread
+    # ------------------------------------------------------------------
+
+    def start_run(self, params=None, run_name=None):
+        run = TrackedRun(self, uuid.uuid4().hex)
+        self._put(run.run_id, "start", None, run_name)
+        if params:
+            run.log_params(params)
+        return run
+
+    def _put(self, run_id, kind, key, value, step=0):
+        self._queue.put((run_id, kind, key, value, step, int(time.time() * 1000)))
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def flush(self, timeout=None):
+        """Wartet, bis alle bisher eingereihten Einträge geschrieben sind."""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout=None):
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    # ------------------------------------------------------------------
+    # Hintergrund-Thread
+    # ------------------------------------------------------------------
+
+    def _worker(self):
+        while True:
+            items = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            # Weitere Einträge einsammeln, bis Intervall oder Batchgröße erreicht sind
+            while len(items) < self.max_pending and not isinstance(items[-1], threading.Event) \
+                    and items[-1] is not _STOP:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            entries = [i for i in items if isinstance(i, tuple)]
+            try:
+                if entries:
+                    self._write(entries)
+            except Exception as e:  # Auch die Datei ist nicht schreibbar: verwerfen, der Thread darf nicht sterben
+                self.last_error = f"{type(e).__name__}: {e}"
+                self.dropped += len(entries)
+            finally:
+                for item in items:
+                    if isinstance(item, threading.Event):
+                        item.set()
+            if items[-1] is _STOP:
+                return
+
+    def _write(self, entries):
+        if not self.fallback_active:
+            done = set()
+            try:
+                self._write_mlflow(entries, done)
+                self.written += len(entries)
+                return
+            except Exception as e:  # MLflow nicht erreichbar, Rechte fehlen, ...
+                self.last_error = f"{type(e).__name__}: {e}"
+                self.fallback_active = True
+                self._abort_mlflow_runs()
+            # Runs, die schon komplett in MLflow stehen, nicht doppelt in die Datei schreiben
+            self.written += sum(1 for entry in entries if entry[0] in done)
+            entries = [entry for entry in entries if entry[0] not in done]
+        self._write_fallback(entries)
+        self.written += len(entries)
+
+    def _abort_mlflow_runs(self):
+        """Noch offene MLflow-Runs als FAILED beenden; ihre weiteren Einträge gehen in die Datei."""
+        for mlflow_id in self._mlflow_run_ids.values():
+            try:
+                self._client.set_terminated(mlflow_id, status="FAILED")
+            except Exception:
+                pass
+        self._mlflow_run_ids.clear()
+
+    def _write_mlflow(self, entries, done):
+        """Schreibt run für run; die IDs vollständig geschriebener Runs kommen in `done`."""
+        if self._client is None:
+            self._client = MlflowClient(tracking_uri=self.tracking_uri)
+            exp = self._client.get_experiment_by_name(self.experiment)
+            self._experiment_id = exp.experiment_id if exp else self._client.create_experiment(self.experiment)
+
+        by_run = {}
+        for run_id, kind, key, value, step, ts in entries:
+            batch = by_run.setdefault(run_id, {"metrics": [], "params": [], "start": None, "end": None})
+            if kind == "start":
+                batch["start"] = value or ""
+            elif kind == "param":
+                batch["params"].append(Param(key, value))
+            elif kind == "metric":
+                batch["metrics"].append(Metric(key, value, ts, step))
+            elif kind == "series":
+                batch["metrics"].extend(Metric(key, v, ts, step + i) for i, v in enumerate(value))
+            elif kind == "end":
+                batch["end"] = value
+
+        for run_id, batch in by_run.items():
+            if batch["start"] is not None:
+                run = self._client.create_run(self._experiment_id, run_name=batch["start"] or None)
+                self._mlflow_run_ids[run_id] = run.info.run_id
+            mlflow_id = self._mlflow_run_ids[run_id]
+            metrics, params = batch["metrics"], batch["params"]
+            for i in range(0, len(metrics), MAX_METRICS_PER_BATCH):
+                self._client.log_batch(mlflow_id, metrics=metrics[i:i + MAX_METRICS_PER_BATCH])
+            for i in range(0, len(params), MAX_PARAMS_PER_BATCH):
+                self._client.log_batch(mlflow_id, params=params[i:i + MAX_PARAMS_PER_BATCH])
+            if batch["end"] is not None:
+                self._client.set_terminated(mlflow_id, status=batch["end"])
+                self._mlflow_run_ids.pop(run_id, None)
+            done.add(run_id)
+
+    def _write_fallback(self, entries):
+        os.makedirs(os.path.dirname(self.fallback_path) or ".", exist_ok=True)
+        lines = []
+        for run_id, kind, key, value, step, ts in entries:
+            lines.append(json.dumps({"run": run_id, "type": kind, "key": key, "value": value,
+                                     "step": step, "timestamp": ts, "experiment": self.experiment},
+                                    ensure_ascii=False))
+        with open(self.fallback_path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+# ---------------------------------------------------------------------------
+# Messung
+# ---------------------------------------------------------------------------
+
+def benchmark(n_points=5000, tracking_uri=None):
+    tmp = tempfile.mkdtemp(prefix="tracking-bench-")
+    uri = tracking_uri or f"file://{tmp}/mlruns"
+    values = [1 / (1 + i) for i in range(n_points)]
+    print(f"{n_points:,} Metrik-Punkte pro Run, Tracking-URI: {uri}")
+
+    if MLFLOW_AVAILABLE:
+        import mlflow
+
+        mlflow.set_tracking_uri(uri)
+        mlflow.set_experiment("benchmark-sync")
+        t0 = time.perf_counter()
+        with mlflow.start_run():
+            mlflow.log_param("n_points", n_points)
+            for i, v in enumerate(values):
+                mlflow.log_metric("loss", v, step=i)
+        print(f"{'synchron (log_metric je Punkt)':<38} Aufrufer {time.perf_counter() - t0:8.3f} s")
+
+    for label, fallback in [("gebündelt (MLflow)", False), ("gebündelt (lokale Datei)", True)]:
+        if not fallback and not MLFLOW_AVAILABLE:
+            continue
+        tracker = ExperimentTracker(uri, "benchmark-batched", fallback_path=os.path.join(tmp, "fallback.jsonl"))
+        tracker.fallback_active = fallback or tracker.fallback_active
+        t0 = time.perf_counter()
+        run = tracker.start_run({"n_points": n_points})
+        for i, v in enumerate(values):
+            run.log_metric("loss", v, step=i)
+        run.end()
+        t_caller = time.perf_counter() - t0
+        tracker.flush()
+        t_total = time.perf_counter() - t0
+        tracker.close()
+        note = f" ({tracker.last_error})" if tracker.last_error else ""
+        print(f"{label:<38} Aufrufer {t_caller:8.3f} s, bis geschrieben {t_total:8.3f} s{note}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Logging-Overhead pro Trainingslauf messen")
+    parser.add_argument("--points", type=int, default=5000)
+    parser.add_argument("--tracking-uri", default=None)
+    args = parser.parse_args()
+    benchmark(args.points, args.tracking_uri)
@@ -0,0 +1,290 @@
+"""
+Daten-Layer für die Traffic-App.
+
+Messwerte vieler Sensoren werden als Parquet gespeichert, partitioniert nach
+Sensor und Monat (Hive-Layout)::
+
+    <root>/sensor_id=S0001/month=2024-01/part-0.parquet
+
+Beim Laden werden nur die Partitionen gelesen, die das angefragte Zeitfenster
+und die angefragten Sensoren betreffen (Predicate Pushdown über den Pfad),
+und nur die benötigten Spalten dekodiert (Column Pruning). Häufig genutzte
+Partitionen bleiben als Arrow-Tabellen in einem LRU-Cache im Speicher.
+
+Benchmark (synthetische Daten erzeugen und Ladezeiten messen)::
+
+    python traffic_data.py --sensors 200 --years 2 --root data/traffic
+"""
+
+import argparse
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+DEFAULT_DATA_DIR = os.environ.get(
+    "TRAFFIC_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "traffic")
+)
+COLUMNS = ["ds", "y", "Geschwindigkeit", "Wetter"]
+WEATHER = np.array(["Sonnig", "Bewölkt", "Regen"])
+
+
+def sensor_name(i):
+    return f"S{i:04d}"
+
+
+# ---------------------------------------------------------------------------
+# Synthetische Daten
+# ---------------------------------------------------------------------------
+
+def generate_sensor_data(sensor_ids, start="2023-01-01", end="2024-12-31 23:00", freq="h", seed=0):
+    """
+    Erzeugt realistische Verkehrsdaten für mehrere Sensoren (vektorisiert).
+
+    Muster: Berufsverkehr morgens/abends, ruhigere Wochenenden, Ferien-Delle
+    im Sommer, sensorindividuelle Kapazität und Spitzenzeit, Regen-Effekt und
+    gelegentliche Störungen (Unfälle), die über einige Stunden abklingen.
+    """
+    sensor_ids = list(sensor_ids)
+    dates = pd.date_range(start=start, end=end, freq=freq)
+    n_s, n_t = len(sensor_ids), len(dates)
+    # Seed pro Sensor, damit Chunks unabhängig von der Chunk-Größe sind
+    seeds = [seed * 100003 + sum(ord(c) * 31 ** k for k, c in enumerate(s)) for s in sensor_ids]
+    rngs = [np.random.default_rng(s % (2 ** 32)) for s in seeds]
+
+    hour = dates.hour.to_numpy()[None, :] + dates.minute.to_numpy()[None, :] / 60
+    weekend = (dates.dayofweek.to_numpy() >= 5)[None, :]
+    doy = dates.dayofyear.to_numpy()[None, :]
+
+    scale = np.array([r.uniform(0.6, 1.2) for r in rngs])[:, None]
+    shift = np.array([r.normal(0, 0.7) for r in rngs])[:, None]
+    noise_sd = np.array([r.uniform(2, 6) for r in rngs])[:, None]
+
+    def peak(center, width):
+        return np.exp(-0.5 * ((hour - center - shift) / width) ** 2)
+
+    weekday_profile = 20 + 45 * peak(8, 1.3) + 38 * peak(17.5, 1.8) + 15 * peak(12.5, 3)
+    weekend_profile = 15 + 30 * peak(14, 3.5)
+    profile = np.where(weekend, weekend_profile, weekday_profile)
+    seasonal = 1 - 0.12 * np.exp(-0.5 * ((doy - 210) / 18) ** 2)
+
+    noise = np.stack([r.normal(0, 1, n_t) for r in rngs]) * noise_sd
+    weather_idx = np.stack([r.choice(3, n_t, p=[0.5, 0.3, 0.2]) for r in rngs])
+
+    # Störungen: seltene Impulse, die exponentiell abklingen
+    impulses = np.stack([(r.random(n_t) < 0.002) * r.uniform(15, 40, n_t) for r in rngs])
+    incidents = np.zeros_like(impulses)
+    for lag in range(6):
+        incidents[:, lag:] += impulses[:, : n_t - lag] * 0.6 ** lag
+
+    y = profile * seasonal * scale + noise + incidents + 4 * (weather_idx == 2)
+    y = np.clip(y, 0, 100)
+    speed = np.clip(120 - 0.9 * y + np.stack([r.normal(0, 4, n_t) for r in rngs]), 5, 130)
+
+    return pd.DataFrame({
+        "sensor_id": np.repeat(sensor_ids, n_t),
+        "ds": np.tile(dates.to_numpy(), n_s),
+        "y": y.ravel().astype(np.float32),
+        "Geschwindigkeit": speed.ravel().astype(np.float32),
+        "Wetter": WEATHER[weather_idx.ravel()],
+    })
+
+
+def write_partitioned(df, root):
+    """Schreibt einen DataFrame mit Spalte `sensor_id` nach Sensor und Monat partitioniert."""
+    months = df["ds"].dt.strftime("%Y-%m")
+    for (sensor, month), part in df.groupby([df["sensor_id"], months], sort=False):
+        path = os.path.join(root, f"sensor_id={sensor}", f"month={month}")
+        os.makedirs(path, exist_ok=True)
+        table = pa.Table.from_pandas(part[COLUMNS].sort_values("ds"), preserve_index=False)
+        pq.write_table(table, os.path.join(path, "part-0.parquet"), compression="zstd")
+
+
+def write_synthetic_dataset(root, n_sensors=200, start="2023-01-01", end="2024-12-31 23:00",
+                            chunk_sensors=25, seed=0, overwrite=True):
+    """Erzeugt einen großen synthetischen Datensatz sensorweise in Chunks (begrenzter Speicher)."""
+    if overwrite and os.path.exists(root):
+        shutil.rmtree(root)
+    sensors = [sensor_name(i) for i in range(n_sensors)]
+    for i in range(0, n_sensors, chunk_sensors):
+        write_partitioned(generate_sensor_data(sensors[i:i + chunk_sensors], start, end, seed=seed), root)
+    return root
+
+
+# ---------------------------------------------------------------------------
+# Store mit Partition-Pruning und Cache
+# ---------------------------------------------------------------------------
+
+class _LRUCache:
+    """Thread-sicherer LRU-Cache für Arrow-Tabellen, begrenzt nach Bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            table = self._data.get(key)
+            if table is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return table
+
+    def put(self, key, table):
+        with self._lock:
+            if key in self._data:
+                self.nbytes -= self._data.pop(key).nbytes
+            self._data[key] = table
+            self.nbytes += table.nbytes
+            while self.nbytes > self.max_bytes and len(self._data) > 1:
+                _, old = self._data.popitem(last=False)
+                self.nbytes -= old.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+
+
+class TrafficStore:
+    """
+    Lesezugriff auf den partitionierten Parquet-Datensatz.
+
+    `load()` liest nur die Partitionen (Sensor × Monat), die das Zeitfenster
+    schneiden, und nur die angefragten Spalten. Gelesene Partitionen werden
+    memory-mapped geöffnet und als Arrow-Tabellen gecacht.
+    """
+
+    def __init__(self, root=DEFAULT_DATA_DIR, cache_bytes=256 * 1024 ** 2):
+        self.root = root
+        self.cache = _LRUCache(cache_bytes)
+
+    def exists(self):
+        return os.path.isdir(self.root) and bool(self.sensors())
+
+    def sensors(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d.split("=", 1)[1] for d in os.listdir(self.root) if d.startswith("sensor_id="))
+
+    def months(self, sensor):
+        path = os.path.join(self.root, f"sensor_id={sensor}")
+        return sorted(d.split("=", 1)[1] for d in os.listdir(path) if d.startswith("month="))
+
+    def time_range(self, sensor=None):
+        """Erster und letzter Zeitstempel (liest nur die Rand-Partitionen)."""
+        sensor = sensor or self.sensors()[0]
+        months = self.months(sensor)
+        first = self._read_partition(sensor, months[0], ("ds",))
+        last = self._read_partition(sensor, months[-1], ("ds",))
+        return (pd.Timestamp(pc.min(first["ds"]).as_py()), pd.Timestamp(pc.max(last["ds"]).as_py()))
+
+    def _read_partition(self, sensor, month, columns):
+        key = (sensor, month, columns)
+        table = self.cache.get(key)
+        if table is None:
+            path = os.path.join(self.root, f"sensor_id={sensor}", f"month={month}")
+            table = pq.read_table(path, columns=list(columns), memory_map=True)
+            self.cache.put(key, table)
+        return table
+
+    def load_table(self, sensors=None, start=None, end=None, columns=None):
+        """Lädt ein Zeitfenster als Arrow-Tabelle (mit Spalte `sensor_id`)."""
+        if sensors is None:
+            sensors = self.sensors()
+        elif isinstance(sensors, str):
+            sensors = [sensors]
+        columns = tuple(dict.fromkeys(["ds"] + list(columns or COLUMNS)))
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+        lo = start.strftime("%Y-%m") if start is not None else None
+        hi = end.strftime("%Y-%m") if end is not None else None
+
+        tables = []
+        for sensor in sensors:
+            for month in self.months(sensor):
+                # Partition Pruning: Monate außerhalb des Fensters gar nicht öffnen
+                if (lo and month < lo) or (hi and month > hi):
+                    continue
+                table = self._read_partition(sensor, month, columns)
+                # Zeilenfilter nur für angeschnittene Randmonate
+                if (lo and month == lo) or (hi and month == hi):
+                    mask = None
+                    if start is not None:
+                        mask = pc.greater_equal(table["ds"], pa.scalar(start.to_pydatetime(), table["ds"].type))
+                    if end is not None:
+                        m = pc.less_equal(table["ds"], pa.scalar(end.to_pydatetime(), table["ds"].type))
+                        mask = m if mask is None else pc.and_(mask, m)
+                    table = table.filter(mask)
+                tables.append(table.append_column("sensor_id", pa.array([sensor] * table.num_rows)))
+        if not tables:
+            return pa.table({c: [] for c in ("sensor_id",) + columns})
+        return pa.concat_tables(tables)
+
+    def load(self, sensors=None, start=None, end=None, columns=None):
+        """
+        Lädt ein Zeitfenster als pandas DataFrame.
+
+        Bei genau einem Sensor wird die Spalte `sensor_id` weggelassen, damit
+        das Ergebnis dasselbe Format wie `generate_sample_data()` hat.
+        """
+        table = self.load_table(sensors, start, end, columns)
+        df = table.to_pandas()
+        if isinstance(sensors, str):
+            df = df.drop(columns="sensor_id")
+        return df.reset_index(drop=True)
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def benchmark(root, n_sensors=200, years=2, regenerate=False):
+    end = pd.Timestamp("2023-01-01") + pd.DateOffset(years=years) - pd.Timedelta(hours=1)
+    if regenerate or not os.path.isdir(root):
+        t0 = time.perf_counter()
+        write_synthetic_dataset(root, n_sensors=n_sensors, start="2023-01-01", end=end)
+        rows = n_sensors * len(pd.date_range("2023-01-01", end, freq="h"))
+        print(f"Geschrieben: {rows:,} Zeilen in {time.perf_counter() - t0:.1f}s -> {root}")
+
+    store = TrafficStore(root)
+    sensor = store.sensors()[0]
+    window_end = store.time_range(sensor)[1]
+
+    def timed(label, **kwargs):
+        t0 = time.perf_counter()
+        df = store.load(**kwargs)
+        print(f"{label:<45} {len(df):>10,} Zeilen {1000 * (time.perf_counter() - t0):>9.1f} ms")
+
+    print(f"\n{'Abfrage':<45} {'Ergebnis':>16} {'Zeit':>12}")
+    timed("1 Sensor, 14 Tage (kalt)", sensors=sensor, start=window_end - pd.Timedelta(days=14), end=window_end)
+    timed("1 Sensor, 14 Tage (Cache)", sensors=sensor, start=window_end - pd.Timedelta(days=14), end=window_end)
+    timed("1 Sensor, gesamte Historie, nur y", sensors=sensor, columns=["y"])
+    timed("10 Sensoren, 1 Monat", sensors=store.sensors()[:10],
+          start=window_end - pd.DateOffset(months=1), end=window_end)
+    timed("alle Sensoren, 1 Tag, nur y", start=window_end - pd.Timedelta(days=1), end=window_end, columns=["y"])
+    print(f"\nCache: {store.cache.hits} Treffer, {store.cache.misses} Fehlzugriffe, "
+          f"{store.cache.nbytes / 1024 ** 2:.1f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthetische Verkehrsdaten erzeugen und Ladezeiten messen")
+    parser.add_argument("--root", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--sensors", type=int, default=200)
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--regenerate", action="store_true")
+    args = parser.parse_args()
+    benchmark(args.root, args.sensors, args.years, args.regenerate)
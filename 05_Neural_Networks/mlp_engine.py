@@ -0,0 +1,397 @@
+"""
+🧠 NumPy-MLP - Mehrschichtiges Perzeptron von Grund auf
+
+Forward- und Backward-Pass laufen als Matrixmultiplikationen auf ganzen
+Mini-Batches. Alle Zwischenergebnisse (Aktivierungen, Deltas, Gradienten,
+Optimizer-Zustand) liegen in float32-Puffern, die einmal pro Netz angelegt
+und danach nur noch überschrieben werden.
+
+`fit_iter()` ist ein Generator, der nach jeder Epoche den Loss liefert —
+so kann eine Streamlit-App Lernkurve und Entscheidungsgrenze live zeichnen.
+
+Vergleich mit scikit-learn (Genauigkeit und Laufzeit)::
+
+    python mlp_engine.py
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+# ============================================================================
+# Aktivierungsfunktionen (in-place) und ihre Ableitungen über die Ausgabe
+# ============================================================================
+
+def _relu(z):
+    np.maximum(z, 0, out=z)
+
+
+def _tanh(z):
+    np.tanh(z, out=z)
+
+
+def _logistic(z):
+    np.clip(z, -80, 80, out=z)  # exp(88) läuft in float32 über
+    np.negative(z, out=z)
+    np.exp(z, out=z)
+    z += 1
+    np.reciprocal(z, out=z)
+
+
+def _relu_grad(a, delta):
+    delta[a <= 0] = 0
+
+
+def _tanh_grad(a, delta):
+    delta *= 1 - a * a
+
+
+def _logistic_grad(a, delta):
+    delta *= a * (1 - a)
+
+
+ACTIVATIONS = {
+    "relu": (_relu, _relu_grad),
+    "tanh": (_tanh, _tanh_grad),
+    "logistic": (_logistic, _logistic_grad),
+}
+
+
+# ============================================================================
+# Optimizer
+# ============================================================================
+
+class SGD:
+    """Stochastischer Gradientenabstieg mit (Nesterov-)Momentum."""
+
+    def __init__(self, params, learning_rate=0.001, momentum=0.9, nesterov=True):
+        self.params = params
+        self.learning_rate = learning_rate
+        self.momentum = momentum
+        self.nesterov = nesterov
+        self.velocities = [np.zeros_like(p) for p in params]
+
+    def step(self, grads):
+        lr, mu = self.learning_rate, self.momentum
+        for p, g, v in zip(self.params, grads, self.velocities):
+            v *= mu
+            v -= lr * g
+            if self.nesterov:
+                p += mu * v
+                p -= lr * g
+            else:
+                p += v
+
+
+class Adam:
+    """Adam mit Bias-Korrektur (Kingma & Ba, 2014)."""
+
+    def __init__(self, params, learning_rate=0.001, beta_1=0.9, beta_2=0.999, epsilon=1e-8):
+        self.params = params
+        self.learning_rate = learning_rate
+        self.beta_1, self.beta_2, self.epsilon = beta_1, beta_2, epsilon
+        self.t = 0
+        self.ms = [np.zeros_like(p) for p in params]
+        self.vs = [np.zeros_like(p) for p in params]
+        self._tmp = [np.empty_like(p) for p in params]
+
+    def step(self, grads):
+        self.t += 1
+        b1, b2 = self.beta_1, self.beta_2
+        lr = self.learning_rate * np.sqrt(1 - b2 ** self.t) / (1 - b1 ** self.t)
+        for p, g, m, v, tmp in zip(self.params, grads, self.ms, self.vs, self._tmp):
+            m *= b1
+            m += (1 - b1) * g
+            v *= b2
+            np.multiply(g, g, out=tmp)
+            tmp *= 1 - b2
+            v += tmp
+            np.sqrt(v, out=tmp)
+            tmp += self.epsilon
+            np.divide(m, tmp, out=tmp)
+            tmp *= lr
+            p -= tmp
+
+
+OPTIMIZERS = {"sgd": SGD, "adam": Adam}
+
+
+# ============================================================================
+# Netz
+# ============================================================================
+
+class NumpyMLP:
+    """
+    MLP mit Mini-Batch-Training in vorallokierten float32-Puffern.
+
+    Parameter und Standardwerte folgen `sklearn.neural_network.MLPRegressor`
+    bzw. `MLPClassifier` (Glorot-Initialisierung, L2-Strafe `alpha`, Abbruch
+    nach `n_iter_no_change` Epochen ohne Verbesserung um `tol`).
+    """
+
+    def __init__(self, hidden_layer_sizes=(100,), activation="relu", solver="adam",
+                 learning_rate_init=0.001, max_iter=200, batch_size=200, alpha=1e-4,
+                 tol=1e-4, n_iter_no_change=10, momentum=0.9, shuffle=True, random_state=None,
+                 warm_start=False):
+        self.hidden_layer_sizes = tuple(hidden_layer_sizes)
+        self.activation = activation
+        self.solver = solver
+        self.learning_rate_init = learning_rate_init
+        self.max_iter = max_iter
+        self.batch_size = batch_size
+        self.alpha = alpha
+        self.tol = tol
+        self.n_iter_no_change = n_iter_no_change
+        self.momentum = momentum
+        self.shuffle = shuffle
+        self.random_state = random_state
+        self.warm_start = warm_start
+
+    # ------------------------------------------------------------------
+    # Aufbau
+    # ------------------------------------------------------------------
+
+    def _initialize(self, n_features, n_outputs, n_samples):
+        self._rng = np.random.default_rng(self.random_state)
+        sizes = [n_features, *self.hidden_layer_sizes, n_outputs]
+        # Glorot-uniform wie in scikit-learn (Faktor 2 für logistic)
+        factor = 2.0 if self.activation == "logistic" else 6.0
+        self.coefs_, self.intercepts_ = [], []
+        for fan_in, fan_out in zip(sizes[:-1], sizes[1:]):
+            bound = np.sqrt(factor / (fan_in + fan_out))
+            self.coefs_.append(self._rng.uniform(-bound, bound, (fan_in, fan_out)).astype(np.float32))
+            self.intercepts_.append(self._rng.uniform(-bound, bound, fan_out).astype(np.float32))
+
+        batch = min(self.batch_size, n_samples)
+        self._acts = [np.empty((batch, n), np.float32) for n in sizes]
+        self._deltas = [np.empty((batch, n), np.float32) for n in sizes[1:]]
+        self._coef_grads = [np.empty_like(w) for w in self.coefs_]
+        self._intercept_grads = [np.empty_like(b) for b in self.intercepts_]
+        self._target = np.empty((batch, n_outputs), np.float32)
+        self._optimizer = OPTIMIZERS[self.solver](self.coefs_ + self.intercepts_, self.learning_rate_init)
+        self.loss_curve_ = []
+        self.best_loss_ = np.inf
+        self._no_improvement = 0
+        self.n_iter_ = 0
+        self.converged_ = False
+
+    def _forward(self, m):
+        """Forward-Pass für die ersten `m` Zeilen von `self._acts[0]`."""
+        hidden, _ = ACTIVATIONS[self.activation]
+        last = len(self.coefs_) - 1
+        for i, (w, b) in enumerate(zip(self.coefs_, self.intercepts_)):
+            z = self._acts[i + 1][:m]
+            np.matmul(self._acts[i][:m], w, out=z)
+            z += b
+            if i < last:
+                hidden(z)
+        self._output_activation(self._acts[-1][:m])
+        return self._acts[-1][:m]
+
+    def _backward(self, m):
+        """Gradienten für den Batch nach einem `_forward(m)`; Ziel steht in `self._target`."""
+        _, hidden_grad = ACTIVATIONS[self.activation]
+        out, target = self._acts[-1][:m], self._target[:m]
+        delta = self._deltas[-1][:m]
+        # Für identity+MSE, logistic+Log-Loss und Softmax+Kreuzentropie gilt dL/dz = p - y
+        np.subtract(out, target, out=delta)
+        delta /= m
+        scale = self.alpha / m
+        for i in range(len(self.coefs_) - 1, -1, -1):
+            np.matmul(self._acts[i][:m].T, delta, out=self._coef_grads[i])
+            self._coef_grads[i] += scale * self.coefs_[i]
+            np.sum(delta, axis=0, out=self._intercept_grads[i])
+            if i > 0:
+                prev = self._deltas[i - 1][:m]
+                np.matmul(delta, self.coefs_[i].T, out=prev)
+                hidden_grad(self._acts[i][:m], prev)
+                delta = prev
+
+    # ------------------------------------------------------------------
+    # Training
+    # ------------------------------------------------------------------
+
+    def fit_iter(self, X, y, max_iter=None):
+        """
+        Trainiert epochenweise und liefert nach jeder Epoche ein Dict mit
+        `epoch`, `loss` und `seconds` (Dauer der Epoche).
+
+        Der Generator endet bei Konvergenz, nach insgesamt `max_iter`
+        Epochen oder wenn der Loss nicht mehr endlich ist. Mit
+        `warm_start=True` geht ein bereits trainiertes Netz samt
+        Optimizer-Zustand ab Epoche `n_iter_ + 1` weiter.
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        Y = self._encode_target(y)
+        n = X.shape[0]
+        if not (self.warm_start and hasattr(self, "coefs_")):
+            self._initialize(X.shape[1], Y.shape[1], n)
+        else:
+            self.converged_ = False
+            self._no_improvement = 0
+        batch = self._acts[0].shape[0]
+        order = np.arange(n)
+
+        while self.n_iter_ < (max_iter or self.max_iter):
+            t0 = time.perf_counter()
+            if self.shuffle:
+                self._rng.shuffle(order)
+            total = 0.0
+            for start in range(0, n, batch):
+                idx = order[start:start + batch]
+                m = len(idx)
+                np.take(X, idx, axis=0, out=self._acts[0][:m])
+                np.take(Y, idx, axis=0, out=self._target[:m])
+                out = self._forward(m)
+                total += self._loss(out, self._target[:m]) * m
+                self._backward(m)
+                self._optimizer.step(self._coef_grads + self._intercept_grads)
+
+            penalty = 0.5 * self.alpha * sum(float(np.vdot(w, w)) for w in self.coefs_) / n
+            loss = total / n + penalty
+            self.n_iter_ += 1
+            self.loss_curve_.append(loss)
+            yield {"epoch": self.n_iter_, "loss": loss, "seconds": time.perf_counter() - t0}
+
+            if not np.isfinite(loss):
+                self.converged_ = True
+                break
+            # Abbruchkriterium wie scikit-learn: n_iter_no_change Epochen ohne Verbesserung um tol
+            if loss > self.best_loss_ - self.tol:
+                self._no_improvement += 1
+            else:
+                self._no_improvement = 0
+            self.best_loss_ = min(self.best_loss_, loss)
+            if self._no_improvement >= self.n_iter_no_change:
+                self.converged_ = True
+                break
+
+    def fit(self, X, y):
+        for _ in self.fit_iter(X, y):
+            pass
+        return self
+
+    def _predict_raw(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        hidden, _ = ACTIVATIONS[self.activation]
+        a = X
+        for i, (w, b) in enumerate(zip(self.coefs_, self.intercepts_)):
+            a = a @ w
+            a += b
+            if i < len(self.coefs_) - 1:
+                hidden(a)
+        self._output_activation(a)
+        return a
+
+
+class NumpyMLPRegressor(NumpyMLP):
+    """Regression mit linearer Ausgabe und quadratischem Loss (½·MSE wie scikit-learn)."""
+
+    def _encode_target(self, y):
+        y = np.asarray(y, dtype=np.float32)
+        return np.ascontiguousarray(y.reshape(len(y), -1))
+
+    def _output_activation(self, z):
+        pass
+
+    def _loss(self, out, target):
+        diff = out - target
+        return 0.5 * float(np.vdot(diff, diff)) / len(out)
+
+    def predict(self, X):
+        out = self._predict_raw(X)
+        return out.ravel() if out.shape[1] == 1 else out
+
+    def score(self, X, y):
+        """Bestimmtheitsmaß R²."""
+        y = np.asarray(y, dtype=np.float64)
+        residual = ((y - self.predict(X)) ** 2).sum()
+        return 1 - residual / ((y - y.mean()) ** 2).sum()
+
+
+class NumpyMLPClassifier(NumpyMLP):
+    """Klassifikation: logistische Ausgabe für zwei Klassen, sonst Softmax."""
+
+    def _encode_target(self, y):
+        self.classes_, codes = np.unique(np.asarray(y), return_inverse=True)
+        if len(self.classes_) == 2:
+            return codes.astype(np.float32).reshape(-1, 1)
+        return np.eye(len(self.classes_), dtype=np.float32)[codes]
+
+    def _output_activation(self, z):
+        if z.shape[1] == 1:
+            _logistic(z)
+        else:
+            z -= z.max(axis=1, keepdims=True)
+            np.exp(z, out=z)
+            z /= z.sum(axis=1, keepdims=True)
+
+    def _loss(self, out, target):
+        p = np.clip(out, 1e-7, 1 - 1e-7)
+        if out.shape[1] == 1:
+            return -float(np.sum(target * np.log(p) + (1 - target) * np.log1p(-p))) / len(out)
+        return -float(np.sum(target * np.log(p))) / len(out)
+
+    def predict_proba(self, X):
+        out = self._predict_raw(X)
+        return np.hstack([1 - out, out]) if out.shape[1] == 1 else out
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def score(self, X, y):
+        return float(np.mean(self.predict(X) == np.asarray(y)))
+
+
+# ============================================================================
+# Vergleich mit scikit-learn
+# ============================================================================
+
+def benchmark(hidden=(10, 20), max_iter=500, repeats=3):
+    import warnings
+
+    from sklearn.datasets import make_classification, make_regression
+    from sklearn.exceptions import ConvergenceWarning
+    from sklearn.model_selection import train_test_split
+    from sklearn.neural_network import MLPClassifier, MLPRegressor
+    from sklearn.preprocessing import StandardScaler
+
+    warnings.filterwarnings("ignore", category=ConvergenceWarning)
+    problems = {
+        "Regression": (make_regression(n_samples=300, n_features=1, noise=15, random_state=42),
+                       MLPRegressor, NumpyMLPRegressor),
+        "Klassifikation": (make_classification(n_samples=300, n_features=2, n_redundant=0, n_informative=2,
+                                               n_clusters_per_class=1, random_state=42),
+                           MLPClassifier, NumpyMLPClassifier),
+        "Klassifikation (3 Klassen)": (make_classification(n_samples=1000, n_features=2, n_redundant=0,
+                                                           n_informative=2, n_clusters_per_class=1,
+                                                           n_classes=3, random_state=42),
+                                       MLPClassifier, NumpyMLPClassifier),
+    }
+    print(f"Architektur {hidden}, max_iter={max_iter}, bestes von {repeats} Läufen")
+    for name, ((X, y), sk_cls, np_cls) in problems.items():
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        scaler = StandardScaler().fit(X_train)
+        X_train, X_test = scaler.transform(X_train), scaler.transform(X_test)
+        if sk_cls is MLPRegressor:
+            mu, sd = y_train.mean(), y_train.std()
+            y_train, y_test = (y_train - mu) / sd, (y_test - mu) / sd
+        for label, cls in [("scikit-learn", sk_cls), ("NumPy-MLP", np_cls)]:
+            times = []
+            for _ in range(repeats):
+                model = cls(hidden_layer_sizes=hidden, learning_rate_init=0.01, max_iter=max_iter, random_state=42)
+                t0 = time.perf_counter()
+                model.fit(X_train, y_train)
+                times.append(time.perf_counter() - t0)
+            metric = "R²" if sk_cls is MLPRegressor else "Accuracy"
+            print(f"{name:<28} {label:<13} {metric} {model.score(X_test, y_test):6.3f}  "
+                  f"Epochen {model.n_iter_:4d}  Zeit {1000 * min(times):7.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="NumPy-MLP vs. scikit-learn")
+    parser.add_argument("--hidden", type=int, nargs="+", default=[10, 20])
+    parser.add_argument("--max-iter", type=int, default=500)
+    args = parser.parse_args()
+    benchmark(tuple(args.hidden), args.max_iter)
@@ -0,0 +1,104 @@
+"""
+💾 Modell-Cache für den Neural Network Playground
+
+Trainierte Netze werden unter einem Schlüssel aus Datensatz-Parametern und
+Architektur (Layer, Aktivierung, Optimizer, Learning Rate) abgelegt — im
+Speicher und zusätzlich als Pickle auf der Platte, damit sie einen Neustart
+der App überleben. Beide Ebenen verdrängen den am längsten nicht genutzten
+Eintrag (LRU).
+
+`max_iter` ist bewusst nicht Teil des Schlüssels: Ein Netz, das mit 500
+Epochen trainiert wurde, ist der Startpunkt für denselben Lauf mit 1000
+Epochen (Warm Start).
+"""
+
+import copy
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "NN_PLAYGROUND_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".model_cache"))
+
+
+def config_key(config):
+    """Stabiler Schlüssel für ein Dict aus JSON-serialisierbaren Werten."""
+    payload = json.dumps(config, sort_keys=True, default=list)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class ModelCache:
+    """LRU-Cache für trainierte Modelle (Speicher + Verzeichnis auf der Platte)."""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_memory=32, max_disk=256):
+        self.directory = directory
+        self.max_memory = max_memory
+        self.max_disk = max_disk
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key):
+        """Kopie des gecachten Modells oder None (Aufrufer dürfen es weitertrainieren)."""
+        with self._lock:
+            model = self._memory.get(key)
+            if model is not None:
+                self._memory.move_to_end(key)
+                return copy.deepcopy(model)
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                model = pickle.load(f)
+            os.utime(path)  # Zugriffszeit für die LRU-Verdrängung auf der Platte
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        self._remember(key, model)
+        return copy.deepcopy(model)
+
+    def put(self, key, model):
+        model = copy.deepcopy(model)
+        self._remember(key, model)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = self._path(key) + ".tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+            self._evict_disk()
+        except OSError:
+            pass  # Schreibgeschützte Umgebung: nur der Speicher-Cache ist aktiv
+
+    def _remember(self, key, model):
+        with self._lock:
+            self._memory[key] = model
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory:
+                self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        entries = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                   if name.endswith(".pkl")]
+        if len(entries) <= self.max_disk:
+            return
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:len(entries) - self.max_disk]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(".pkl"):
+                    os.remove(os.path.join(self.directory, name))
+
+    def __len__(self):
+        return len(self._memory)
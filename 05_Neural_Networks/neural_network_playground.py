@@ -11,6 +11,14 @@ from sklearn.neural_network import MLPRegressor, MLPClassifier
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score, mean_squared_error, confusion_matrix
 import seaborn as sns
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from amalea_viz.boundary import adaptive_grid, decision_surface
+from mlp_engine import NumpyMLPClassifier, NumpyMLPRegressor
+from model_cache import ModelCache, config_key
+from sweep import SweepRun, sweep_grid
 
 # 🎯 Streamlit App Configuration
 st.set_page_config(
@@ -29,9 +37,55 @@ st.sidebar.title("🎛️ Navigation")
 app_mode = st.sidebar.selectbox(
     "Wähle einen Bereich:",
     ["🧠 Einfachstes Neuron", "📈 Aktivierungsfunktionen", "🎯 Regression Demo", 
-     "🏷️ Klassifikation Demo", "🎮 Interaktiver Playground"]
+     "🏷️ Klassifikation Demo", "🎮 Interaktiver Playground", "🧪 Architektur-Sweep"]
 )
 
+# ============================================================================
+# 💾 Caches - überleben Streamlit-Reruns
+# ============================================================================
+
+# Datensatz-Parameter des Playgrounds (Teil des Modell-Schlüssels)
+PLAYGROUND_DATA = {
+    "Regression": dict(n_samples=300, n_features=1, noise=15, random_state=42),
+    "Classification": dict(n_samples=300, n_features=2, n_redundant=0, n_informative=2,
+                           n_clusters_per_class=1, random_state=42),
+}
+
+
+@st.cache_data
+def playground_data(problem_type):
+    """Erzeugt, teilt und skaliert den Playground-Datensatz einmal pro Problemtyp."""
+    params = PLAYGROUND_DATA[problem_type]
+    if problem_type == "Regression":
+        X, y = make_regression(**params)
+    else:
+        X, y = make_classification(**params)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    data = dict(X=X, y=y, X_train=X_train, X_test=X_test, y_train=y_train, y_test=y_test)
+    
+    scaler_X = StandardScaler()
+    data["X_train_scaled"] = scaler_X.fit_transform(X_train)
+    data["X_test_scaled"] = scaler_X.transform(X_test)
+    if problem_type == "Regression":
+        scaler_y = StandardScaler()
+        data["y_train_scaled"] = scaler_y.fit_transform(y_train.reshape(-1, 1)).ravel()
+        data.update(scaler_X=scaler_X, scaler_y=scaler_y)
+    else:
+        data["scaler"] = scaler_X
+    return data
+
+
+@st.cache_resource
+def get_model_cache():
+    # Speicher-LRU pro Server-Prozess, darunter Pickles im Cache-Verzeichnis
+    return ModelCache()
+
+
+@st.cache_resource
+def get_sweep_pool():
+    # Ein Prozess-Pool pro Server; laufende Sweeps überleben Reruns
+    return ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+
 # ============================================================================
 # 🧠 BEREICH 1: Einfachstes Neuron (aus AMALEA "Jetzt geht's in die Tiefe")
 # ============================================================================
@@ -328,25 +382,20 @@ elif app_mode == "🏷️ Klassifikation Demo":
                 nn_clf.fit(X_train_scaled, y_train)
                 y_pred = nn_clf.predict(X_test_scaled)
             
-            # Entscheidungsgrenze visualisieren
+            # Entscheidungsgrenze visualisieren (adaptiv: nur entlang der Grenze fein auswerten)
             h = 0.02
             x_min, x_max = X_viz[:, 0].min() - 1, X_viz[:, 0].max() + 1
             y_min, y_max = X_viz[:, 1].min() - 1, X_viz[:, 1].max() + 1
-            xx, yy = np.meshgrid(np.arange(x_min, x_max, h),
-                               np.arange(y_min, y_max, h))
-            
-            mesh_points = np.c_[xx.ravel(), yy.ravel()]
-            mesh_points_scaled = scaler.transform(mesh_points)
-            Z = nn_clf.predict(mesh_points_scaled)
-            Z = Z.reshape(xx.shape)
+            grid_x, grid_y, Z, _ = decision_surface(nn_clf, (x_min, x_max), (y_min, y_max), h,
+                                                    method="predict", transform=scaler.transform)
             
             # Plot erstellen
             fig = go.Figure()
             
             # Entscheidungsgrenze
             fig.add_trace(go.Contour(
-                x=np.arange(x_min, x_max, h),
-                y=np.arange(y_min, y_max, h),
+                x=grid_x,
+                y=grid_y,
                 z=Z,
                 showscale=False,
                 opacity=0.3,
@@ -383,6 +432,96 @@ elif app_mode == "🏷️ Klassifikation Demo":
                              title="Confusion Matrix")
             st.plotly_chart(fig_cm, use_container_width=True)
 
+# ============================================================================
+# 🧪 BEREICH 6: Architektur-Sweep
+# ============================================================================
+
+elif app_mode == "🧪 Architektur-Sweep":
+    st.header("🧪 Architektur-Sweep")
+    st.markdown("**Viele Architekturen gleichzeitig trainieren und vergleichen**")
+    
+    col1, col2 = st.columns([1, 2])
+    
+    with col1:
+        st.subheader("🧩 Raster")
+        problem_type = st.radio("Problem Type", ["Classification", "Regression"])
+        layer_counts = st.multiselect("Anzahl Hidden Layers", [1, 2, 3, 4], default=[1, 2])
+        widths = st.multiselect("Neuronen pro Layer", [4, 8, 16, 32, 64, 128], default=[8, 32])
+        activations = st.multiselect("Aktivierungen", ['relu', 'tanh', 'logistic'], default=['relu', 'tanh'])
+        learning_rates = st.multiselect("Learning Rates", [0.001, 0.01, 0.1], default=[0.001, 0.01])
+        solver = st.selectbox("Optimizer", ["adam", "sgd"])
+        
+        st.subheader("⏱️ Limits")
+        max_iter = st.slider("Max Iterations", 100, 2000, 500)
+        time_limit = st.slider("Zeitlimit pro Konfiguration (s)", 1, 60, 10)
+        
+        configs = sweep_grid(layer_counts, widths, activations, learning_rates, solver)
+        st.info(f"🔢 **{len(configs)} Konfigurationen** auf {os.cpu_count() or 1} Prozessen")
+        
+        start_sweep = st.button("🚀 Sweep starten!", disabled=not configs)
+        if st.button("⏹️ Abbrechen") and "sweep_run" in st.session_state:
+            st.session_state.sweep_run.cancel()
+    
+    with col2:
+        if start_sweep:
+            if "sweep_run" in st.session_state:
+                st.session_state.sweep_run.cancel()
+            data = playground_data(problem_type)
+            sweep_data = {"task": problem_type, "X_train": data["X_train_scaled"],
+                          "X_test": data["X_test_scaled"]}
+            if problem_type == "Regression":
+                mean, std = data["scaler_y"].mean_[0], data["scaler_y"].scale_[0]
+                sweep_data.update(y_train=data["y_train_scaled"], y_test=(data["y_test"] - mean) / std,
+                                  y_scale=(mean, std))
+            else:
+                sweep_data.update(y_train=data["y_train"], y_test=data["y_test"])
+            # Der Sweep liegt im Session State: Reruns zeigen den bisherigen Stand weiter an
+            st.session_state.sweep_run = SweepRun(get_sweep_pool(), configs, sweep_data, time_limit, max_iter)
+            st.session_state.sweep_task = problem_type
+        
+        if "sweep_run" not in st.session_state:
+            st.info("👈 Raster wählen und Sweep starten")
+        else:
+            run = st.session_state.sweep_run
+            metric = "MSE" if st.session_state.sweep_task == "Regression" else "Accuracy"
+            progress_bar = st.progress(0.0)
+            board = st.empty()
+            chart = st.empty()
+            
+            def draw_leaderboard():
+                progress_bar.progress(run.n_done / len(run.configs),
+                                      text=f"{run.n_done}/{len(run.configs)} fertig nach {run.elapsed:.1f} s")
+                if not run.results:
+                    return
+                df = pd.DataFrame(run.results)
+                df["hidden_layers"] = df["hidden_layers"].astype(str)
+                if metric in df:
+                    df = df.sort_values(metric, ascending=metric == "MSE")
+                board.dataframe(df.rename(columns={"hidden_layers": "Layers", "activation": "Aktivierung",
+                                                   "learning_rate": "Learning Rate", "solver": "Optimizer"}),
+                                use_container_width=True, hide_index=True)
+                if metric in df:
+                    fig = px.scatter(df, x="Trainingszeit (s)", y=metric, color="activation",
+                                     symbol="hidden_layers", hover_data=["learning_rate", "Epochen", "Status"],
+                                     title=f"{metric} vs. Trainingszeit")
+                    chart.plotly_chart(fig, use_container_width=True)
+            
+            # Fertige Jobs einsammeln, bis alle durch sind (ein Rerun setzt hier einfach wieder an)
+            run.poll()
+            draw_leaderboard()
+            while not run.done:
+                time.sleep(0.3)
+                if run.poll():
+                    draw_leaderboard()
+            if run.poll():
+                draw_leaderboard()
+            
+            if run.results and metric in pd.DataFrame(run.results):
+                best = pd.DataFrame(run.results).sort_values(metric, ascending=metric == "MSE").iloc[0]
+                value = f"{best[metric]:.2%}" if metric == "Accuracy" else f"{best[metric]:.2f}"
+                st.success(f"🏆 Beste Architektur: **{best['hidden_layers']}**, {best['activation']}, "
+                           f"LR {best['learning_rate']} → {metric} **{value}**")
+
 # ============================================================================
 # 🎮 BEREICH 5: Interaktiver Playground
 # ============================================================================
@@ -411,6 +550,7 @@ else:  # Interaktiver Playground
         # Trainings-Parameter
         st.subheader("🎯 Training")
         learning_rate = st.select_slider("Learning Rate", [0.001, 0.01, 0.1, 1.0])
+        solver = st.selectbox("Optimizer", ["adam", "sgd"])
         max_iter = st.slider("Max Iterations", 100, 2000, 500)
         
         # Problem Type
@@ -422,95 +562,118 @@ else:  # Interaktiver Playground
         st.subheader("🎯 Live Training")
         
         if st.button("🚀 Starte Training!"):
+            # Daten und Skalierung sind pro Problemtyp fest und kommen aus dem Cache
+            data = playground_data(problem_type)
+            X, y = data["X"], data["y"]
+            X_train, X_test, y_train, y_test = data["X_train"], data["X_test"], data["y_train"], data["y_test"]
+            X_train_scaled, X_test_scaled = data["X_train_scaled"], data["X_test_scaled"]
+            
             if problem_type == "Regression":
-                # Regression Problem
-                X, y = make_regression(n_samples=300, n_features=1, noise=15, random_state=42)
-                X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-                
-                scaler_X = StandardScaler()
-                scaler_y = StandardScaler()
-                X_train_scaled = scaler_X.fit_transform(X_train)
-                X_test_scaled = scaler_X.transform(X_test)
-                y_train_scaled = scaler_y.fit_transform(y_train.reshape(-1, 1)).ravel()
+                scaler_X, scaler_y = data["scaler_X"], data["scaler_y"]
+                target = data["y_train_scaled"]
+                model_cls = NumpyMLPRegressor
+            else:
+                scaler = data["scaler"]
+                target = y_train
+                model_cls = NumpyMLPClassifier
                 
-                # Model
-                model = MLPRegressor(
+                # Bereich der Live-Entscheidungsgrenze
+                grid_xlim = (X[:, 0].min() - 1, X[:, 0].max() + 1)
+                grid_ylim = (X[:, 1].min() - 1, X[:, 1].max() + 1)
+            
+            # Gleiche Konfiguration schon trainiert? Dann weitertrainieren statt neu starten
+            model_cache = get_model_cache()
+            cache_key = config_key({
+                "problem_type": problem_type,
+                "data": PLAYGROUND_DATA[problem_type],
+                "hidden_layers": layers,
+                "activation": activation,
+                "solver": solver,
+                "learning_rate": learning_rate,
+                "random_state": 42,
+            })
+            model = model_cache.get(cache_key)
+            if model is None:
+                model = model_cls(
                     hidden_layer_sizes=tuple(layers),
                     activation=activation,
+                    solver=solver,
                     learning_rate_init=learning_rate,
                     max_iter=max_iter,
-                    random_state=42
+                    random_state=42,
+                    warm_start=True
                 )
+            cached_epochs = getattr(model, "n_iter_", 0)
+            model.max_iter = max_iter
+            needs_training = not getattr(model, "converged_", False) and cached_epochs < max_iter
+            
+            # Training mit echtem Fortschritt: eine Aktualisierung pro Epoche
+            progress_bar = st.progress(0)
+            status_text = st.empty()
+            loss_chart = st.empty()
+            live_chart = st.empty()
+            
+            def draw_live():
+                fig_loss = go.Figure(go.Scatter(y=model.loss_curve_, mode='lines', name='Loss'))
+                fig_loss.update_layout(title="Loss pro Epoche", xaxis_title="Epoche",
+                                       yaxis_title="Loss", height=300)
+                loss_chart.plotly_chart(fig_loss, use_container_width=True)
                 
-                # Training mit Progress
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                
-                model.fit(X_train_scaled, y_train_scaled)
-                progress_bar.progress(100)
-                status_text.text("Training completed!")
-                
-                # Vorhersagen
+                fig = go.Figure()
+                if problem_type == "Regression":
+                    x_line = np.linspace(X.min(), X.max(), 200).reshape(-1, 1)
+                    y_line = scaler_y.inverse_transform(
+                        model.predict(scaler_X.transform(x_line)).reshape(-1, 1)).ravel()
+                    fig.add_trace(go.Scatter(x=X_train.ravel(), y=y_train, mode='markers',
+                                             name='Training', opacity=0.5))
+                    fig.add_trace(go.Scatter(x=x_line.ravel(), y=y_line, mode='lines', name='Netz'))
+                    fig.update_layout(title="Regression (live)", height=400)
+                else:
+                    # Gleicher adaptiver Renderer wie oben, aber ohne Cache: das Modell ändert sich jede Epoche
+                    grid_x, grid_y, Z, _ = adaptive_grid(
+                        lambda p: model.predict_proba(scaler.transform(p))[:, 1],
+                        grid_xlim, grid_ylim, h=0.05, threshold=0.5)
+                    fig.add_trace(go.Contour(x=grid_x, y=grid_y, z=Z, showscale=False, opacity=0.4,
+                                             colorscale='RdBu', contours=dict(start=0, end=1, size=0.1)))
+                    colors = ['red', 'blue']
+                    for i in [0, 1]:
+                        mask = y_train == i
+                        fig.add_trace(go.Scatter(x=X_train[mask, 0], y=X_train[mask, 1], mode='markers',
+                                                 name=f'Class {i}', marker=dict(color=colors[i])))
+                    fig.update_layout(title="Entscheidungsgrenze (live)", height=400)
+                live_chart.plotly_chart(fig, use_container_width=True)
+            
+            last_draw, drawn_epoch = 0.0, None
+            if needs_training:
+                for step in model.fit_iter(X_train_scaled, target):
+                    progress_bar.progress(step["epoch"] / max_iter)
+                    status_text.text(f"Epoche {step['epoch']}/{max_iter} – Loss {step['loss']:.4f}")
+                    # Diagramme höchstens ~5× pro Sekunde neu zeichnen
+                    if time.perf_counter() - last_draw > 0.2:
+                        draw_live()
+                        last_draw, drawn_epoch = time.perf_counter(), step["epoch"]
+                model_cache.put(cache_key, model)
+            if drawn_epoch != model.n_iter_:
+                draw_live()
+            progress_bar.progress(1.0)
+            
+            if not np.isfinite(model.loss_curve_[-1]):
+                st.warning("⚠️ Loss divergiert – Learning Rate verkleinern!")
+            elif not needs_training:
+                status_text.text(f"💾 Aus dem Cache: {model.n_iter_} Epochen, Loss {model.loss_curve_[-1]:.4f}")
+            elif cached_epochs:
+                status_text.text(f"Training fortgesetzt ab Epoche {cached_epochs + 1}: "
+                                 f"{model.n_iter_} Epochen, Loss {model.loss_curve_[-1]:.4f}")
+            else:
+                status_text.text(f"Training completed! {model.n_iter_} Epochen, Loss {model.loss_curve_[-1]:.4f}")
+            
+            if problem_type == "Regression":
                 y_pred_scaled = model.predict(X_test_scaled)
                 y_pred = scaler_y.inverse_transform(y_pred_scaled.reshape(-1, 1)).ravel()
-                
-                # Plot
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(x=X_test.ravel(), y=y_test, mode='markers', name='True'))
-                fig.add_trace(go.Scatter(x=X_test.ravel(), y=y_pred, mode='markers', name='Predicted'))
-                fig.update_layout(title="Regression Results", height=400)
-                st.plotly_chart(fig, use_container_width=True)
-                
                 mse = mean_squared_error(y_test, y_pred)
                 st.metric("MSE", f"{mse:.2f}")
-                
             else:
-                # Classification Problem
-                X, y = make_classification(n_samples=300, n_features=2, n_redundant=0, 
-                                         n_informative=2, n_clusters_per_class=1, random_state=42)
-                X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-                
-                scaler = StandardScaler()
-                X_train_scaled = scaler.fit_transform(X_train)
-                X_test_scaled = scaler.transform(X_test)
-                
-                # Model
-                model = MLPClassifier(
-                    hidden_layer_sizes=tuple(layers),
-                    activation=activation,
-                    learning_rate_init=learning_rate,
-                    max_iter=max_iter,
-                    random_state=42
-                )
-                
-                # Training
-                progress_bar = st.progress(0)
-                model.fit(X_train_scaled, y_train)
-                progress_bar.progress(100)
-                
                 y_pred = model.predict(X_test_scaled)
-                
-                # Plot
-                fig = go.Figure()
-                colors = ['red', 'blue']
-                for i in [0, 1]:
-                    mask = y_test == i
-                    fig.add_trace(go.Scatter(
-                        x=X_test[mask, 0], y=X_test[mask, 1],
-                        mode='markers', name=f'Class {i} (True)',
-                        marker=dict(color=colors[i])
-                    ))
-                    
-                    mask_pred = y_pred == i
-                    fig.add_trace(go.Scatter(
-                        x=X_test[mask_pred, 0], y=X_test[mask_pred, 1],
-                        mode='markers', name=f'Class {i} (Pred)',
-                        marker=dict(color=colors[i], symbol='x', size=10)
-                    ))
-                
-                fig.update_layout(title="Classification Results", height=400)
-                st.plotly_chart(fig, use_container_width=True)
-                
                 accuracy = accuracy_score(y_test, y_pred)
                 st.metric("Accuracy", f"{accuracy:.2%}")
 
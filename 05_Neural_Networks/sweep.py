@@ -0,0 +1,155 @@
+"""
+🧪 Architektur-Sweep für den Neural Network Playground
+
+Ein Raster aus Layer-Anzahl, Breite, Aktivierung und Learning Rate wird in
+einem Prozess-Pool trainiert. Jeder Job hat ein Zeitlimit, das zwischen
+zwei Epochen geprüft wird; ein Job, der es überschreitet, liefert den
+bis dahin erreichten Stand.
+
+`SweepRun` hält die Futures eines Sweeps und sammelt fertige Ergebnisse bei
+jedem `poll()` ein. Das Objekt kann in `st.session_state` liegen: Die Jobs
+laufen im Pool weiter, auch wenn Streamlit das Skript neu startet.
+
+Laufzeitvergleich seriell vs. parallel::
+
+    python sweep.py --workers 4
+"""
+
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from mlp_engine import NumpyMLPClassifier, NumpyMLPRegressor
+
+
+def sweep_grid(layer_counts, widths, activations, learning_rates, solver="adam"):
+    """Alle Kombinationen als Liste von Konfigurations-Dicts (gleiche Breite in allen Layern)."""
+    return [
+        {"hidden_layers": (width,) * n_layers, "activation": activation,
+         "learning_rate": lr, "solver": solver}
+        for n_layers, width, activation, lr in itertools.product(layer_counts, widths, activations, learning_rates)
+    ]
+
+
+def train_config(config, data, time_limit=10.0, max_iter=500):
+    """
+    Trainiert eine Konfiguration (läuft im Worker-Prozess).
+
+    `data` enthält `X_train`, `y_train`, `X_test`, `y_test` (skaliert) und
+    `task` ("Regression"/"Classification"); für Regression zusätzlich
+    `y_scale` = (Mittelwert, Standardabweichung) zum Zurückrechnen.
+    """
+    regression = data["task"] == "Regression"
+    model_cls = NumpyMLPRegressor if regression else NumpyMLPClassifier
+    model = model_cls(hidden_layer_sizes=config["hidden_layers"], activation=config["activation"],
+                      solver=config["solver"], learning_rate_init=config["learning_rate"],
+                      max_iter=max_iter, random_state=42)
+
+    status = "fertig"
+    t0 = time.perf_counter()
+    for _ in model.fit_iter(data["X_train"], data["y_train"]):
+        if time.perf_counter() - t0 > time_limit:
+            status = "Zeitlimit"
+            break
+    train_time = time.perf_counter() - t0
+    if not np.isfinite(model.loss_curve_[-1]):
+        status = "divergiert"
+
+    result = {**config, "Status": status, "Epochen": model.n_iter_,
+              "Trainingszeit (s)": train_time, "Loss": model.loss_curve_[-1]}
+    if regression:
+        mean, std = data["y_scale"]
+        pred = model.predict(data["X_test"]) * std + mean
+        result["MSE"] = float(np.mean((pred - (data["y_test"] * std + mean)) ** 2))
+    else:
+        result["Accuracy"] = model.score(data["X_test"], data["y_test"])
+    return result
+
+
+class SweepRun:
+    """Laufender Sweep: Futures im Pool plus bereits eingesammelte Ergebnisse."""
+
+    def __init__(self, executor, configs, data, time_limit=10.0, max_iter=500):
+        self.configs = configs
+        self.started = time.perf_counter()
+        self.results = []
+        self._futures = [executor.submit(train_config, config, data, time_limit, max_iter)
+                         for config in configs]
+        self._collected = set()
+
+    def poll(self):
+        """Übernimmt fertige Jobs in `self.results` und gibt die neuen zurück."""
+        new = []
+        for i, future in enumerate(self._futures):
+            if i in self._collected or not future.done() or future.cancelled():
+                continue
+            self._collected.add(i)
+            try:
+                result = future.result()
+            except Exception as e:  # Absturz im Worker: als Zeile im Leaderboard zeigen
+                result = {**self.configs[i], "Status": f"Fehler: {type(e).__name__}"}
+            new.append(result)
+        self.results.extend(new)
+        return new
+
+    def cancel(self):
+        for future in self._futures:
+            future.cancel()
+
+    @property
+    def done(self):
+        return all(f.done() for f in self._futures)
+
+    @property
+    def n_done(self):
+        return sum(f.done() for f in self._futures)
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def benchmark(workers=None, time_limit=10.0):
+    from sklearn.datasets import make_classification
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+
+    X, y = make_classification(n_samples=300, n_features=2, n_redundant=0, n_informative=2,
+                               n_clusters_per_class=1, random_state=42)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    scaler = StandardScaler().fit(X_train)
+    data = {"task": "Classification", "X_train": scaler.transform(X_train), "y_train": y_train,
+            "X_test": scaler.transform(X_test), "y_test": y_test}
+    configs = sweep_grid([1, 2, 3], [16, 64], ["relu", "tanh"], [0.001, 0.01])
+    workers = workers or os.cpu_count() or 1
+    print(f"{len(configs)} Konfigurationen, {workers} Worker")
+
+    t0 = time.perf_counter()
+    for config in configs:
+        train_config(config, data, time_limit)
+    serial = time.perf_counter() - t0
+    print(f"seriell   {serial:6.2f} s")
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        t0 = time.perf_counter()
+        run = SweepRun(executor, configs, data, time_limit)
+        while not run.done:
+            time.sleep(0.05)
+        run.poll()
+        parallel = time.perf_counter() - t0
+    best = max(run.results, key=lambda r: r["Accuracy"])
+    print(f"parallel  {parallel:6.2f} s  (Faktor {serial / parallel:.1f})")
+    print(f"Beste Konfiguration: {best['hidden_layers']} {best['activation']} lr={best['learning_rate']} "
+          f"-> Accuracy {best['Accuracy']:.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Architektur-Sweep seriell vs. parallel")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--time-limit", type=float, default=10.0)
+    args = parser.parse_args()
+    benchmark(args.workers, args.time_limit)
@@ -1,6 +1,10 @@
 import streamlit as st
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.colors import LogNorm
+from optim_engine import OPTIMIZERS, lr_momentum_grid, run_batch
+from benchmarks import CATALOG, run_optimizer
+from surface_tiles import SurfaceTiles
 
 st.title("Unit 05: Optimierer im Vergleich")
 st.markdown("Vergleichen Sie **SGD**, **Momentum** und **Adam** auf einer schwierigen Fehlerlandschaft.")
@@ -15,92 +19,173 @@ gamma = st.sidebar.slider("Momentum (Gamma)", 0.0, 0.99, 0.9)
 
 st.sidebar.subheader("Landschaft")
 func_type = st.sidebar.selectbox("Funktion", ["Tal (Valley)", "Schüssel (Bowl)"])
+zoom = st.sidebar.checkbox("Auf die Pfade zoomen", value=False)
 
 # --- Funktionen ---
+# Gradienten arbeiten auf Positionen (n, 2): alle Läufe eines Batches auf einmal
 def get_function(name):
     if name == "Tal (Valley)":
         # x^2 + 10y^2 (Enges Tal)
         f = lambda x, y: x**2 + 10*y**2
-        grad = lambda x, y: np.array([2*x, 20*y])
+        grad = lambda P: P * np.array([2.0, 20.0])
         start = np.array([-8.0, 2.0])
         levels = 20
     else:
         # x^2 + y^2 (Einfache Schüssel)
         f = lambda x, y: x**2 + y**2
-        grad = lambda x, y: np.array([2*x, 2*y])
+        grad = lambda P: 2 * P
         start = np.array([-8.0, 6.0])
         levels = 15
     return f, grad, start, levels
 
 f, grad_f, start_pos, levels = get_function(func_type)
 
-# --- Optimierer Implementierung ---
-def run_sgd(start, lr, steps):
-    path = [start]
-    pos = start.copy()
-    for _ in range(steps):
-        g = grad_f(pos[0], pos[1])
-        pos = pos - lr * g
-        path.append(pos)
-    return np.array(path)
-
-def run_momentum(start, lr, steps, gamma):
-    path = [start]
-    pos = start.copy()
-    vel = np.zeros_like(pos)
-    for _ in range(steps):
-        g = grad_f(pos[0], pos[1])
-        vel = gamma * vel + lr * g
-        pos = pos - vel
-        path.append(pos)
-    return np.array(path)
-
-def run_adam(start, lr, steps, beta1=0.9, beta2=0.999, eps=1e-8):
-    path = [start]
-    pos = start.copy()
-    m = np.zeros_like(pos)
-    v = np.zeros_like(pos)
-    t = 0
-    for _ in range(steps):
-        t += 1
-        g = grad_f(pos[0], pos[1])
-        m = beta1 * m + (1 - beta1) * g
-        v = beta2 * v + (1 - beta2) * (g**2)
-        
-        m_hat = m / (1 - beta1**t)
-        v_hat = v / (1 - beta2**t)
-        
-        pos = pos - lr * m_hat / (np.sqrt(v_hat) + eps)
-        path.append(pos)
-    return np.array(path)
-
-# --- Berechnung ---
-path_sgd = run_sgd(start_pos, lr, steps)
-path_mom = run_momentum(start_pos, lr, steps, gamma)
-path_adam = run_adam(start_pos, lr, steps) # Adam braucht oft kleinere LR, aber wir nutzen hier dieselbe zum Vergleich
+# --- Berechnung: jeder Optimizer ist ein Batch mit einem Lauf ---
+path_sgd = run_batch(grad_f, start_pos, "sgd", lr, steps=steps)[:, 0]
+path_mom = run_batch(grad_f, start_pos, "momentum", lr, gamma, steps)[:, 0]
+path_adam = run_batch(grad_f, start_pos, "adam", lr, steps=steps)[:, 0] # Adam braucht oft kleinere LR, aber wir nutzen hier dieselbe zum Vergleich
 
 # --- Plotting ---
-x_range = np.linspace(-10, 10, 100)
-y_range = np.linspace(-5, 8, 100)
-X, Y = np.meshgrid(x_range, y_range)
-Z = f(X, Y)
+# Die Fläche hängt nur von Funktion und Ausschnitt ab: Kacheln einmal rechnen, danach nur noch den Pfad
+@st.cache_resource
+def get_surface_tiles():
+    return SurfaceTiles()
+
+def viewport(paths, margin=0.1, min_extent=0.5):
+    """Ausschnitt um alle (endlichen) Pfadpunkte, an der Gesamtansicht begrenzt."""
+    points = np.concatenate(paths)
+    points = points[np.isfinite(points).all(axis=1)]
+    lo, hi = points.min(axis=0), points.max(axis=0)
+    pad = np.maximum((hi - lo) * margin, min_extent / 2)
+    lo, hi = np.maximum(lo - pad, [-10, -5]), np.minimum(hi + pad, [10, 8])
+    return (lo[0], hi[0]), (lo[1], hi[1])
+
+if zoom:
+    xlim, ylim = viewport([path_sgd, path_mom, path_adam])
+else:
+    xlim, ylim = (-10, 10), (-5, 8)
+tiles = get_surface_tiles()
+x_range, y_range, Z = tiles.surface(func_type, f, xlim, ylim, resolution=100)
 
 fig, ax = plt.subplots(figsize=(10, 6))
-ax.contour(X, Y, Z, levels=levels, cmap='gray', alpha=0.4)
+ax.contour(x_range, y_range, Z, levels=levels, cmap='gray', alpha=0.4)
 
 ax.plot(path_sgd[:, 0], path_sgd[:, 1], 'o-', label='SGD', color='red', markersize=4, alpha=0.7)
 ax.plot(path_mom[:, 0], path_mom[:, 1], 'o-', label=f'Momentum (g={gamma})', color='blue', markersize=4, alpha=0.7)
 ax.plot(path_adam[:, 0], path_adam[:, 1], 'o-', label='Adam', color='green', markersize=4, alpha=0.7)
 
 ax.set_title(f"Optimierung auf {func_type}")
+if zoom:
+    ax.set_xlim(xlim)
+    ax.set_ylim(ylim)
 ax.legend()
 ax.grid(True, linestyle=':', alpha=0.3)
 
 st.pyplot(fig)
+st.caption(f"Fläche aus {len(tiles)} gecachten Kacheln (Stufe {tiles.level_for(xlim, ylim, 100)}); "
+           f"{tiles.misses} berechnet, {tiles.hits} wiederverwendet.")
 
 st.info("""
 **Beobachtungen:**
 *   **SGD** zick-zackt stark in Tälern.
 *   **Momentum** schießt manchmal über das Ziel hinaus, korrigiert sich aber.
 *   **Adam** wählt oft einen sehr direkten Weg, da er die Schrittweite pro Dimension anpasst.
-""")
\ No newline at end of file
+""")
+
+# --- Heatmap: viele Läufe auf einmal ---
+st.markdown("---")
+st.subheader("🔥 Konvergenz-Heatmap: Learning Rate × Momentum")
+st.markdown("Jeder Pixel ist ein eigener Lauf vom selben Startpunkt. Alle Läufe werden gemeinsam "
+            "als ein Batch berechnet; die Farbe zeigt, nach wie vielen Schritten der Loss unter die Toleranz fällt.")
+
+col1, col2 = st.columns(2)
+with col1:
+    heat_optimizer = st.selectbox("Optimizer", ["Momentum", "Adam (Momentum = β1)"])
+with col2:
+    tol = st.select_slider("Toleranz (Loss)", [1e-1, 1e-2, 1e-3, 1e-4, 1e-6], value=1e-3)
+
+@st.cache_data(max_entries=32)
+def convergence_heatmap(func_type, optimizer, steps, tol, resolution=60):
+    f_xy, grad, start, _ = get_function(func_type)
+    loss = lambda P: f_xy(P[..., 0], P[..., 1])
+    lrs = np.geomspace(0.001, 0.5, resolution)
+    momenta = np.linspace(0.0, 0.99, resolution)
+    return lrs, momenta, lr_momentum_grid(grad, loss, start, lrs, momenta, steps, tol, optimizer)
+
+heat_key = "momentum" if heat_optimizer == "Momentum" else "adam"
+lrs, momenta, n_steps = convergence_heatmap(func_type, heat_key, steps, tol)
+
+fig2, ax2 = plt.subplots(figsize=(10, 5))
+mesh = ax2.pcolormesh(lrs, momenta, np.maximum(n_steps, 1), cmap="viridis_r",
+                      norm=LogNorm(vmin=1, vmax=steps), shading="auto")
+ax2.plot(lr, gamma, marker="x", color="red", markersize=12, mew=3, label="aktuelle Einstellung")
+ax2.set_xscale("log")
+ax2.set_xlabel("Learning Rate")
+ax2.set_ylabel("Momentum (Gamma / β1)")
+ax2.set_facecolor("lightgray")
+ax2.legend(loc="lower left")
+fig2.colorbar(mesh, ax=ax2, label=f"Schritte bis Loss < {tol:g}")
+st.pyplot(fig2)
+
+converged = np.isfinite(n_steps)
+st.caption(f"{n_steps.size:,} Läufe × {steps} Schritte. Grau: nicht konvergiert oder divergiert "
+           f"({(~converged).mean():.0%} der Läufe).")
+
+# --- Benchmark in n Dimensionen ---
+st.markdown("---")
+st.subheader("📐 Benchmark in n Dimensionen")
+st.markdown("Klassische Testfunktionen in bis zu 10.000 Dimensionen. Pro Optimizer läuft ein ganzes "
+            "Raster von Learning Rates als ein Batch; gezeigt wird jeweils die beste. "
+            "Toleranz: Loss auf 1/10.000 des Startwerts gesenkt.")
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    bench_name = st.selectbox("Testfunktion", list(CATALOG))
+with col2:
+    bench_d = st.select_slider("Dimension d", [2, 10, 100, 1000, 10000], value=100)
+with col3:
+    bench_steps = st.select_slider("max. Schritte", [250, 500, 1000, 2000], value=1000)
+bench_optimizers = st.multiselect("Optimizer", list(OPTIMIZERS), default=list(OPTIMIZERS))
+
+@st.cache_data(max_entries=128)
+def benchmark_row(name, d, optimizer, steps):
+    return run_optimizer(CATALOG[name], d, optimizer, steps=steps)
+
+with st.spinner("Benchmark läuft..."):
+    rows = [benchmark_row(bench_name, bench_d, opt, bench_steps) for opt in bench_optimizers]
+
+if rows:
+    st.dataframe([{k: v for k, v in row.items() if k not in ("loss_curve", "path")} for row in rows],
+                 use_container_width=True)
+
+    landscape = CATALOG[bench_name]
+    col1, col2 = st.columns(2)
+    with col1:
+        fig3, ax3 = plt.subplots(figsize=(6, 5))
+        for row in rows:
+            ax3.semilogy(row["loss_curve"], label=row["Optimizer"])
+        ax3.set_xlabel("Schritt")
+        ax3.set_ylabel("Loss")
+        ax3.set_title(f"Lernkurven (d = {bench_d})")
+        ax3.legend()
+        ax3.grid(True, linestyle=":", alpha=0.3)
+        st.pyplot(fig3)
+    with col2:
+        # 2-D-Schnitt: Ebene (x_0, x_1), alle anderen Koordinaten im Minimum
+        xs, ys, Z_slice = tiles.surface((bench_name, bench_d), lambda X, Y: landscape.slice_loss(X, Y, bench_d),
+                                        landscape.xlim, landscape.ylim, resolution=200)
+        fig4, ax4 = plt.subplots(figsize=(6, 5))
+        ax4.contour(xs, ys, np.log1p(Z_slice), levels=25, cmap="gray", alpha=0.5)
+        for row in rows:
+            ax4.plot(row["path"][:, 0], row["path"][:, 1], "-", lw=1.5, alpha=0.8, label=row["Optimizer"])
+        ax4.set_xlim(landscape.xlim)
+        ax4.set_ylim(landscape.ylim)
+        ax4.set_xlabel("x_0")
+        ax4.set_ylabel("x_1")
+        ax4.set_title("2-D-Schnitt (x_0, x_1)")
+        ax4.legend(fontsize=8)
+        st.pyplot(fig4)
+    if bench_d > 2:
+        st.caption("Die Pfade sind Projektionen auf (x_0, x_1); die Höhenlinien zeigen den Schnitt, "
+                   "bei dem alle übrigen Koordinaten im Minimum liegen.")
+
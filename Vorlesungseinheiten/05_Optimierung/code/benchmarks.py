@@ -0,0 +1,227 @@
+"""
+📐 Testfunktionen in n Dimensionen und eine Benchmark-Suite für die Optimierer
+
+Katalog (`CATALOG`) klassischer Testfunktionen mit analytischen,
+vektorisierten Gradienten — alle arbeiten auf Positionen der Form (n, d),
+also auf vielen Läufen gleichzeitig:
+
+*   schlecht konditionierte Quadratik  0.5 * Σ λ_i x_i²,  λ von 1 bis κ
+*   Rosenbrock (gekoppeltes, gekrümmtes Tal)
+*   Rastrigin (viele lokale Minima)
+
+`run_suite` misst für jede Kombination aus Funktion, Dimension und
+Optimizer die Schritte bis zur Toleranz und die Laufzeit. Die Learning
+Rate wird dabei nicht geraten: Ein Raster von Learning Rates läuft als ein
+Batch, gewertet wird die beste.
+
+    python benchmarks.py --dims 2 100 10000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from optim_engine import OPTIMIZERS, iterate
+
+
+# ============================================================================
+# Testfunktionen
+# ============================================================================
+
+class Landscape:
+    """Basisklasse: `loss` (..., d) -> (...), `grad` (n, d) -> (n, d), Minimum bei `x_opt(d)`."""
+
+    name = ""
+    xlim = (-2.0, 2.0)
+    ylim = (-2.0, 2.0)
+
+    def loss(self, P):
+        raise NotImplementedError
+
+    def grad(self, P):
+        raise NotImplementedError
+
+    def x_opt(self, d):
+        return np.zeros(d)
+
+    def start(self, d, seed=0):
+        raise NotImplementedError
+
+    def slice_loss(self, X, Y, d):
+        """Loss in der Ebene (x_0, x_1), alle übrigen Koordinaten im Minimum."""
+        raise NotImplementedError
+
+
+class IllConditionedQuadratic(Landscape):
+    name = "Quadratik (schlecht konditioniert)"
+    xlim = (-1.5, 1.5)
+    ylim = (-1.5, 1.5)
+
+    def __init__(self, condition=1e3):
+        self.condition = condition
+        self._scales = {}
+
+    def scales(self, d):
+        # Eigenwerte log-gleichmäßig zwischen 1 und κ; x_1 ist damit die steilste Richtung der Ebene
+        if d not in self._scales:
+            self._scales[d] = np.geomspace(self.condition, 1.0, d) if d > 1 else np.ones(1)
+        return self._scales[d]
+
+    def loss(self, P):
+        return 0.5 * np.sum(self.scales(P.shape[-1]) * P * P, axis=-1)
+
+    def grad(self, P):
+        return self.scales(P.shape[-1]) * P
+
+    def start(self, d, seed=0):
+        # Zufälliger Start: von (1, ..., 1) aus wäre der erste, vorzeichenartige Adam-Schritt exakt das Minimum
+        return np.random.default_rng(seed).uniform(-1.0, 1.0, d)
+
+    def slice_loss(self, X, Y, d):
+        lam = self.scales(d)
+        return 0.5 * (lam[0] * X ** 2 + (lam[1] if d > 1 else 0.0) * Y ** 2)
+
+
+class Rosenbrock(Landscape):
+    name = "Rosenbrock"
+    xlim = (-2.0, 2.0)
+    ylim = (-1.0, 3.0)
+
+    def loss(self, P):
+        x, x_next = P[..., :-1], P[..., 1:]
+        return np.sum(100.0 * (x_next - x * x) ** 2 + (1 - x) ** 2, axis=-1)
+
+    def grad(self, P):
+        x, x_next = P[:, :-1], P[:, 1:]
+        t = x_next - x * x
+        g = np.zeros_like(P)
+        g[:, :-1] = -400.0 * x * t - 2 * (1 - x)
+        g[:, 1:] += 200.0 * t
+        return g
+
+    def x_opt(self, d):
+        return np.ones(d)
+
+    def start(self, d, seed=0):
+        # Klassischer Startpunkt (-1.2, 1) reihum fortgesetzt
+        return np.resize([-1.2, 1.0], d)
+
+    def slice_loss(self, X, Y, d):
+        value = 100.0 * (Y - X ** 2) ** 2 + (1 - X) ** 2
+        if d > 2:  # Term mit x_2 = 1
+            value = value + 100.0 * (1 - Y ** 2) ** 2 + (1 - Y) ** 2
+        return value
+
+
+class Rastrigin(Landscape):
+    name = "Rastrigin"
+    xlim = (-5.12, 5.12)
+    ylim = (-5.12, 5.12)
+
+    def loss(self, P):
+        return np.sum(P * P - 10 * np.cos(2 * np.pi * P) + 10, axis=-1)
+
+    def grad(self, P):
+        return 2 * P + 20 * np.pi * np.sin(2 * np.pi * P)
+
+    def start(self, d, seed=0):
+        return np.random.default_rng(seed).uniform(-5.12, 5.12, d)
+
+    def slice_loss(self, X, Y, d):
+        return X ** 2 - 10 * np.cos(2 * np.pi * X) + Y ** 2 - 10 * np.cos(2 * np.pi * Y) + 20
+
+
+CATALOG = {f.name: f for f in [IllConditionedQuadratic(), Rosenbrock(), Rastrigin()]}
+
+# Gemeinsames Learning-Rate-Raster; jede Zeile der Suite läuft es als einen Batch
+LEARNING_RATES = np.geomspace(1e-5, 1.0, 16)
+
+
+# ============================================================================
+# Suite
+# ============================================================================
+
+def run_optimizer(landscape, d, optimizer, learning_rates=LEARNING_RATES, steps=2000, rtol=1e-4,
+                  momentum=0.9, track=(0, 1), seed=0):
+    """
+    Läuft alle Learning Rates als einen Batch, bis der erste Lauf die
+    Toleranz erreicht (das ist dann die beste Learning Rate) oder `steps`
+    erschöpft sind (dann gewinnt der kleinste End-Loss).
+
+    Toleranz relativ zum Start: loss(x_t) <= rtol * loss(x_0) (alle
+    Funktionen haben das Minimum 0). Gibt ein Dict mit Kennzahlen, der
+    Lernkurve und dem Pfad der Koordinaten `track` des besten Laufs zurück.
+    """
+    lrs = np.asarray(learning_rates, dtype=float)
+    starts = np.tile(landscape.start(d, seed), (len(lrs), 1))
+    loss0 = landscape.loss(starts[0])
+    tol = rtol * loss0
+    losses = [np.full(len(lrs), loss0)]
+    tracked = [starts[:, list(track)].copy()]
+
+    t0 = time.perf_counter()
+    reached = None
+    for t, pos in iterate(landscape.grad, starts, optimizer, lrs, momentum, steps):
+        with np.errstate(over="ignore", invalid="ignore"):
+            values = landscape.loss(pos)
+        losses.append(values)
+        tracked.append(pos[:, list(track)].copy())
+        hits = np.flatnonzero(values <= tol)
+        if len(hits):
+            reached = t
+            break
+        if not np.isfinite(values).any():
+            break
+    batch_seconds = time.perf_counter() - t0
+
+    losses = np.array(losses)
+    if reached is not None:
+        best = hits[np.argmin(values[hits])]
+    else:
+        final = np.where(np.isfinite(losses[-1]), losses[-1], np.inf)
+        best = int(np.argmin(final))
+
+    # Wandzeit des besten Laufs allein (ohne die übrigen Learning Rates im Batch)
+    n_steps = len(losses) - 1
+    t0 = time.perf_counter()
+    for _ in iterate(landscape.grad, starts[:1], optimizer, lrs[best], momentum, n_steps):
+        pass
+    seconds = time.perf_counter() - t0
+
+    return {
+        "Funktion": landscape.name, "d": d, "Optimizer": optimizer,
+        "beste LR": float(lrs[best]),
+        "Schritte bis Toleranz": reached,
+        "Zeit (s)": seconds,
+        "Batch-Zeit (s)": batch_seconds,
+        "End-Loss": float(losses[-1, best]),
+        "loss_curve": losses[:, best],
+        "path": np.array(tracked)[:, best],
+    }
+
+
+def run_suite(landscapes=None, dims=(2, 100, 10_000), optimizers=tuple(OPTIMIZERS), steps=2000, rtol=1e-4):
+    """Alle Kombinationen; gibt eine Liste von Ergebnis-Dicts (eine Zeile je Lauf) zurück."""
+    landscapes = landscapes or list(CATALOG.values())
+    return [run_optimizer(landscape, d, optimizer, steps=steps, rtol=rtol)
+            for landscape in landscapes for d in dims for optimizer in optimizers]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Optimierer-Benchmark auf n-dimensionalen Testfunktionen")
+    parser.add_argument("--dims", type=int, nargs="+", default=[2, 100, 10_000])
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--rtol", type=float, default=1e-4)
+    parser.add_argument("--functions", nargs="+", choices=list(CATALOG), default=list(CATALOG))
+    args = parser.parse_args()
+
+    print(f"{'Funktion':<36} {'d':>6} {'Optimizer':<9} {'beste LR':>9} {'Schritte':>9} "
+          f"{'Zeit (s)':>9} {'End-Loss':>10}")
+    for name in args.functions:
+        for d in args.dims:
+            for optimizer in OPTIMIZERS:
+                row = run_optimizer(CATALOG[name], d, optimizer, steps=args.steps, rtol=args.rtol)
+                steps = row["Schritte bis Toleranz"]
+                print(f"{row['Funktion']:<36} {d:>6} {optimizer:<9} {row['beste LR']:>9.1e} "
+                      f"{steps if steps is not None else '—':>9} {row['Zeit (s)']:>9.3f} {row['End-Loss']:>10.2e}")
@@ -9,25 +9,36 @@ def grad_f(x, y):
     """Der Gradient von f: [2x, 20y]"""
     return np.array([2*x, 20*y])
 
+def grad_batch(P):
+    """Gradient für viele Punkte auf einmal: P hat die Form (..., 2)."""
+    return np.stack(grad_f(P[..., 0], P[..., 1]), axis=-1)
+
 def run_gd(start_pos, lr, steps=20):
-    path = [start_pos]
-    pos = np.array(start_pos)
-    for _ in range(steps):
-        grad = grad_f(pos[0], pos[1])
-        pos = pos - lr * grad
-        path.append(pos)
-    return np.array(path)
+    """
+    Gradient Descent. `start_pos` ist ein Punkt (2,) oder viele Startpunkte (n, 2);
+    `lr` ein Skalar oder eine Learning Rate pro Startpunkt. Alle Läufe werden
+    gemeinsam berechnet, der Pfad hat die Form (steps + 1, ...) wie `start_pos`.
+    """
+    pos = np.asarray(start_pos, dtype=float)
+    lr = np.asarray(lr, dtype=float)[..., None]
+    path = np.empty((steps + 1,) + pos.shape)
+    path[0] = pos
+    for t in range(steps):
+        path[t + 1] = path[t] - lr * grad_batch(path[t])
+    return path
 
 def run_momentum(start_pos, lr, gamma=0.9, steps=20):
-    path = [start_pos]
-    pos = np.array(start_pos)
+    """Momentum; `lr` und `gamma` wie bei `run_gd` auch pro Startpunkt."""
+    pos = np.asarray(start_pos, dtype=float)
+    lr = np.asarray(lr, dtype=float)[..., None]
+    gamma = np.asarray(gamma, dtype=float)[..., None]
+    path = np.empty((steps + 1,) + pos.shape)
+    path[0] = pos
     velocity = np.zeros_like(pos)
-    for _ in range(steps):
-        grad = grad_f(pos[0], pos[1])
-        velocity = gamma * velocity + lr * grad
-        pos = pos - velocity
-        path.append(pos)
-    return np.array(path)
+    for t in range(steps):
+        velocity = gamma * velocity + lr * grad_batch(path[t])
+        path[t + 1] = path[t] - velocity
+    return path
 
 # --- Visualisierung ---
 def plot_paths():
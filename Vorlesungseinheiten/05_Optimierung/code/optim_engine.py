@@ -0,0 +1,216 @@
+"""
+⚙️ Batch-Optimierer für die Optimierungs-Demos
+
+Statt einen einzelnen Startpunkt in einer Python-Schleife zu bewegen, rechnet
+`run_batch` eine ganze Population von Läufen gleichzeitig: n Startpunkte,
+jeder mit eigener Learning Rate und eigenem Momentum. Positionen liegen in
+einem vorab angelegten Array der Form (steps + 1, n, d), Geschwindigkeit und
+Momente in (n, d)-Puffern; pro Schritt gibt es genau einen vektorisierten
+Gradientenaufruf für alle Läufe. Update-Regeln: SGD, Momentum, Nesterov,
+RMSProp, Adam und AdamW.
+
+Damit lassen sich z.B. Learning Rate × Momentum-Heatmaps aus Tausenden von
+Läufen interaktiv berechnen (`lr_momentum_grid`).
+
+Vergleich Python-Schleife vs. Batch::
+
+    python optim_engine.py --runs 3000 --steps 100
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+# ============================================================================
+# Update-Regeln: ändern `pos` in-place, Zustand liegt in `state`
+# ============================================================================
+
+def _sgd(pos, g, state, t, hp):
+    g *= hp["lr"]
+    pos -= g
+
+
+def _momentum(pos, g, state, t, hp):
+    vel = state.setdefault("vel", np.zeros_like(pos))
+    vel *= hp["momentum"]
+    g *= hp["lr"]
+    vel += g
+    pos -= vel
+
+
+def _nesterov(pos, g, state, t, hp):
+    # Umformulierung nach Sutskever et al.: Gradient am aktuellen Punkt, Schritt mit "Vorausblick"
+    vel = state.setdefault("vel", np.zeros_like(pos))
+    vel *= hp["momentum"]
+    g *= hp["lr"]
+    vel += g
+    pos -= g
+    pos -= hp["momentum"] * vel
+
+
+def _rmsprop(pos, g, state, t, hp):
+    v = state.setdefault("v", np.zeros_like(pos))
+    v *= hp["rho"]
+    v += (1 - hp["rho"]) * g * g
+    g *= hp["lr"]
+    g /= np.sqrt(v) + hp["eps"]
+    pos -= g
+
+
+def _adam(pos, g, state, t, hp):
+    m = state.setdefault("m", np.zeros_like(pos))
+    v = state.setdefault("v", np.zeros_like(pos))
+    beta1, beta2 = hp["momentum"], hp["beta2"]
+    m *= beta1
+    m += (1 - beta1) * g
+    g *= g
+    v *= beta2
+    v += (1 - beta2) * g
+    # Bias-Korrektur; beta1 kann pro Lauf verschieden sein
+    m_hat = m / (1 - beta1 ** t)
+    np.divide(v, 1 - beta2 ** t, out=g)
+    np.sqrt(g, out=g)
+    g += hp["eps"]
+    np.divide(m_hat, g, out=g)
+    g *= hp["lr"]
+    pos -= g
+
+
+def _adamw(pos, g, state, t, hp):
+    # Entkoppelter Weight Decay: schrumpft die Gewichte direkt, nicht über den Gradienten
+    pos -= hp["lr"] * hp["weight_decay"] * pos
+    _adam(pos, g, state, t, hp)
+
+
+OPTIMIZERS = {
+    "sgd": _sgd,
+    "momentum": _momentum,
+    "nesterov": _nesterov,
+    "rmsprop": _rmsprop,
+    "adam": _adam,
+    "adamw": _adamw,
+}
+
+
+def _per_run(value, n, dtype):
+    """Skalar oder (n,)-Array -> Spalte (n, 1), die gegen (n, d) broadcastet."""
+    return np.broadcast_to(np.asarray(value, dtype=dtype), (n,)).reshape(n, 1)
+
+
+def iterate(grad, starts, optimizer="sgd", lr=0.01, momentum=0.9, steps=50, beta2=0.999, rho=0.9,
+            eps=1e-8, weight_decay=0.01, dtype=np.float64):
+    """
+    Generator über die Optimierungsschritte aller Läufe: liefert (t, pos) für
+    t = 1..steps. `pos` (n, d) ist ein Arbeitspuffer, der im nächsten Schritt
+    überschrieben wird — wer ihn behalten will, muss ihn kopieren.
+
+    `grad` bildet Positionen (n, d) auf Gradienten (n, d) ab, `starts` hat
+    die Form (n, d) oder (d,) (dann ein einzelner Lauf). `lr` und `momentum`
+    sind Skalare oder Arrays der Länge n; bei Adam/AdamW ist `momentum` das
+    beta1, `rho` ist die Abklingrate von RMSProp.
+    """
+    if optimizer not in OPTIMIZERS:
+        raise ValueError(f"Unbekannter Optimizer '{optimizer}' (erlaubt: {', '.join(OPTIMIZERS)})")
+    update = OPTIMIZERS[optimizer]
+    pos = np.array(np.atleast_2d(starts), dtype=dtype)
+    n = pos.shape[0]
+    hp = {"lr": _per_run(lr, n, dtype), "momentum": _per_run(momentum, n, dtype),
+          "beta2": dtype(beta2), "rho": dtype(rho), "eps": dtype(eps), "weight_decay": dtype(weight_decay)}
+    state = {}
+    # Divergierende Läufe (zu große Learning Rate) laufen nach inf/nan – das ist gewollt
+    with np.errstate(over="ignore", invalid="ignore"):
+        for t in range(1, steps + 1):
+            g = np.asarray(grad(pos), dtype=dtype)
+            update(pos, g, state, t, hp)
+            yield t, pos
+
+
+def run_batch(grad, starts, optimizer="sgd", lr=0.01, momentum=0.9, steps=50, dtype=np.float64, **kwargs):
+    """
+    Führt `steps` Optimierungsschritte für alle Läufe gleichzeitig aus
+    (Parameter wie `iterate`). Gibt den Pfad als Array (steps + 1, n, d) zurück.
+    """
+    starts = np.atleast_2d(np.asarray(starts, dtype=dtype))
+    path = np.empty((steps + 1,) + starts.shape, dtype=dtype)
+    path[0] = starts
+    for t, pos in iterate(grad, starts, optimizer, lr, momentum, steps, dtype=dtype, **kwargs):
+        path[t] = pos
+    return path
+
+
+def steps_to_tolerance(path, loss, tol):
+    """
+    Erster Schritt, ab dem `loss` (Positionen (..., d) -> Werte (...)) unter
+    `tol` liegt, pro Lauf; nan für Läufe, die die Toleranz nie erreichen.
+    """
+    with np.errstate(over="ignore", invalid="ignore"):
+        values = loss(path)
+    reached = values <= tol
+    first = np.argmax(reached, axis=0).astype(float)
+    first[~reached.any(axis=0)] = np.nan
+    return first
+
+
+def lr_momentum_grid(grad, loss, start, lrs, momenta, steps=100, tol=1e-3, optimizer="momentum"):
+    """
+    Schritte bis `loss < tol` für jede Kombination aus Learning Rate und
+    Momentum, berechnet in einem einzigen Batch.
+
+    Gibt ein Array der Form (len(momenta), len(lrs)) zurück (nan = nicht konvergiert).
+    """
+    lr_grid, mom_grid = np.meshgrid(lrs, momenta)
+    starts = np.broadcast_to(np.asarray(start, dtype=float), (lr_grid.size, len(start)))
+    path = run_batch(grad, starts, optimizer, lr_grid.ravel(), mom_grid.ravel(), steps)
+    return steps_to_tolerance(path, loss, tol).reshape(lr_grid.shape)
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+def _loop_momentum(grad_xy, start, lr, gamma, steps):
+    """Referenz: ein Lauf, Schritt für Schritt (wie die ursprüngliche Demo)."""
+    path = [start]
+    pos = start.copy()
+    vel = np.zeros_like(pos)
+    for _ in range(steps):
+        g = grad_xy(pos[0], pos[1])
+        vel = gamma * vel + lr * g
+        pos = pos - vel
+        path.append(pos)
+    return np.array(path)
+
+
+def benchmark(runs=3000, steps=100):
+    grad_xy = lambda x, y: np.array([2 * x, 20 * y])
+    grad = lambda P: P * np.array([2.0, 20.0])
+    start = np.array([-8.0, 2.0])
+    side = int(np.sqrt(runs))
+    lrs = np.geomspace(1e-3, 0.1, side)
+    momenta = np.linspace(0.0, 0.99, side)
+    lr_grid, mom_grid = np.meshgrid(lrs, momenta)
+    print(f"{lr_grid.size} Läufe x {steps} Schritte (Momentum auf x^2 + 10y^2)")
+
+    t0 = time.perf_counter()
+    with np.errstate(over="ignore", invalid="ignore"):
+        loop = np.stack([_loop_momentum(grad_xy, start, lr, gamma, steps)
+                         for lr, gamma in zip(lr_grid.ravel(), mom_grid.ravel())], axis=1)
+    t_loop = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    batch = run_batch(grad, np.broadcast_to(start, (lr_grid.size, 2)), "momentum",
+                      lr_grid.ravel(), mom_grid.ravel(), steps)
+    t_batch = time.perf_counter() - t0
+
+    print(f"Schleife  {t_loop:7.3f} s")
+    print(f"Batch     {t_batch:7.3f} s  (Faktor {t_loop / t_batch:.0f})")
+    print(f"max. Abweichung: {np.nanmax(np.abs(loop - batch)):.2e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch-Optimierer vs. Python-Schleife")
+    parser.add_argument("--runs", type=int, default=3000)
+    parser.add_argument("--steps", type=int, default=100)
+    args = parser.parse_args()
+    benchmark(args.runs, args.steps)
@@ -0,0 +1,123 @@
+"""
+🗺️ Kachel-Cache für Loss-Flächen
+
+Die Höhenlinien hängen nur von Funktion und Bildausschnitt ab — nicht von
+Learning Rate, Momentum oder Schrittzahl. `SurfaceTiles` wertet die Fläche
+deshalb in Kacheln aus, die einmal berechnet und danach wiederverwendet
+werden; bei einer Slider-Änderung muss nur der Pfad neu gerechnet werden.
+
+Die Kacheln liegen auf festen Rastern in mehreren Auflösungsstufen: Stufe L
+hat die Kachelkantenlänge `tile_size / 2**L`, jede Kachel `samples` × `samples`
+Punkte. Ein Ausschnitt wird aus der gröbsten Stufe zusammengesetzt, die
+noch mindestens `resolution` Punkte pro Achse liefert — ein Zoom auf die
+Pfade nutzt also feinere Kacheln, der Gesamtblick grobe.
+
+Kaltstart vs. Cache-Treffer::
+
+    python surface_tiles.py
+"""
+
+import argparse
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class SurfaceTiles:
+    """LRU-Cache für Flächen-Kacheln, Schlüssel (Funktion, Stufe, Kachel-x, Kachel-y)."""
+
+    def __init__(self, tile_size=32.0, samples=32, max_level=12, max_tiles=1024):
+        self.tile_size = tile_size
+        self.samples = samples
+        self.max_level = max_level
+        self.max_tiles = max_tiles
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def level_for(self, xlim, ylim, resolution):
+        """Gröbste Stufe, deren Punktabstand höchstens (kürzere Kante) / resolution ist."""
+        extent = min(xlim[1] - xlim[0], ylim[1] - ylim[0])
+        needed = self.tile_size * resolution / (self.samples * extent)
+        return int(np.clip(math.ceil(math.log2(max(needed, 1.0))), 0, self.max_level))
+
+    def _tile(self, key, f, level, ix, iy):
+        cache_key = (key, level, ix, iy)
+        with self._lock:
+            tile = self._tiles.get(cache_key)
+            if tile is not None:
+                self._tiles.move_to_end(cache_key)
+                self.hits += 1
+                return tile
+        size = self.tile_size / 2 ** level
+        offsets = np.arange(self.samples) * (size / self.samples)
+        X, Y = np.meshgrid(ix * size + offsets, iy * size + offsets)
+        tile = np.asarray(f(X, Y), dtype=float)
+        tile.setflags(write=False)
+        with self._lock:
+            self.misses += 1
+            self._tiles[cache_key] = tile
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+        return tile
+
+    def surface(self, key, f, xlim, ylim, resolution=100):
+        """
+        Fläche `f(X, Y)` im Ausschnitt xlim × ylim, zusammengesetzt aus Kacheln.
+
+        `key` identifiziert die Funktion (z.B. ihr Name) — `f` selbst wird nur
+        für noch fehlende Kacheln aufgerufen. Gibt (xs, ys, Z) zurück, Z hat
+        die Form (len(ys), len(xs)).
+        """
+        level = self.level_for(xlim, ylim, resolution)
+        size = self.tile_size / 2 ** level
+        h = size / self.samples
+        ix0, ix1 = math.floor(xlim[0] / size), math.floor(xlim[1] / size)
+        iy0, iy1 = math.floor(ylim[0] / size), math.floor(ylim[1] / size)
+
+        rows = [np.hstack([self._tile(key, f, level, ix, iy) for ix in range(ix0, ix1 + 1)])
+                for iy in range(iy0, iy1 + 1)]
+        Z = np.vstack(rows)
+        xs = ix0 * size + h * np.arange(Z.shape[1])
+        ys = iy0 * size + h * np.arange(Z.shape[0])
+
+        # Auf den Ausschnitt zuschneiden (ein Rasterpunkt Rand, damit die Linien bis an die Kante reichen)
+        cx = slice(max(np.searchsorted(xs, xlim[0]) - 1, 0), np.searchsorted(xs, xlim[1]) + 1)
+        cy = slice(max(np.searchsorted(ys, ylim[0]) - 1, 0), np.searchsorted(ys, ylim[1]) + 1)
+        return xs[cx], ys[cy], Z[cy, cx]
+
+    def clear(self):
+        with self._lock:
+            self._tiles.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._tiles)
+
+
+def benchmark(resolution=100, repeats=20):
+    f = lambda x, y: x ** 2 + 10 * y ** 2
+    tiles = SurfaceTiles()
+    views = [((-10, 10), (-5, 8)), ((-2, 1), (-0.5, 0.5)), ((-0.2, 0.1), (-0.05, 0.05))]
+    for xlim, ylim in views:
+        t0 = time.perf_counter()
+        xs, ys, Z = tiles.surface("valley", f, xlim, ylim, resolution)
+        cold = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for _ in range(repeats):
+            tiles.surface("valley", f, xlim, ylim, resolution)
+        warm = (time.perf_counter() - t0) / repeats
+        print(f"Ausschnitt {xlim} x {ylim}: Stufe {tiles.level_for(xlim, ylim, resolution)}, "
+              f"{Z.shape[1]}x{Z.shape[0]} Punkte, kalt {1000 * cold:.2f} ms, aus dem Cache {1000 * warm:.2f} ms")
+    print(f"{len(tiles)} Kacheln im Cache ({tiles.hits} Treffer, {tiles.misses} berechnet)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kachel-Cache für Loss-Flächen")
+    parser.add_argument("--resolution", type=int, default=100)
+    args = parser.parse_args()
+    benchmark(args.resolution)
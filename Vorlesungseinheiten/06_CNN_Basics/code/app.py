@@ -1,78 +1,55 @@
 import streamlit as st
-import numpy as np
-import cv2
-from PIL import Image
+import time
+from filter_pipeline import FILTERS, FilterPipeline, image_hash
 
 st.title("Unit 06: CNN Filter Explorer")
 st.markdown("Laden Sie ein Bild hoch und wenden Sie verschiedene **Convolutional Kernel** an, um zu sehen, wie Computer Merkmale extrahieren.")
 
 # --- Sidebar ---
 st.sidebar.header("Einstellungen")
-filter_name = st.sidebar.selectbox(
-    "Filter wählen",
-    ["Original", "Edge Detection (Sobel X)", "Edge Detection (Sobel Y)", "Edge Detection (Laplacian)", "Sharpen", "Blur (Average)", "Emboss"]
-)
+filter_name = st.sidebar.selectbox("Filter wählen", list(FILTERS))
+chain_rest = st.sidebar.multiselect("Danach anwenden (Filterkette)", [f for f in FILTERS if f != "Original"])
 
 uploaded_file = st.sidebar.file_uploader("Bild hochladen", type=["jpg", "png", "jpeg"])
 
-# --- Filter Definitionen ---
-def apply_filter(image, filter_type):
-    # Bild in Graustufen konvertieren für einfachere Kanten-Erkennung
-    gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
-    
-    if filter_type == "Original":
-        return image
-    
-    elif filter_type == "Edge Detection (Sobel X)":
-        # Vertikale Kanten
-        kernel = np.array([[-1, 0, 1], [-2, 0, 2], [-1, 0, 1]])
-        return cv2.filter2D(gray, -1, kernel)
-    
-    elif filter_type == "Edge Detection (Sobel Y)":
-        # Horizontale Kanten
-        kernel = np.array([[-1, -2, -1], [0, 0, 0], [1, 2, 1]])
-        return cv2.filter2D(gray, -1, kernel)
-    
-    elif filter_type == "Edge Detection (Laplacian)":
-        # Alle Kanten
-        kernel = np.array([[0, 1, 0], [1, -4, 1], [0, 1, 0]])
-        return cv2.filter2D(gray, -1, kernel)
-    
-    elif filter_type == "Sharpen":
-        # Verstärkt die Mitte, zieht Nachbarn ab
-        kernel = np.array([[0, -1, 0], [-1, 5, -1], [0, -1, 0]])
-        return cv2.filter2D(image, -1, kernel) # Hier auf Farbe anwendbar
-    
-    elif filter_type == "Blur (Average)":
-        # Mittelwertbildung (Weichzeichner)
-        kernel = np.ones((5, 5), np.float32) / 25
-        return cv2.filter2D(image, -1, kernel)
-    
-    elif filter_type == "Emboss":
-        # Relief-Effekt
-        kernel = np.array([[-2, -1, 0], [-1, 1, 1], [0, 1, 2]])
-        return cv2.filter2D(gray, -1, kernel)
-        
-    return image
+# --- Filter-Pipeline: dekodiertes Bild und jede Stufe der Kette werden pro Bild-Hash gecacht ---
+@st.cache_resource
+def get_pipeline():
+    return FilterPipeline()
+
+PREVIEW_SIDE = 1024
 
 # --- Main App ---
 
 if uploaded_file is not None:
-    # Bild laden
-    image = Image.open(uploaded_file)
-    img_array = np.array(image)
+    pipeline = get_pipeline()
+    data = uploaded_file.getvalue()
+    key = image_hash(data)
+    chain = [filter_name] + chain_rest
+    chain_label = " → ".join(chain)
+
+    img_array = pipeline.image(data, key)
+    H, W = img_array.shape[:2]
     
     st.subheader("Ergebnis")
     col1, col2 = st.columns(2)
     
     with col1:
-        st.image(img_array, caption="Original", use_container_width=True)
+        st.image(pipeline.image(data, key, PREVIEW_SIDE), caption=f"Original ({W}x{H})", use_container_width=True)
     
     with col2:
-        processed_img = apply_filter(img_array, filter_name)
-        st.image(processed_img, caption=f"Filter: {filter_name}", use_container_width=True)
+        result = st.empty()
+        # Erst die verkleinerte Vorschau zeigen, dann die volle Auflösung (gekachelt, parallel) nachreichen
+        if max(H, W) > PREVIEW_SIDE:
+            result.image(pipeline.run(data, chain, key, PREVIEW_SIDE), caption=f"Filter: {chain_label} (Vorschau)",
+                         use_container_width=True)
+        t0 = time.perf_counter()
+        processed_img = pipeline.run(data, chain, key)
+        seconds = time.perf_counter() - t0
+        result.image(processed_img, caption=f"Filter: {chain_label}", use_container_width=True)
+        st.caption(f"Volle Auflösung in {seconds * 1000:.0f} ms (Cache: {pipeline.nbytes / 1e6:.0f} MB)")
         
     st.info(f"**Erklärung:** Der Filter '{filter_name}' wird als kleine Matrix (Kernel) über das Bild geschoben. Das Ergebnis ist eine Feature Map.")
 
 else:
-    st.info("Bitte laden Sie ein Bild in der Sidebar hoch.")
\ No newline at end of file
+    st.info("Bitte laden Sie ein Bild in der Sidebar hoch.")
@@ -0,0 +1,457 @@
+"""
+🧱 CNN-Layer in NumPy: Convolution über im2col + GEMM, Pooling, Backward-Pass
+
+Eingaben haben die Form (N, C, H, W) — Batch, Kanäle, Höhe, Breite —,
+Kernel die Form (F, C, kh, kw). Wie in CNN-Frameworks ist "Convolution"
+hier eine Kreuzkorrelation (der Kernel wird nicht gespiegelt).
+
+im2col: `window_view` legt mit `as_strided` eine Sicht (N, H_out, W_out,
+C, kh, kw) über das (gepaddete) Bild, ohne Daten zu kopieren. Stride und
+Dilation stecken nur in den Strides der Sicht. Die Faltung ist danach eine
+einzige Matrixmultiplikation (N·H_out·W_out, C·kh·kw) @ (C·kh·kw, F).
+
+Daneben gibt es einen direkten Weg (Summe über die Kernel-Offsets) und
+eine FFT-Faltung, die große Bilder blockweise per Overlap-Add verarbeitet.
+`conv2d(method="auto")` wählt nach Bild- und Kernelgröße (`choose_method`).
+
+Pooling nutzt dieselbe Fenster-Sicht; die Backward-Pässe laufen
+vektorisiert über alle Fenster und schleifen nur über die kh × kw
+Kernel-Positionen.
+
+Vergleich mit scipy.signal.convolve2d und cv2.filter2D bzw. der Methoden untereinander::
+
+    python conv_engine.py
+    python conv_engine.py --crossover
+"""
+
+import argparse
+import time
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+from scipy.fft import irfft2, next_fast_len, rfft2
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+
+# ============================================================================
+# Hilfsfunktionen
+# ============================================================================
+
+def _pair(value):
+    return (int(value), int(value)) if np.isscalar(value) else tuple(int(v) for v in value)
+
+
+def resolve_padding(padding, kernel_size, dilation=1):
+    """
+    Padding als ((oben, unten), (links, rechts)). Erlaubt sind "valid",
+    "same" (Ausgabe so groß wie die Eingabe bei Stride 1), eine Zahl oder
+    ein Paar (Zeilen, Spalten).
+    """
+    kh, kw = _pair(kernel_size)
+    dh, dw = _pair(dilation)
+    if isinstance(padding, str):
+        if padding == "valid":
+            return (0, 0), (0, 0)
+        if padding == "same":
+            th, tw = dh * (kh - 1), dw * (kw - 1)
+            return (th // 2, th - th // 2), (tw // 2, tw - tw // 2)
+        raise ValueError(f"Unbekanntes Padding '{padding}' (erlaubt: 'valid', 'same' oder Zahl)")
+    ph, pw = _pair(padding)
+    return (ph, ph), (pw, pw)
+
+
+def pad_input(x, pads):
+    if not any(p for pair in pads for p in pair):
+        return x
+    return np.pad(x, ((0, 0), (0, 0)) + tuple(pads))
+
+
+def output_size(size, kernel, stride=1, dilation=1):
+    """Ausgabegröße einer Achse (nach dem Padding)."""
+    return (size - dilation * (kernel - 1) - 1) // stride + 1
+
+
+def window_view(x, kernel_size, stride=1, dilation=1):
+    """
+    Nur-Lese-Sicht (N, H_out, W_out, C, kh, kw) auf alle Fenster von x (N, C, H, W).
+
+    Es wird nichts kopiert: Fenster-Position und Kernel-Offset sind nur
+    unterschiedliche Schrittweiten durch denselben Speicher.
+    """
+    kh, kw = _pair(kernel_size)
+    sh, sw = _pair(stride)
+    dh, dw = _pair(dilation)
+    N, C, H, W = x.shape
+    H_out, W_out = output_size(H, kh, sh, dh), output_size(W, kw, sw, dw)
+    if H_out < 1 or W_out < 1:
+        raise ValueError(f"Kernel {kh}x{kw} (Dilation {dh}x{dw}) ist größer als die Eingabe {H}x{W}")
+    sN, sC, sH, sW = x.strides
+    return as_strided(x, shape=(N, H_out, W_out, C, kh, kw),
+                      strides=(sN, sH * sh, sW * sw, sC, sH * dh, sW * dw), writeable=False)
+
+
+def _as_batch(x, weight):
+    """Erlaubt auch ein einzelnes Graustufenbild (H, W) und einen einzelnen Kernel (kh, kw)."""
+    single = x.ndim == 2
+    if single:
+        x = x[None, None]
+    if weight.ndim == 2:
+        weight = weight[None, None]
+    return x, weight, single
+
+
+def _scatter_windows(dx_padded, contributions, kernel_size, stride, dilation, H_out, W_out):
+    """Addiert `contributions(i, j)` (N, C, H_out, W_out) an die Bildpositionen des Kernel-Offsets (i, j)."""
+    kh, kw = _pair(kernel_size)
+    sh, sw = _pair(stride)
+    dh, dw = _pair(dilation)
+    for i in range(kh):
+        for j in range(kw):
+            rows = slice(i * dh, i * dh + sh * (H_out - 1) + 1, sh)
+            cols = slice(j * dw, j * dw + sw * (W_out - 1) + 1, sw)
+            dx_padded[:, :, rows, cols] += contributions(i, j)
+
+
+def _unpad(x, pads):
+    (top, bottom), (left, right) = pads
+    return x[:, :, top:x.shape[2] - bottom, left:x.shape[3] - right]
+
+
+# ============================================================================
+# Convolution
+# ============================================================================
+
+def _conv_im2col(xp, weight, stride, dilation):
+    F, C, kh, kw = weight.shape
+    cols = window_view(xp, (kh, kw), stride, dilation)  # (N, H_out, W_out, C, kh, kw), Sicht
+    N, H_out, W_out = cols.shape[:3]
+    # Die GEMM braucht eine zusammenhängende Matrix: das ist die einzige Kopie (die im2col-Matrix)
+    out = cols.reshape(N * H_out * W_out, C * kh * kw) @ weight.reshape(F, -1).T
+    return out.reshape(N, H_out, W_out, F).transpose(0, 3, 1, 2)
+
+
+def _conv_direct(xp, weight, stride, dilation):
+    """Summe über die Kernel-Offsets: kh·kw vektorisierte Multiply-Adds auf verschobenen Bildausschnitten."""
+    F, C, kh, kw = weight.shape
+    sh, sw = _pair(stride)
+    dh, dw = _pair(dilation)
+    N, _, H, W = xp.shape
+    H_out, W_out = output_size(H, kh, sh, dh), output_size(W, kw, sw, dw)
+    out = np.zeros((N, F, H_out, W_out), dtype=xp.dtype)
+    for i in range(kh):
+        for j in range(kw):
+            patch = xp[:, :, i * dh:i * dh + sh * (H_out - 1) + 1:sh, j * dw:j * dw + sw * (W_out - 1) + 1:sw]
+            if C == 1:
+                out += weight[None, :, 0, i, j, None, None] * patch
+            else:
+                out += np.tensordot(weight[:, :, i, j], patch, axes=([1], [1])).transpose(1, 0, 2, 3)
+    return out
+
+
+def _dilate_kernel(weight, dilation):
+    dh, dw = _pair(dilation)
+    if dh == dw == 1:
+        return weight
+    F, C, kh, kw = weight.shape
+    dilated = np.zeros((F, C, dh * (kh - 1) + 1, dw * (kw - 1) + 1), dtype=weight.dtype)
+    dilated[:, :, ::dh, ::dw] = weight
+    return dilated
+
+
+def _fft_correlate(block, kernel_fft, fshape):
+    """Volle lineare Faltung eines Blocks (N, C, h, w) mit dem (gespiegelten) Kernel im Frequenzraum."""
+    block_fft = rfft2(block, fshape)
+    return irfft2(np.einsum("nchw,fchw->nfhw", block_fft, kernel_fft), fshape)
+
+
+def _conv_fft(xp, weight, stride, dilation, block=None):
+    """
+    Faltung über die FFT. Bei großen Bildern Overlap-Add: das Bild wird in
+    Blöcke der Kantenlänge `block` zerlegt, jeder Block einzeln transformiert
+    und die (um den Kernel überstehenden) Teilergebnisse aufaddiert — der
+    Kernel wird nur einmal transformiert, der Speicherbedarf bleibt pro Block klein.
+    """
+    weight = _dilate_kernel(weight, dilation)
+    F, C, kh, kw = weight.shape
+    N, _, H, W = xp.shape
+    flipped = weight[:, :, ::-1, ::-1]  # Kreuzkorrelation = Faltung mit gespiegeltem Kernel
+    if block is None:
+        block = max(H, W) if max(H, W) <= OVERLAP_ADD_MIN_SIDE else max(OVERLAP_ADD_BLOCK, 2 * max(kh, kw))
+    bh, bw = min(block, H), min(block, W)
+    fshape = (next_fast_len(bh + kh - 1, True), next_fast_len(bw + kw - 1, True))
+    kernel_fft = rfft2(flipped, fshape)
+
+    full = np.zeros((N, F, H + kh - 1, W + kw - 1), dtype=xp.dtype)
+    for y in range(0, H, bh):
+        for x in range(0, W, bw):
+            tile = xp[:, :, y:y + bh, x:x + bw]
+            h, w = tile.shape[2:]
+            full[:, :, y:y + h + kh - 1, x:x + w + kw - 1] += \
+                _fft_correlate(tile, kernel_fft, fshape)[:, :, :h + kh - 1, :w + kw - 1]
+    # Nur die "valid"-Positionen (Kernel vollständig im gepaddeten Bild), dann Stride
+    sh, sw = _pair(stride)
+    return full[:, :, kh - 1:H:sh, kw - 1:W:sw]
+
+
+CONV_METHODS = {
+    "direct": _conv_direct,
+    "im2col": _conv_im2col,
+    "fft": _conv_fft,
+}
+
+# Schwellen für `choose_method`, abgelesen aus `python conv_engine.py --crossover` (ein Kern, float32).
+# Die FFT kostet pro Pixel etwa gleich viel, der direkte Weg wächst mit der Kernelfläche — und bei großen
+# Bildern (schlechtere Cache-Nutzung) schneller, deshalb kippt es dort schon bei kleineren Kerneln.
+FFT_MIN_KERNEL_AREA = ((2048, 25), (512, 49), (0, 64))  # (ab Bildseite, ab Kernelfläche)
+IM2COL_MIN_CHANNELS = 48         # C·F, ab dem eine große GEMM gegen kh·kw kleine gewinnt ...
+IM2COL_MIN_PIXELS = 65536        # ... sofern genug Ausgabepixel (N·H·W) zusammenkommen
+IM2COL_MAX_BYTES = 1 << 28       # größere im2col-Matrizen nicht anlegen
+OVERLAP_ADD_MIN_SIDE = 1024      # größere Bilder in Blöcken transformieren
+OVERLAP_ADD_BLOCK = 512
+
+
+def choose_method(x_shape, weight_shape, stride=1, dilation=1, itemsize=4):
+    """
+    Heuristik für `conv2d(method="auto")`: FFT für große Kernel (Stride 1),
+    im2col bei vielen Kanal-Kombinationen auf großen Bildern, sonst direkt
+    (kh·kw Multiply-Adds ohne Zwischenkopie). `x_shape` ist (N, C, H, W)
+    nach dem Padding.
+    """
+    F, C, kh, kw = weight_shape
+    N, H, W = x_shape[0], x_shape[-2], x_shape[-1]
+    dh, dw = _pair(dilation)
+    fits = min(H - dh * (kh - 1), W - dw * (kw - 1)) >= 1
+    if _pair(stride) == (1, 1) and fits:
+        min_area = next(area for side, area in FFT_MIN_KERNEL_AREA if min(H, W) >= side)
+        if kh * kw >= min_area:
+            return "fft"
+    if (C * F >= IM2COL_MIN_CHANNELS and N * H * W >= IM2COL_MIN_PIXELS
+            and N * H * W * C * kh * kw * itemsize <= IM2COL_MAX_BYTES):
+        return "im2col"
+    return "direct"
+
+
+def conv2d(x, weight, bias=None, stride=1, padding=0, dilation=1, method="auto"):
+    """
+    Batch-Convolution (Kreuzkorrelation).
+
+    x: (N, C, H, W) oder (H, W); weight: (F, C, kh, kw) oder (kh, kw);
+    bias: (F,) oder None. `method` ist "direct", "im2col", "fft" oder
+    "auto" (siehe `choose_method`). Gibt (N, F, H_out, W_out) zurück bzw.
+    (H_out, W_out) für ein einzelnes Graustufenbild.
+    """
+    x, weight, single = _as_batch(np.asarray(x), np.asarray(weight))
+    F, C, kh, kw = weight.shape
+    if x.shape[1] != C:
+        raise ValueError(f"Eingabe hat {x.shape[1]} Kanäle, der Kernel erwartet {C}")
+    dtype = np.result_type(x.dtype, weight.dtype, np.float32)
+    xp = pad_input(x.astype(dtype, copy=False), resolve_padding(padding, (kh, kw), dilation))
+    if method == "auto":
+        method = choose_method(xp.shape, weight.shape, stride, dilation, np.dtype(dtype).itemsize)
+    if method not in CONV_METHODS:
+        raise ValueError(f"Unbekannte Methode '{method}' (erlaubt: auto, {', '.join(CONV_METHODS)})")
+
+    window_view(xp[:1, :1], (kh, kw), stride, dilation)  # prüft, ob der Kernel ins Bild passt
+    out = CONV_METHODS[method](xp, weight.astype(dtype, copy=False), stride, dilation)
+    if bias is not None:
+        out += np.asarray(bias, dtype=dtype)[None, :, None, None]
+    return out[0, 0] if single else np.ascontiguousarray(out)
+
+
+def conv2d_backward(dout, x, weight, stride=1, padding=0, dilation=1):
+    """
+    Gradienten von `conv2d` nach Eingabe, Gewichten und Bias.
+
+    dout: (N, F, H_out, W_out). Gibt (dx, dweight, dbias) in den Formen von
+    x (N, C, H, W), weight (F, C, kh, kw) und bias (F,) zurück.
+    """
+    x, weight = np.asarray(x), np.asarray(weight)
+    F, C, kh, kw = weight.shape
+    pads = resolve_padding(padding, (kh, kw), dilation)
+    xp = pad_input(x, pads)
+    cols = window_view(xp, (kh, kw), stride, dilation)
+    N, H_out, W_out = cols.shape[:3]
+
+    dweight = np.tensordot(dout, cols, axes=([0, 2, 3], [0, 1, 2]))
+    dbias = dout.sum(axis=(0, 2, 3))
+
+    dx_padded = np.zeros(xp.shape, dtype=np.result_type(dout.dtype, weight.dtype))
+    # Beitrag des Kernel-Offsets (i, j): Σ_f dout[n, f] * weight[f, c, i, j]
+    _scatter_windows(dx_padded, lambda i, j: np.tensordot(weight[:, :, i, j], dout, axes=([0], [1])).transpose(1, 0, 2, 3),
+                     (kh, kw), stride, dilation, H_out, W_out)
+    return _unpad(dx_padded, pads), dweight, dbias
+
+
+# ============================================================================
+# Pooling
+# ============================================================================
+
+def max_pool2d(x, size=2, stride=None):
+    """Max-Pooling über alle Fenster (stride = size, wenn nicht angegeben)."""
+    windows = window_view(np.asarray(x), size, stride or size)
+    return windows.max(axis=(4, 5)).transpose(0, 3, 1, 2)
+
+
+def max_pool2d_backward(dout, x, size=2, stride=None):
+    """Leitet `dout` an die Position des Maximums jedes Fensters weiter."""
+    kh, kw = _pair(size)
+    windows = window_view(np.asarray(x), size, stride or size)
+    N, H_out, W_out, C = windows.shape[:4]
+    argmax = windows.reshape(N, H_out, W_out, C, kh * kw).argmax(axis=-1).transpose(0, 3, 1, 2)
+    dx = np.zeros(x.shape, dtype=dout.dtype)
+    _scatter_windows(dx, lambda i, j: np.where(argmax == i * kw + j, dout, 0), size, stride or size, 1,
+                     H_out, W_out)
+    return dx
+
+
+def avg_pool2d(x, size=2, stride=None):
+    """Average-Pooling über alle Fenster (stride = size, wenn nicht angegeben)."""
+    windows = window_view(np.asarray(x), size, stride or size)
+    return windows.mean(axis=(4, 5)).transpose(0, 3, 1, 2)
+
+
+def avg_pool2d_backward(dout, x, size=2, stride=None):
+    """Verteilt `dout` gleichmäßig auf alle Pixel des jeweiligen Fensters."""
+    kh, kw = _pair(size)
+    H_out, W_out = dout.shape[2:]
+    dx = np.zeros(x.shape, dtype=dout.dtype)
+    share = dout / (kh * kw)
+    _scatter_windows(dx, lambda i, j: share, size, stride or size, 1, H_out, W_out)
+    return dx
+
+
+# ============================================================================
+# Layer (Forward merkt sich die Eingabe für den Backward-Pass)
+# ============================================================================
+
+class Conv2D:
+    def __init__(self, in_channels, out_channels, kernel_size=3, stride=1, padding=0, dilation=1,
+                 random_state=None, dtype=np.float32):
+        kh, kw = _pair(kernel_size)
+        rng = np.random.default_rng(random_state)
+        scale = np.sqrt(2.0 / (in_channels * kh * kw))  # He-Initialisierung
+        self.weight = (rng.standard_normal((out_channels, in_channels, kh, kw)) * scale).astype(dtype)
+        self.bias = np.zeros(out_channels, dtype=dtype)
+        self.stride, self.padding, self.dilation = stride, padding, dilation
+        self.grad_weight = self.grad_bias = None
+        self._x = None
+
+    def forward(self, x):
+        self._x = x
+        return conv2d(x, self.weight, self.bias, self.stride, self.padding, self.dilation)
+
+    def backward(self, dout):
+        dx, self.grad_weight, self.grad_bias = conv2d_backward(
+            dout, self._x, self.weight, self.stride, self.padding, self.dilation)
+        return dx
+
+
+class MaxPool2D:
+    def __init__(self, size=2, stride=None):
+        self.size, self.stride = size, stride
+        self._x = None
+
+    def forward(self, x):
+        self._x = x
+        return max_pool2d(x, self.size, self.stride)
+
+    def backward(self, dout):
+        return max_pool2d_backward(dout, self._x, self.size, self.stride)
+
+
+class AvgPool2D(MaxPool2D):
+    def forward(self, x):
+        self._x = x
+        return avg_pool2d(x, self.size, self.stride)
+
+    def backward(self, dout):
+        return avg_pool2d_backward(dout, self._x, self.size, self.stride)
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+def _best_of(fn, repeats=3):
+    best = np.inf
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def benchmark(sizes=(64, 256, 1024, 2048), kernel_sizes=(3, 5)):
+    from scipy.signal import convolve2d
+
+    rng = np.random.default_rng(0)
+    print("Einzelbild, ein Kanal, float32, 'same'-Padding mit Nullen (Zeiten in ms)")
+    header = f"{'Bild':>10} {'Kernel':>6} {'im2col':>9} {'auto':>14} {'convolve2d':>11}"
+    print(header + (f" {'filter2D':>9}" if CV2_AVAILABLE else ""))
+    for size in sizes:
+        image = rng.random((size, size), dtype=np.float32)
+        for k in kernel_sizes:
+            kernel = rng.standard_normal((k, k)).astype(np.float32)
+            t_ours, ours = _best_of(lambda: conv2d(image, kernel, padding="same", method="im2col"))
+            # convolve2d spiegelt den Kernel; gespiegelt übergeben ergibt dieselbe Kreuzkorrelation
+            t_scipy, ref = _best_of(lambda: convolve2d(image, kernel[::-1, ::-1], mode="same"))
+            t_auto, auto = _best_of(lambda: conv2d(image, kernel, padding="same"))
+            assert np.allclose(ours, ref, atol=1e-3) and np.allclose(auto, ref, atol=1e-3)
+            method = choose_method((1, 1, size + k - 1, size + k - 1), (1, 1, k, k))
+            line = (f"{size:>5}x{size:<4} {k:>4}x{k} {1000 * t_ours:9.2f} {1000 * t_auto:7.2f} ({method:<6})"
+                    f"{1000 * t_scipy:11.2f}")
+            if CV2_AVAILABLE:
+                t_cv2, _ = _best_of(lambda: cv2.filter2D(image, -1, kernel, borderType=cv2.BORDER_CONSTANT))
+                line += f" {1000 * t_cv2:9.2f}"
+            print(line)
+
+    N, C, F, size = 8, 16, 32, 64
+    x = rng.standard_normal((N, C, size, size)).astype(np.float32)
+    w = rng.standard_normal((F, C, 3, 3)).astype(np.float32)
+    t_ours, _ = _best_of(lambda: conv2d(x, w, padding=1, method="im2col"))
+    t_loop, _ = _best_of(lambda: [[sum(convolve2d(x[n, c], w[f, c, ::-1, ::-1], mode="same") for c in range(C))
+                                   for f in range(F)] for n in range(N)], repeats=1)
+    print(f"\nBatch {N}x{C}x{size}x{size}, {F} Filter 3x3: im2col {1000 * t_ours:.1f} ms, "
+          f"convolve2d-Schleife {1000 * t_loop:.1f} ms (Faktor {t_loop / t_ours:.0f})")
+
+
+def crossover(sizes=(128, 512, 2048), kernel_sizes=(3, 5, 7, 9, 15, 31), channels=((1, 1), (4, 8))):
+    """Laufzeit jeder Methode pro Bild- und Kernelgröße; zeigt, wo sich welche Methode lohnt."""
+    rng = np.random.default_rng(0)
+    print(f"{'C->F':>6} {'Bild':>10} {'Kernel':>7} {'direct':>9} {'im2col':>9} {'fft':>9}  schnellste  auto")
+    for C, F in channels:
+        for size in sizes:
+            x = rng.random((1, C, size, size), dtype=np.float32)
+            for k in kernel_sizes:
+                w = rng.standard_normal((F, C, k, k)).astype(np.float32)
+                times = {}
+                for method in CONV_METHODS:
+                    # im2col-Matrix > 1 GB: nicht messen
+                    if method == "im2col" and 4 * C * k * k * size * size > 1 << 30:
+                        times[method] = np.inf
+                        continue
+                    times[method], _ = _best_of(lambda: conv2d(x, w, padding="same", method=method), repeats=2)
+                fastest = min(times, key=times.get)
+                auto = choose_method(x.shape, w.shape)
+                cells = " ".join(f"{1000 * t:9.1f}" if np.isfinite(t) else f"{'—':>9}" for t in times.values())
+                print(f"{C:>3}->{F:<2} {size:>5}x{size:<4} {k:>3}x{k:<3} {cells}  {fastest:<10}  "
+                      f"{auto}{'' if auto == fastest else ' *'}")
+    print("(Zeiten in ms; * = Heuristik wählt nicht die schnellste Methode)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="im2col-Convolution vs. convolve2d / cv2.filter2D")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 256, 1024, 2048])
+    parser.add_argument("--kernels", type=int, nargs="+", default=[3, 5])
+    parser.add_argument("--crossover", action="store_true",
+                        help="direct vs. im2col vs. FFT über Bild- und Kernelgrößen (Schwellen für choose_method)")
+    args = parser.parse_args()
+    if args.crossover:
+        crossover()
+    else:
+        benchmark(args.sizes, args.kernels)
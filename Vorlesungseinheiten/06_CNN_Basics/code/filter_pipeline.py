@@ -0,0 +1,218 @@
+"""
+🧩 Filter-Pipeline für große Bilder im CNN Filter Explorer
+
+*   Das hochgeladene Bild wird einmal dekodiert und unter seinem Hash
+    gecacht, ebenso jede Zwischenstufe einer Filterkette — wird nur der
+    letzte Filter geändert, kommen alle vorherigen Stufen aus dem Cache.
+*   Große Bilder (z.B. 50+ Megapixel) werden in überlappende Kacheln
+    zerlegt und in einem Thread-Pool gefiltert (OpenCV gibt den GIL frei).
+    Die Überlappung entspricht dem Kernel-Radius, das Ergebnis ist damit
+    pixelgenau dasselbe wie bei einem einzigen Aufruf.
+*   `preview` liefert eine verkleinerte Version, die sofort angezeigt
+    werden kann, bevor die volle Auflösung fertig ist.
+
+Vergleich ganzes Bild vs. Kacheln::
+
+    python filter_pipeline.py --megapixels 50
+"""
+
+import argparse
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# Name -> (Kernel, auf Graustufen anwenden?)
+FILTERS = {
+    "Original": (None, False),
+    # Vertikale Kanten
+    "Edge Detection (Sobel X)": (np.array([[-1, 0, 1], [-2, 0, 2], [-1, 0, 1]]), True),
+    # Horizontale Kanten
+    "Edge Detection (Sobel Y)": (np.array([[-1, -2, -1], [0, 0, 0], [1, 2, 1]]), True),
+    # Alle Kanten
+    "Edge Detection (Laplacian)": (np.array([[0, 1, 0], [1, -4, 1], [0, 1, 0]]), True),
+    # Verstärkt die Mitte, zieht Nachbarn ab (auf Farbe anwendbar)
+    "Sharpen": (np.array([[0, -1, 0], [-1, 5, -1], [0, -1, 0]]), False),
+    # Mittelwertbildung (Weichzeichner)
+    "Blur (Average)": (np.ones((5, 5), np.float32) / 25, False),
+    # Relief-Effekt
+    "Emboss": (np.array([[-2, -1, 0], [-1, 1, 1], [0, 1, 2]]), True),
+}
+
+
+def image_hash(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def decode(data):
+    """Bytes einer Bilddatei -> RGB-Array (uint8)."""
+    return np.array(Image.open(io.BytesIO(data)).convert("RGB"))
+
+
+def to_gray(image):
+    return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY) if image.ndim == 3 else image
+
+
+def apply_filter(image, filter_type):
+    """Ein Filter auf das ganze Bild (Referenz für die Kachel-Variante)."""
+    kernel, gray = FILTERS[filter_type]
+    if kernel is None:
+        return image
+    return cv2.filter2D(to_gray(image) if gray else image, -1, kernel)
+
+
+def tiles(shape, tile_size):
+    """Kachel-Grenzen (y0, y1, x0, x1), die das Bild lückenlos überdecken."""
+    H, W = shape[:2]
+    return [(y, min(y + tile_size, H), x, min(x + tile_size, W))
+            for y in range(0, H, tile_size) for x in range(0, W, tile_size)]
+
+
+def apply_filter_tiled(image, filter_type, executor=None, tile_size=1024):
+    """
+    Wie `apply_filter`, aber in überlappenden Kacheln, optional parallel.
+
+    Jede Kachel wird mit einem Rand von Kernel-Radius Pixeln ausgeschnitten;
+    am Bildrand greift wie beim ganzen Bild die Randbehandlung von OpenCV.
+    """
+    kernel, gray = FILTERS[filter_type]
+    if kernel is None:
+        return image
+    source = to_gray(image) if gray else image
+    H, W = source.shape[:2]
+    if H <= tile_size and W <= tile_size:
+        return cv2.filter2D(source, -1, kernel)
+
+    halo = max(kernel.shape) // 2
+    out = np.empty_like(source)
+
+    def work(bounds):
+        y0, y1, x0, x1 = bounds
+        ya, yb = max(y0 - halo, 0), min(y1 + halo, H)
+        xa, xb = max(x0 - halo, 0), min(x1 + halo, W)
+        filtered = cv2.filter2D(source[ya:yb, xa:xb], -1, kernel)
+        out[y0:y1, x0:x1] = filtered[y0 - ya:y1 - ya, x0 - xa:x1 - xa]
+
+    if executor is None:
+        for bounds in tiles(source.shape, tile_size):
+            work(bounds)
+    else:
+        list(executor.map(work, tiles(source.shape, tile_size)))
+    return out
+
+
+def preview(image, max_side=1024):
+    """Verkleinerte Kopie (längste Seite höchstens `max_side`), für die Sofort-Anzeige."""
+    H, W = image.shape[:2]
+    scale = max_side / max(H, W)
+    if scale >= 1:
+        return image
+    return cv2.resize(image, (max(int(W * scale), 1), max(int(H * scale), 1)), interpolation=cv2.INTER_AREA)
+
+
+class FilterPipeline:
+    """
+    Dekodierte Bilder und Zwischenstufen von Filterketten, gecacht nach
+    (Bild-Hash, Auflösung, Kette). Verdrängt wird nach Speicherbedarf (LRU).
+    """
+
+    def __init__(self, max_bytes=1 << 30, workers=None, tile_size=1024):
+        self.max_bytes = max_bytes
+        self.tile_size = tile_size
+        self.executor = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+        self._cache = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            value = self._cache.get(key)
+            if value is not None:
+                self._cache.move_to_end(key)
+            return value
+
+    def _put(self, key, value):
+        value.setflags(write=False)  # Gecachte Arrays sind geteilt: niemand darf sie verändern
+        with self._lock:
+            if key in self._cache:
+                return
+            self._cache[key] = value
+            self._nbytes += value.nbytes
+            while self._nbytes > self.max_bytes and len(self._cache) > 1:
+                _, old = self._cache.popitem(last=False)
+                self._nbytes -= old.nbytes
+
+    def image(self, data, key=None, max_side=None):
+        """Dekodiertes Bild (bzw. seine Vorschau mit längster Seite `max_side`)."""
+        key = key or image_hash(data)
+        cache_key = (key, max_side, ())
+        cached = self._get(cache_key)
+        if cached is None:
+            if max_side is None:
+                cached = decode(data)
+            else:
+                cached = preview(self.image(data, key), max_side)
+            self._put(cache_key, cached)
+        return cached
+
+    def run(self, data, chain, key=None, max_side=None):
+        """
+        Wendet die Filter in `chain` nacheinander an. Jede Zwischenstufe wird
+        gecacht, die längste bereits berechnete Teilkette wird wiederverwendet.
+        """
+        key = key or image_hash(data)
+        chain = tuple(name for name in chain if name != "Original")
+        done = len(chain)
+        while done and self._get((key, max_side, chain[:done])) is None:
+            done -= 1
+        result = self._get((key, max_side, chain[:done])) if done else self.image(data, key, max_side)
+        for i in range(done, len(chain)):
+            result = apply_filter_tiled(result, chain[i], self.executor, self.tile_size)
+            self._put((key, max_side, chain[:i + 1]), result)
+        return result
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+
+def benchmark(megapixels=50, filter_type="Blur (Average)", tile_size=1024, workers=None):
+    side = int(np.sqrt(megapixels * 1e6))
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, (side, side, 3), dtype=np.uint8)
+    workers = workers or os.cpu_count() or 1
+    print(f"Bild {side}x{side} ({image.nbytes / 1e6:.0f} MB), Filter '{filter_type}', {workers} Threads")
+
+    t0 = time.perf_counter()
+    full = apply_filter(image, filter_type)
+    t_full = time.perf_counter() - t0
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        t0 = time.perf_counter()
+        tiled = apply_filter_tiled(image, filter_type, executor, tile_size)
+        t_tiled = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    small = apply_filter(preview(image), filter_type)
+    t_preview = time.perf_counter() - t0
+
+    print(f"ganzes Bild     {1000 * t_full:8.1f} ms")
+    print(f"Kacheln {tile_size:>5}   {1000 * t_tiled:8.1f} ms  (identisch: {np.array_equal(full, tiled)})")
+    print(f"Vorschau {small.shape[1]}x{small.shape[0]} {1000 * t_preview:6.1f} ms (inkl. Verkleinern)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gekachelte, parallele Filter-Pipeline")
+    parser.add_argument("--megapixels", type=float, default=50)
+    parser.add_argument("--filter", default="Blur (Average)", choices=[f for f in FILTERS if f != "Original"])
+    parser.add_argument("--tile-size", type=int, default=1024)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    benchmark(args.megapixels, args.filter, args.tile_size, args.workers)
@@ -1,7 +1,12 @@
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.signal import convolve2d
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from conv_engine import conv2d, max_pool2d
+
 def show_image(img, title):
     plt.imshow(img, cmap='gray')
     plt.title(title)
@@ -65,4 +70,22 @@ print("\n--- Max Pooling (2x2) ---")
 block = feature_map_v[0:2, 0:2]
 print(f"2x2 Block aus Feature Map:\n{block}")
 pooled_val = np.max(block)
-print(f"Max Pooled Wert: {pooled_val}")
\ No newline at end of file
+print(f"Max Pooled Wert: {pooled_val}")
+
+# 6. Dasselbe für die ganze Feature Map - mit der eigenen Layer-Bibliothek (conv_engine.py)
+print("\n--- im2col-Convolution & Pooling über alle Fenster ---")
+# Beide Filter als ein Conv-Layer: Gewichte (F=2, C=1, 3, 3). convolve2d spiegelt den Kernel,
+# ein CNN-Layer nicht - deshalb übergeben wir die gespiegelten Kernel.
+weights = np.stack([kernel_vertical, kernel_horizontal])[:, None, ::-1, ::-1]
+feature_maps = conv2d(image[None, None], weights)  # (N=1, F=2, 8, 8)
+print(f"Feature Maps Shape: {feature_maps.shape}, identisch mit convolve2d: "
+      f"{np.allclose(feature_maps[0, 0], feature_map_v) and np.allclose(feature_maps[0, 1], feature_map_h)}")
+
+pooled = max_pool2d(feature_maps, size=2)
+print(f"Nach 2x2 Max Pooling: {pooled.shape}")
+print(f"Vertikale Kanten, gepoolt:\n{pooled[0, 0]}")
+
+# Stride und Padding verändern die Ausgabegröße
+for stride, padding in [(1, 1), (2, 1)]:
+    print(f"Stride {stride}, Padding {padding}: {conv2d(image[None, None], weights, stride=stride, padding=padding).shape}")
+
@@ -1,8 +1,13 @@
+import os
+import sys
 import streamlit as st
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from attention_engine import scaled_dot_product_attention
+
 st.title("Unit 07: Attention Mechanismus")
 st.markdown("Visualisierung der **Scaled Dot-Product Attention**: $Attention(Q, K, V) = softmax(\\frac{QK^T}{\\sqrt{d_k}})V$")
 
@@ -14,6 +19,8 @@ d_k = st.sidebar.slider("Embedding Dimension (d_k)", 2, 10, 4)
 st.sidebar.markdown("---")
 st.sidebar.write("**Werte bearbeiten:**")
 seed = st.sidebar.number_input("Random Seed", 0, 100, 42)
+causal = st.sidebar.checkbox("Kausale Maske (Decoder, z.B. GPT)", value=False,
+                             help="Jedes Wort darf nur auf sich selbst und frühere Wörter achten.")
 
 # --- Berechnung ---
 np.random.seed(seed)
@@ -24,21 +31,11 @@ Q = np.random.randn(seq_len, d_k)
 K = np.random.randn(seq_len, d_k)
 V = np.random.randn(seq_len, d_k)
 
-# 1. Dot Product (Scores)
+# 1. Dot Product (Scores) - nur für die Anzeige
 scores = np.dot(Q, K.T)
 
-# 2. Scaling
-scaled_scores = scores / np.sqrt(d_k)
-
-# 3. Softmax
-def softmax(x):
-    e_x = np.exp(x - np.max(x, axis=-1, keepdims=True))
-    return e_x / np.sum(e_x, axis=-1, keepdims=True)
-
-attention_weights = softmax(scaled_scores)
-
-# 4. Output
-output = np.dot(attention_weights, V)
+# 2.-4. Scaling, (Maske), Softmax und gewichtete Summe
+output, attention_weights = scaled_dot_product_attention(Q, K, V, causal=causal)
 
 # --- Visualisierung ---
 
@@ -56,7 +53,8 @@ with col1:
 
 with col2:
     st.subheader("2. Attention Weights")
-    st.write("Nach Scaling & Softmax (Summe pro Zeile = 1)")
+    st.write("Nach Scaling & Softmax (Summe pro Zeile = 1)"
+             + (" — maskierte Felder (Zukunft) sind 0" if causal else ""))
     fig, ax = plt.subplots(figsize=(4,3))
     sns.heatmap(attention_weights, annot=True, fmt=".2f", cmap="viridis", cbar=False, ax=ax)
     ax.set_title("Attention Weights (Wahrscheinlichkeiten)")
@@ -0,0 +1,492 @@
+"""
+⚡ Batched Multi-Head Attention
+
+`lab.py` rechnet Attention für eine einzelne (seq_len, d_k)-Matrix mit
+`np.dot`. Hier arbeiten alle Funktionen auf Tensoren der Form
+(batch, heads, seq, d_k): Ein `np.matmul` über die beiden letzten Achsen
+rechnet alle Köpfe aller Sequenzen auf einmal — dasselbe wie
+`np.einsum("bhqd,bhkd->bhqk", Q, K)`, aber direkt über BLAS.
+
+*   Masken sind Bool-Arrays, True = darf angeschaut werden. `causal_mask`
+    (Decoder, GPT) und `padding_mask` (unterschiedlich lange Sequenzen im
+    Batch) lassen sich beliebig kombinieren; maskierte Scores werden -inf.
+*   Score- und Output-Puffer können vorallokiert übergeben werden, dann
+    entsteht pro Aufruf kein neues großes Array. `MultiHeadAttention` hält
+    solche Puffer je Eingabeform selbst vor.
+*   Gerechnet wird im Datentyp der Eingaben — float32 halbiert Speicher
+    und Bandbreite gegenüber float64.
+*   `blockwise_attention` hält nie die ganze seq × seq-Matrix: Keys und
+    Values werden blockweise verarbeitet, die Softmax läuft "online" mit
+    laufendem Maximum und laufender Summe (Prinzip von FlashAttention).
+*   `KVCache` + `MultiHeadAttention.step` für autoregressives Decoding:
+    Keys und Values bereits erzeugter Tokens werden gespeichert, ein neues
+    Token kostet O(seq) statt einer kompletten Neuberechnung in O(seq²).
+
+Laufzeit und Speicher über die Sequenzlänge::
+
+    python attention_engine.py --seq-lens 128 512 2048 8192
+    python attention_engine.py --memory
+    python attention_engine.py --decode
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+
+# ============================================================================
+# Köpfe & Masken
+# ============================================================================
+
+def split_heads(X, num_heads):
+    """(batch, seq, d_model) -> (batch, heads, seq, d_model / heads)."""
+    B, S, D = X.shape
+    return X.reshape(B, S, num_heads, D // num_heads).transpose(0, 2, 1, 3)
+
+
+def merge_heads(X):
+    """(batch, heads, seq, d_k) -> (batch, seq, heads * d_k), Köpfe konkateniert."""
+    B, H, S, d_k = X.shape
+    return X.transpose(0, 2, 1, 3).reshape(B, S, H * d_k)
+
+
+def causal_mask(q_len, k_len=None):
+    """
+    (q_len, k_len): Query i sieht nur Keys bis zu ihrer eigenen Position.
+
+    Bei k_len > q_len sind die Queries die letzten q_len Positionen der
+    Sequenz (z.B. neue Tokens hinter bereits bekannten Keys).
+    """
+    k_len = q_len if k_len is None else k_len
+    return np.tri(q_len, k_len, k_len - q_len, dtype=bool)
+
+
+def padding_mask(lengths, seq_len):
+    """(batch, 1, 1, seq_len): True für die ersten `lengths[b]` Tokens, False für Padding."""
+    return (np.arange(seq_len) < np.asarray(lengths)[:, None])[:, None, None, :]
+
+
+def combine_masks(*masks):
+    """Logisches UND aller Masken (None wird ignoriert); None, wenn keine übrig bleibt."""
+    masks = [m for m in masks if m is not None]
+    if not masks:
+        return None
+    mask = masks[0]
+    for m in masks[1:]:
+        mask = mask & m
+    return mask
+
+
+# ============================================================================
+# Attention
+# ============================================================================
+
+def softmax_(scores):
+    """
+    Softmax über die letzte Achse, in place.
+
+    Zeilen, die komplett maskiert sind (nur -inf), werden zu 0 statt NaN —
+    ihr Output ist dann der Nullvektor.
+    """
+    row_max = scores.max(axis=-1, keepdims=True)
+    row_max[~np.isfinite(row_max)] = 0
+    scores -= row_max
+    np.exp(scores, out=scores)
+    total = scores.sum(axis=-1, keepdims=True)
+    total[total == 0] = 1
+    scores /= total
+    return scores
+
+
+def scaled_dot_product_attention(Q, K, V, mask=None, causal=False, key_lengths=None, out=None, scores=None):
+    """
+    softmax(Q K^T / sqrt(d_k)) V für gestapelte Matrizen.
+
+    Q: (..., seq_q, d_k), K: (..., seq_k, d_k), V: (..., seq_k, d_v), die
+    führenden Achsen typischerweise (batch, heads).
+    mask: Bool, broadcastbar auf (..., seq_q, seq_k), True = sichtbar.
+    causal: zusätzlich `causal_mask(seq_q, seq_k)`.
+    key_lengths: echte Länge jeder Sequenz im Batch (nur bei 4D-Eingaben),
+    die Keys dahinter sind Padding.
+    out / scores: optionale Puffer der Form (..., seq_q, d_v) bzw.
+    (..., seq_q, seq_k) im Rechen-Datentyp, werden überschrieben.
+
+    Gibt (output, attention_weights) zurück wie `lab.scaled_dot_product_attention`;
+    die Gewichte liegen im Score-Puffer.
+    """
+    dtype = np.result_type(Q, K, V, np.float32)
+    lead = Q.shape[:-2]
+    seq_q, d_k = Q.shape[-2:]
+    seq_k = K.shape[-2]
+
+    if scores is None:
+        scores = np.empty(lead + (seq_q, seq_k), dtype)
+    np.matmul(Q, K.swapaxes(-1, -2), out=scores)
+    scores *= dtype.type(1.0 / np.sqrt(d_k))
+
+    mask = combine_masks(mask,
+                         causal_mask(seq_q, seq_k) if causal else None,
+                         padding_mask(key_lengths, seq_k) if key_lengths is not None else None)
+    if mask is not None:
+        np.copyto(scores, -np.inf, where=~mask)
+    softmax_(scores)
+
+    if out is None:
+        out = np.empty(lead + (seq_q, V.shape[-1]), dtype)
+    np.matmul(scores, V, out=out)
+    return out, scores
+
+
+class MultiHeadAttention:
+    """
+    Multi-Head Self-Attention mit Projektionen W_q, W_k, W_v (fusioniert) und W_o.
+
+    Eingabe (batch, seq, d_model), Ausgabe gleiche Form. Score- und
+    Output-Puffer werden je Eingabeform einmal angelegt und bei jedem
+    weiteren Aufruf wiederverwendet.
+    """
+
+    def __init__(self, d_model, num_heads, dtype=np.float32, seed=0):
+        if d_model % num_heads:
+            raise ValueError(f"d_model={d_model} ist nicht durch num_heads={num_heads} teilbar")
+        rng = np.random.default_rng(seed)
+        scale = 1.0 / np.sqrt(d_model)
+        self.num_heads = num_heads
+        self.dtype = np.dtype(dtype)
+        self.W_qkv = (rng.standard_normal((d_model, 3 * d_model)) * scale).astype(self.dtype)
+        self.W_o = (rng.standard_normal((d_model, d_model)) * scale).astype(self.dtype)
+        self._buffers = {}
+
+    def buffers(self, batch, seq, d_k):
+        key = (batch, seq, d_k)
+        if key not in self._buffers:
+            self._buffers[key] = (np.empty((batch, self.num_heads, seq, seq), self.dtype),
+                                  np.empty((batch, self.num_heads, seq, d_k), self.dtype))
+        return self._buffers[key]
+
+    def project(self, X):
+        """(batch, seq, d_model) -> Q, K, V je (batch, heads, seq, d_k)."""
+        return [split_heads(part, self.num_heads) for part in np.split(X @ self.W_qkv, 3, axis=-1)]
+
+    def __call__(self, X, causal=False, key_lengths=None, return_weights=False, block_size=None):
+        """
+        Die zurückgegebenen Gewichte sind der interne Puffer — beim nächsten
+        Aufruf gleicher Form überschrieben. Mit `block_size` wird blockweise
+        gerechnet (`blockwise_attention`, ohne Score-Puffer und ohne Gewichte).
+        """
+        X = np.asarray(X, dtype=self.dtype)
+        B, S, D = X.shape
+        Q, K, V = self.project(X)
+        if block_size is not None:
+            out = blockwise_attention(Q, K, V, causal=causal, key_lengths=key_lengths, block_size=block_size)
+            return merge_heads(out) @ self.W_o
+        scores, out = self.buffers(B, S, D // self.num_heads)
+        out, weights = scaled_dot_product_attention(Q, K, V, causal=causal, key_lengths=key_lengths,
+                                                    out=out, scores=scores)
+        result = merge_heads(out) @ self.W_o
+        return (result, weights) if return_weights else result
+
+    def new_cache(self, batch=1, capacity=256):
+        d_k = self.W_o.shape[0] // self.num_heads
+        return KVCache(batch, self.num_heads, d_k, capacity=capacity, dtype=self.dtype)
+
+    def step(self, X, cache, block_size=256):
+        """
+        Inkrementelles Decoding: X (batch, t, d_model) sind die t neuen
+        Tokens hinter den bereits in `cache` liegenden. Ihre Keys/Values
+        werden angehängt, die Queries schauen auf alle bisherigen Keys.
+
+        Für t = 1 (ein generiertes Token) ist das ein (1 × seq)-Produkt, also
+        O(seq). Für t > 1 (Prompt einlesen) kausal und blockweise.
+        Liefert dasselbe wie `self(ganze Sequenz, causal=True)[:, -t:]`.
+        """
+        X = np.asarray(X, dtype=self.dtype)
+        Q, K, V = self.project(X)
+        cache.append(K, V)
+        if X.shape[1] == 1:
+            out, _ = scaled_dot_product_attention(Q, cache.keys, cache.values)
+        else:
+            out = blockwise_attention(Q, cache.keys, cache.values, causal=True, block_size=block_size)
+        return merge_heads(out) @ self.W_o
+
+    def clear(self):
+        self._buffers.clear()
+
+
+def blockwise_attention(Q, K, V, causal=False, key_lengths=None, block_size=128, out=None):
+    """
+    Wie `scaled_dot_product_attention`, aber ohne die volle Score-Matrix.
+
+    Für jeden Query-Block werden die Key/Value-Blöcke nacheinander
+    verarbeitet. Pro Query-Zeile laufen mit: das bisherige Maximum m, die
+    Summe l der exp(score - m) und der ungenormte Output acc. Kommt ein
+    Block mit größerem Maximum, werden l und acc mit exp(m_alt - m_neu)
+    umskaliert; am Ende ist out = acc / l — exakt die Softmax über alle Keys.
+
+    Gleichzeitig existieren nur Scores der Form (..., block, block). Bei
+    `causal` werden Key-Blöcke rechts der Diagonale gar nicht erst gerechnet.
+    Beliebige Masken werden nicht unterstützt (sie wären selbst seq × seq);
+    nur `causal` und `key_lengths`. Gibt nur den Output zurück.
+    """
+    dtype = np.result_type(Q, K, V, np.float32)
+    lead = Q.shape[:-2]
+    seq_q, d_k = Q.shape[-2:]
+    seq_k, d_v = K.shape[-2], V.shape[-1]
+    offset = seq_k - seq_q  # Queries sind die letzten seq_q Positionen (wie bei causal_mask)
+    scale = dtype.type(1.0 / np.sqrt(d_k))
+    lengths = None if key_lengths is None else np.asarray(key_lengths)[:, None, None, None]
+
+    if out is None:
+        out = np.empty(lead + (seq_q, d_v), dtype)
+    # Puffer einmal anlegen, Randblöcke sind Views davon
+    scores_buf = np.empty(lead + (block_size, block_size), dtype)
+    pv_buf = np.empty(lead + (block_size, d_v), dtype)
+    row_max = np.empty(lead + (block_size, 1), dtype)
+    row_sum = np.empty(lead + (block_size, 1), dtype)
+    new_max = np.empty(lead + (block_size, 1), dtype)
+    reference = np.empty(lead + (block_size, 1), dtype)
+    correction = np.empty(lead + (block_size, 1), dtype)
+
+    for q0 in range(0, seq_q, block_size):
+        q1 = min(q0 + block_size, seq_q)
+        bq = q1 - q0
+        m, l, m_new = row_max[..., :bq, :], row_sum[..., :bq, :], new_max[..., :bq, :]
+        ref, corr = reference[..., :bq, :], correction[..., :bq, :]
+        acc = out[..., q0:q1, :]
+        m.fill(-np.inf)
+        l.fill(0)
+        acc.fill(0)
+        k_end = min(seq_k, q1 + offset) if causal else seq_k
+
+        for k0 in range(0, k_end, block_size):
+            k1 = min(k0 + block_size, k_end)
+            s = scores_buf[..., :bq, :k1 - k0]
+            np.matmul(Q[..., q0:q1, :], K[..., k0:k1, :].swapaxes(-1, -2), out=s)
+            s *= scale
+            if causal and k1 > q0 + offset + 1:  # Block schneidet die Diagonale
+                visible = np.arange(k0, k1) <= (np.arange(q0, q1) + offset)[:, None]
+                np.copyto(s, -np.inf, where=~visible)
+            if lengths is not None:
+                np.copyto(s, -np.inf, where=np.arange(k0, k1) >= lengths)
+
+            # Online-Softmax: neues Maximum, alte Summe/Output umskalieren
+            np.maximum(m, s.max(axis=-1, keepdims=True), out=m_new)
+            np.copyto(ref, m_new)
+            ref[np.isneginf(ref)] = 0  # Zeile bisher komplett maskiert: exp(-inf - 0) = 0 statt NaN
+            np.subtract(m, ref, out=corr)
+            np.exp(corr, out=corr)
+            s -= ref
+            np.exp(s, out=s)
+            l *= corr
+            l += s.sum(axis=-1, keepdims=True)
+            acc *= corr
+            acc += np.matmul(s, V[..., k0:k1, :], out=pv_buf[..., :bq, :])
+            m[...] = m_new
+
+        l[l == 0] = 1
+        acc /= l
+    return out
+
+
+class KVCache:
+    """
+    Keys und Values bereits verarbeiteter Tokens, (batch, heads, capacity, d).
+
+    Der Speicher ist vorallokiert; reicht `capacity` nicht, wird er
+    verdoppelt (wie bei einer Python-Liste, amortisiert O(1) pro Token).
+    `keys`/`values` sind Views auf die ersten `len(cache)` Positionen.
+    """
+
+    def __init__(self, batch, heads, d_k, d_v=None, capacity=256, dtype=np.float32):
+        d_v = d_k if d_v is None else d_v
+        self._k = np.empty((batch, heads, capacity, d_k), dtype)
+        self._v = np.empty((batch, heads, capacity, d_v), dtype)
+        self.length = 0
+
+    @property
+    def capacity(self):
+        return self._k.shape[2]
+
+    def _grow(self, needed):
+        capacity = max(needed, 2 * self.capacity)
+        for name in ("_k", "_v"):
+            old = getattr(self, name)
+            new = np.empty(old.shape[:2] + (capacity, old.shape[3]), old.dtype)
+            new[:, :, :self.length] = old[:, :, :self.length]
+            setattr(self, name, new)
+
+    def append(self, k, v):
+        """Hängt k (batch, heads, t, d_k) und v (batch, heads, t, d_v) an."""
+        t = k.shape[2]
+        if self.length + t > self.capacity:
+            self._grow(self.length + t)
+        self._k[:, :, self.length:self.length + t] = k
+        self._v[:, :, self.length:self.length + t] = v
+        self.length += t
+
+    @property
+    def keys(self):
+        return self._k[:, :, :self.length]
+
+    @property
+    def values(self):
+        return self._v[:, :, :self.length]
+
+    @property
+    def nbytes(self):
+        return self._k.nbytes + self._v.nbytes
+
+    def clear(self):
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+def attention_loop(Q, K, V):
+    """Referenz wie in `lab.py`: eine (seq, d_k)-Matrix nach der anderen, mit np.dot."""
+    out = np.empty(Q.shape[:-1] + (V.shape[-1],))
+    for b in range(Q.shape[0]):
+        for h in range(Q.shape[1]):
+            scores = np.dot(Q[b, h], K[b, h].T) / np.sqrt(Q.shape[-1])
+            weights = np.exp(scores - scores.max(axis=-1, keepdims=True))
+            weights /= weights.sum(axis=-1, keepdims=True)
+            out[b, h] = np.dot(weights, V[b, h])
+    return out
+
+
+def _best_of(fn, repeats):
+    best = np.inf
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def benchmark(seq_lens=(128, 256, 512, 1024, 2048, 4096, 8192), batch=1, heads=4, d_k=64,
+              loop_max=2048, repeats=3):
+    rng = np.random.default_rng(0)
+    print(f"batch={batch}, heads={heads}, d_k={d_k}, kausale Maske (außer Schleife)")
+    print(f"{'seq':>6} {'Scores':>10} {'Schleife f64':>13} {'Batch f64':>10} {'Batch f32':>10} {'f32+Puffer':>11}")
+    for S in seq_lens:
+        Q, K, V = (rng.standard_normal((batch, heads, S, d_k)) for _ in range(3))
+        Q32, K32, V32 = (a.astype(np.float32) for a in (Q, K, V))
+        cells = []
+
+        if S <= loop_max:
+            cells.append(_best_of(lambda: attention_loop(Q, K, V), repeats))
+        else:
+            cells.append(None)
+        # float64 nur, solange der Score-Puffer unter 1 GB bleibt
+        if 8 * batch * heads * S * S <= 1 << 30:
+            cells.append(_best_of(lambda: scaled_dot_product_attention(Q, K, V, causal=True), repeats))
+        else:
+            cells.append(None)
+        cells.append(_best_of(lambda: scaled_dot_product_attention(Q32, K32, V32, causal=True), repeats))
+
+        scores = np.empty((batch, heads, S, S), np.float32)
+        out = np.empty((batch, heads, S, d_k), np.float32)
+        cells.append(_best_of(lambda: scaled_dot_product_attention(Q32, K32, V32, causal=True,
+                                                                   out=out, scores=scores), repeats))
+        del scores, out
+
+        text = " ".join(f"{1000 * t:>{w}.1f}" if t is not None else f"{'—':>{w}}"
+                        for t, w in zip(cells, (13, 10, 10, 11)))
+        print(f"{S:>6} {4 * batch * heads * S * S / 2 ** 20:>7.1f} MB {text}")
+    print("(Zeiten in ms, Scores = Größe des float32-Score-Puffers)")
+
+
+def _peak_memory(fn):
+    """(Laufzeit, Spitzen-Speicher in Byte) eines Aufrufs; NumPy meldet seine Puffer an tracemalloc."""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def memory_benchmark(seq_lens=(1024, 2048, 4096, 8192, 16384), batch=1, heads=4, d_k=64, block_size=256,
+                     naive_max_bytes=1 << 30):
+    """Naiv vs. blockweise (float32, kausal): Laufzeit, Spitzen-Speicher und maximale Abweichung."""
+    rng = np.random.default_rng(0)
+    print(f"batch={batch}, heads={heads}, d_k={d_k}, Block {block_size}, float32, kausale Maske")
+    print(f"{'seq':>6} {'naiv ms':>9} {'naiv MB':>9} {'Block ms':>9} {'Block MB':>9} {'max |Δ|':>9}")
+    for S in seq_lens:
+        Q, K, V = (rng.standard_normal((batch, heads, S, d_k), dtype=np.float32) for _ in range(3))
+        t_block, m_block = _peak_memory(lambda: blockwise_attention(Q, K, V, causal=True, block_size=block_size))
+        naive = "" if 4 * batch * heads * S * S <= naive_max_bytes else None
+        if naive is not None:
+            t_naive, m_naive = _peak_memory(lambda: scaled_dot_product_attention(Q, K, V, causal=True))
+            diff = np.abs(scaled_dot_product_attention(Q, K, V, causal=True)[0]
+                          - blockwise_attention(Q, K, V, causal=True, block_size=block_size)).max()
+            naive = f"{1000 * t_naive:>9.1f} {m_naive / 2 ** 20:>9.1f}"
+            diff = f"{diff:>9.1e}"
+        else:
+            naive, diff = f"{'—':>9} {'—':>9}", f"{'—':>9}"
+        print(f"{S:>6} {naive} {1000 * t_block:>9.1f} {m_block / 2 ** 20:>9.1f} {diff}")
+    print("(MB = Spitzen-Speicher während des Aufrufs, inkl. Output)")
+
+
+def decode_benchmark(seq_lens=(1024, 2048, 4096, 8192, 16384), d_model=256, heads=4, steps=8, block_size=256):
+    """
+    Latenz eines Decoding-Schritts an Position seq: mit KV-Cache (neues Token
+    gegen den Cache) vs. ohne (ganze Sequenz kausal neu rechnen, blockweise,
+    damit auch 16k Tokens in den Speicher passen).
+    """
+    rng = np.random.default_rng(0)
+    mha = MultiHeadAttention(d_model, heads)
+    X = rng.standard_normal((1, max(seq_lens) + steps, d_model), dtype=np.float32)
+    print(f"d_model={d_model}, heads={heads}, float32, {steps} Schritte je Länge gemittelt (ohne Cache: 1)")
+    print(f"{'seq':>6} {'Prefill ms':>11} {'mit Cache ms':>13} {'ohne Cache ms':>14} {'Faktor':>7} {'Cache MB':>9} {'max |Δ|':>9}")
+    for S in seq_lens:
+        cache = mha.new_cache(capacity=S + steps)
+        t0 = time.perf_counter()
+        mha.step(X[:, :S], cache, block_size)
+        t_prefill = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for i in range(steps):
+            cached = mha.step(X[:, S + i:S + i + 1], cache)
+        t_cached = (time.perf_counter() - t0) / steps
+
+        t0 = time.perf_counter()
+        full = mha(X[:, :S + steps], causal=True, block_size=block_size)[:, -1:]
+        t_full = time.perf_counter() - t0
+
+        diff = np.abs(cached - full).max()
+        print(f"{S:>6} {1000 * t_prefill:>11.1f} {1000 * t_cached:>13.2f} {1000 * t_full:>14.1f} "
+              f"{t_full / t_cached:>6.0f}x {cache.nbytes / 2 ** 20:>9.1f} {diff:>9.1e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batched Multi-Head Attention: Laufzeit über die Sequenzlänge")
+    parser.add_argument("--seq-lens", type=int, nargs="+", default=None,
+                        help="Standard: 128 … 8192 (bzw. 1024 … 16384 mit --memory/--decode)")
+    parser.add_argument("--batch", type=int, default=1)
+    parser.add_argument("--heads", type=int, default=4)
+    parser.add_argument("--d-k", type=int, default=64)
+    parser.add_argument("--loop-max", type=int, default=2048, help="Schleifen-Referenz nur bis zu dieser Länge")
+    parser.add_argument("--memory", action="store_true",
+                        help="naive vs. blockweise Attention: Laufzeit und Spitzen-Speicher")
+    parser.add_argument("--decode", action="store_true",
+                        help="Decoding-Schritt mit vs. ohne KV-Cache, 1k … 16k Tokens")
+    parser.add_argument("--block-size", type=int, default=256)
+    args = parser.parse_args()
+    if args.decode:
+        decode_benchmark(args.seq_lens or (1024, 2048, 4096, 8192, 16384), heads=args.heads,
+                         block_size=args.block_size)
+    elif args.memory:
+        memory_benchmark(args.seq_lens or (1024, 2048, 4096, 8192, 16384),
+                         args.batch, args.heads, args.d_k, args.block_size)
+    else:
+        benchmark(args.seq_lens or (128, 256, 512, 1024, 2048, 4096, 8192),
+                  args.batch, args.heads, args.d_k, args.loop_max)
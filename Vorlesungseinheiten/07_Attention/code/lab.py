@@ -1,7 +1,12 @@
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from attention_engine import MultiHeadAttention, scaled_dot_product_attention as batched_attention
+
 def softmax(x):
     """Berechnet Softmax entlang der letzten Achse."""
     e_x = np.exp(x - np.max(x, axis=-1, keepdims=True))
@@ -65,4 +70,19 @@ plt.ylabel("Query (Target)")
 print("Plot wird erstellt...")
 plt.show()
 print("Beobachtung: In diesem zufälligen Beispiel achten Wörter auf sich selbst und andere.")
-print("In einem trainierten Modell würde 'schläft' stark auf 'Katze' achten.")
\ No newline at end of file
+print("In einem trainierten Modell würde 'schläft' stark auf 'Katze' achten.")
+
+# --- BATCH, MEHRERE HEADS, MASKEN ---
+# Dieselbe Rechnung für (batch, heads, seq, d_k) auf einmal (attention_engine.py).
+# Zwei Sätze im Batch, der zweite hat nur 3 echte Wörter (das 4. ist Padding).
+batch = np.stack([X, np.random.randn(seq_len, d_model)])
+mha = MultiHeadAttention(d_model, num_heads=2)
+_, mha_weights = mha(batch, causal=True, key_lengths=[4, 3], return_weights=True)
+print("\nMulti-Head-Gewichte Form (batch, heads, query, key):", mha_weights.shape)
+print("Kausal + Padding, Satz 2, Head 1 (obere Dreiecke und letzte Spalte sind 0):")
+print(np.round(mha_weights[1, 0], 2))
+
+# Ohne Projektionen und mit einem Head ist es exakt die Funktion von oben
+single, _ = batched_attention(X[None, None], X[None, None], X[None, None])
+print("Identisch mit der Einzelmatrix-Version:", np.allclose(single[0, 0], output))
+
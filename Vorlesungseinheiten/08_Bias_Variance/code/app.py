@@ -1,3 +1,5 @@
+import os
+import sys
 import streamlit as st
 import numpy as np
 import matplotlib.pyplot as plt
@@ -7,6 +9,9 @@ from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error
 from sklearn.model_selection import train_test_split
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bias_variance_engine import bias_variance_curves
+
 st.title("Unit 08: Bias-Variance Tradeoff")
 st.markdown("Finden Sie den 'Sweet Spot' zwischen Underfitting (Bias) und Overfitting (Variance).")
 
@@ -79,4 +84,49 @@ st.info("""
 1.  Starten Sie mit **Grad 1** (Gerade). Beobachten Sie den hohen Fehler bei Training und Test (Underfitting).
 2.  Erhöhen Sie auf **Grad 4-5**. Der Test-Fehler sollte sinken (Guter Fit).
 3.  Gehen Sie auf **Grad 15**. Der Trainings-Fehler geht gegen 0, aber der Test-Fehler explodiert (Overfitting).
-""")
\ No newline at end of file
+""")
+
+# --- Bias-Variance-Zerlegung (Monte-Carlo) ---
+st.markdown("---")
+st.subheader("🎯 Bias-Variance-Zerlegung (Monte-Carlo)")
+st.write("Wir ziehen sehr viele Datensätze aus derselben Verteilung, fitten für jeden Grad ein Polynom "
+         "und zerlegen den erwarteten Testfehler in $Bias^2 + Varianz + Rauschen$. "
+         "Alle Fits eines Grades werden in einem gestapelten Least-Squares-Aufruf gelöst.")
+n_sim = st.select_slider("Anzahl Simulationen", options=[100, 1000, 3000, 10000], value=1000)
+
+
+@st.cache_data(show_spinner="Simuliere...")
+def get_curves(n_sim, n_samples, noise_level):
+    return bias_variance_curves(range(1, 16), n_sim, n_samples, noise_level)
+
+
+curves = get_curves(n_sim, n_samples, noise_level)
+c1, c2 = st.columns(2)
+
+with c1:
+    fig, ax = plt.subplots(figsize=(6, 4))
+    ax.plot(curves["degree"], curves["bias2"], "o-", label="Bias²")
+    ax.plot(curves["degree"], curves["variance"], "o-", label="Varianz")
+    ax.plot(curves["degree"], curves["noise"], "--", color="grey", label="Rauschen σ²")
+    ax.plot(curves["degree"], curves["error"], "o-", color="black", linewidth=2, label="Erwarteter Testfehler")
+    ax.axvline(degree, color="orange", linestyle=":", label=f"Aktueller Grad ({degree})")
+    ax.set_yscale("log")
+    ax.set_xlabel("Polynom-Grad")
+    ax.set_title(f"Zerlegung über {n_sim} Simulationen")
+    ax.legend(fontsize=8)
+    st.pyplot(fig)
+
+with c2:
+    fig, ax = plt.subplots(figsize=(6, 4))
+    ax.plot(curves["X_eval"], true_fun(curves["X_eval"]), color="green", linestyle="--", label="Wahre Funktion")
+    ax.plot(curves["X_eval"], curves["mean_prediction"][degree - 1], color="red",
+            label=f"Durchschnitts-Modell (Grad {degree})")
+    ax.set_ylim(-2, 2)
+    ax.set_title("Mittlere Vorhersage aller Simulationen")
+    ax.legend(fontsize=8)
+    st.pyplot(fig)
+
+best = int(curves["degree"][np.argmin(curves["error"])])
+st.caption(f"Grad {degree}: Bias² = {curves['bias2'][degree - 1]:.3g}, Varianz = {curves['variance'][degree - 1]:.3g} "
+           f"— kleinster erwarteter Testfehler bei Grad {best}.")
+
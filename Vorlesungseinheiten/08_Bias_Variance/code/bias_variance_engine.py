@@ -0,0 +1,176 @@
+"""
+🎯 Monte-Carlo Bias-Variance-Zerlegung, vektorisiert
+
+`lab.py` trainiert pro Simulation eine eigene sklearn-Pipeline
+(PolynomialFeatures + LinearRegression) in einer Python-Schleife. Hier
+werden alle Datensätze auf einmal gezogen — X und y als (n_sim, n_samples)
+— und alle Least-Squares-Probleme eines Grades in einem gestapelten
+QR-Aufruf gelöst:
+
+*   Design-Matrix (n_sim, n_samples, degree + 1) in der Chebyshev-Basis
+    auf [-1, 1]. Sie spannt denselben Polynomraum auf wie x, x², …, x^d
+    plus Achsenabschnitt (also dasselbe Modell wie die Pipeline), ist aber
+    auch bei Grad 15 noch gut konditioniert.
+*   `np.linalg.qr` und `np.linalg.solve` arbeiten auf Stapeln von Matrizen.
+*   Alle Grade sehen dieselben simulierten Datensätze, die Kurven von
+    Bias², Varianz und Gesamtfehler sind dadurch glatt vergleichbar.
+
+Zerlegung des erwarteten Testfehlers an den Auswertungspunkten x:
+
+    E[(y - f̂(x))²] = (E[f̂(x)] - f(x))²  +  Var[f̂(x)]  +  σ²
+                   =        Bias²        +   Varianz   + Rauschen
+
+Vergleich mit der Pipeline-Schleife::
+
+    python bias_variance_engine.py --n-sim 10000
+"""
+
+import argparse
+import time
+
+import numpy as np
+from numpy.polynomial import chebyshev
+from sklearn.linear_model import LinearRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import PolynomialFeatures
+
+
+def true_fun(X):
+    return np.cos(1.5 * np.pi * X)
+
+
+def simulate(n_sim, n_samples, noise=0.1, seed=0):
+    """n_sim Datensätze aus derselben Verteilung wie in `lab.py`: X, y jeweils (n_sim, n_samples)."""
+    rng = np.random.default_rng(seed)
+    X = rng.random((n_sim, n_samples))
+    y = true_fun(X) + noise * rng.standard_normal((n_sim, n_samples))
+    return X, y
+
+
+def design_matrix(X, degree):
+    """(..., n) -> (..., n, degree + 1): Chebyshev-Polynome T_0 … T_degree von 2x - 1."""
+    return chebyshev.chebvander(2 * np.asarray(X) - 1, degree)
+
+
+def fit_polynomials(X, y, degree):
+    """
+    Least-Squares-Koeffizienten für alle Datensätze, (n_sim, degree + 1).
+
+    Gestapelte QR-Zerlegung A = QR, dann R c = Qᵀ y. Hat ein Datensatz
+    weniger Punkte als Parameter, ist das Problem unterbestimmt — dann die
+    Lösung kleinster Norm über die (ebenfalls gestapelte) Pseudoinverse.
+    """
+    A = design_matrix(X, degree)
+    if A.shape[-2] < A.shape[-1]:
+        return np.einsum("spn,sn->sp", np.linalg.pinv(A), y)
+    Q, R = np.linalg.qr(A)
+    return np.linalg.solve(R, np.einsum("snp,sn->sp", Q, y)[..., None])[..., 0]
+
+
+def predict(coef, X_eval):
+    """Koeffizienten (n_sim, degree + 1) an den Punkten X_eval auswerten -> (n_sim, len(X_eval))."""
+    return coef @ design_matrix(X_eval, coef.shape[-1] - 1).T
+
+
+def decompose(predictions, f_eval, noise):
+    """Bias², Varianz, Rauschen und erwarteter Testfehler, gemittelt über die Auswertungspunkte."""
+    mean_prediction = predictions.mean(axis=0)
+    bias2 = np.mean((mean_prediction - f_eval) ** 2)
+    variance = np.mean(predictions.var(axis=0))
+    return {"bias2": bias2, "variance": variance, "noise": noise ** 2, "error": bias2 + variance + noise ** 2}
+
+
+def bias_variance_curves(degrees=range(1, 16), n_sim=10_000, n_samples=20, noise=0.1, n_eval=100, seed=0):
+    """
+    Zerlegung für jeden Grad, alle Grade auf denselben n_sim Datensätzen.
+
+    Gibt ein Dict von Arrays zurück ("degree", "bias2", "variance", "noise",
+    "error"), dazu "mean_prediction" (len(degrees), n_eval) und "X_eval".
+    """
+    X, y = simulate(n_sim, n_samples, noise, seed)
+    X_eval = np.linspace(0, 1, n_eval)
+    f_eval = true_fun(X_eval)
+
+    rows, means = [], []
+    for degree in degrees:
+        predictions = predict(fit_polynomials(X, y, degree), X_eval)
+        rows.append(decompose(predictions, f_eval, noise))
+        means.append(predictions.mean(axis=0))
+
+    curves = {key: np.array([row[key] for row in rows]) for key in rows[0]}
+    curves["degree"] = np.array(list(degrees))
+    curves["mean_prediction"] = np.array(means)
+    curves["X_eval"] = X_eval
+    return curves
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+def pipeline_loop(X, y, degree, X_eval):
+    """Referenz wie in `lab.py`: eine sklearn-Pipeline pro Datensatz."""
+    predictions = np.empty((len(X), len(X_eval)))
+    for i in range(len(X)):
+        pipeline = Pipeline([("polynomial_features", PolynomialFeatures(degree=degree, include_bias=False)),
+                             ("linear_regression", LinearRegression())])
+        pipeline.fit(X[i][:, np.newaxis], y[i])
+        predictions[i] = pipeline.predict(X_eval[:, np.newaxis])
+    return predictions
+
+
+def benchmark(n_sim=10_000, n_samples=20, noise=0.1, degrees=range(1, 16), loop_sims=500):
+    """
+    Laufzeit je Grad und Übereinstimmung mit der Pipeline: "gleich" ist der
+    Anteil der Datensätze mit identischer Vorhersage (|Δ| < 1e-6). Bei
+    hohen Graden und eng beieinander liegenden Punkten weichen die
+    Monome der Pipeline numerisch ab — "RSS ≤" zeigt, wie oft die
+    Batch-Lösung dann den kleineren Trainingsfehler hat, also die bessere
+    Least-Squares-Lösung ist.
+    """
+    degrees = list(degrees)
+    X, y = simulate(n_sim, n_samples, noise)
+    X_eval = np.linspace(0, 1, 100)
+    print(f"{n_sim} Simulationen × {n_samples} Punkte, Grade {degrees[0]}–{degrees[-1]}; "
+          f"Pipeline-Schleife auf {loop_sims} Simulationen gemessen und hochgerechnet")
+    print(f"{'Grad':>4} {'Batch ms':>9} {'Schleife ms':>12} {'Faktor':>7} {'gleich':>7} {'RSS ≤':>7}")
+
+    total_batch = total_loop = 0.0
+    for degree in degrees:
+        t0 = time.perf_counter()
+        coef = fit_polynomials(X, y, degree)
+        batched = predict(coef, X_eval)
+        t_batch = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        looped = pipeline_loop(X[:loop_sims], y[:loop_sims], degree, X_eval)
+        t_loop = (time.perf_counter() - t0) * n_sim / loop_sims
+
+        total_batch += t_batch
+        total_loop += t_loop
+        same = np.abs(batched[:loop_sims] - looped).max(axis=1) < 1e-6
+        rss_batch = np.sum((np.einsum("snp,sp->sn", design_matrix(X[:loop_sims], degree), coef[:loop_sims])
+                            - y[:loop_sims]) ** 2, axis=1)
+        rss_loop = np.array([np.sum((pipeline_loop(X[i:i + 1], y[i:i + 1], degree, X[i])[0] - y[i]) ** 2)
+                             for i in np.flatnonzero(~same)])
+        better = (np.sum(rss_batch[~same] <= rss_loop * (1 + 1e-9)) + same.sum()) / loop_sims
+        print(f"{degree:>4} {1000 * t_batch:>9.1f} {1000 * t_loop:>12.0f} {t_loop / t_batch:>6.0f}x "
+              f"{same.mean():>7.1%} {better:>7.1%}")
+    print(f"alle {1000 * total_batch:>9.0f} {1000 * total_loop:>12.0f} {total_loop / total_batch:>6.0f}x")
+
+    t0 = time.perf_counter()
+    curves = bias_variance_curves(degrees, n_sim, n_samples, noise)
+    print(f"\nbias_variance_curves: {1000 * (time.perf_counter() - t0):.0f} ms, "
+          f"bester Grad {curves['degree'][np.argmin(curves['error'])]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vektorisierte Bias-Variance-Simulation vs. Pipeline-Schleife")
+    parser.add_argument("--n-sim", type=int, default=10_000)
+    parser.add_argument("--n-samples", type=int, default=20)
+    parser.add_argument("--noise", type=float, default=0.1)
+    parser.add_argument("--max-degree", type=int, default=15)
+    parser.add_argument("--loop-sims", type=int, default=500,
+                        help="so viele Simulationen misst die Pipeline-Schleife (Rest hochgerechnet)")
+    args = parser.parse_args()
+    benchmark(args.n_sim, args.n_samples, args.noise, range(1, args.max_degree + 1), args.loop_sims)
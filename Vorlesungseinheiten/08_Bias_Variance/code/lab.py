@@ -1,9 +1,14 @@
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import PolynomialFeatures
 from sklearn.linear_model import LinearRegression
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bias_variance_engine import bias_variance_curves
+
 def true_fun(X):
     return np.cos(1.5 * np.pi * X)
 
@@ -72,5 +77,23 @@ def run_simulation():
     print("Jedes einzelne Modell ist stark vom Zufall der Daten abhängig.")
     print("Interessant: Der Durchschnitt (rot) ist fast perfekt, aber wir haben in der Praxis meist nur EINEN Datensatz (eine graue Linie).")
 
+def run_decomposition(n_simulations=10000):
+    """Dasselbe Experiment für alle Grade 1-15, vektorisiert (bias_variance_engine.py)."""
+    curves = bias_variance_curves(range(1, 16), n_sim=n_simulations, n_samples=20, noise=0.1)
+
+    plt.figure(figsize=(8, 5))
+    plt.plot(curves["degree"], curves["bias2"], "o-", label="Bias²")
+    plt.plot(curves["degree"], curves["variance"], "o-", label="Varianz")
+    plt.plot(curves["degree"], curves["error"], "o-", color="black", label="Bias² + Varianz + Rauschen")
+    plt.yscale("log")
+    plt.xlabel("Polynom-Grad")
+    plt.title(f"Bias-Variance-Zerlegung ({n_simulations} Simulationen pro Grad)")
+    plt.legend()
+    plt.show()
+
+    best = curves["degree"][np.argmin(curves["error"])]
+    print(f"\nKleinster erwarteter Testfehler bei Grad {best}: Links davon dominiert der Bias, rechts die Varianz.")
+
 if __name__ == "__main__":
-    run_simulation()
\ No newline at end of file
+    run_simulation()
+    run_decomposition()
\ No newline at end of file
@@ -2,7 +2,9 @@ import streamlit as st
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.colors import ListedColormap
-from models import get_dataset, get_classifier, calculate_metrics
+from models import (ALGORITHMS, MAX_SAMPLES, PartialEnsemble, get_dataset, get_classifier, calculate_metrics,
+                    sample_sizes, staged_accuracy, supports_stages)
+from amalea_viz.boundary import decision_surface
 
 # Page Config
 st.set_page_config(page_title="Thema 9: Ensembling", layout="wide")
@@ -17,35 +19,111 @@ Beobachten Sie, wie Ensembles glattere Entscheidungsgrenzen ziehen und robuster
 st.sidebar.header("1. Datensatz")
 dataset_name = st.sidebar.selectbox("Form", ["Moons", "Circles", "Linear"])
 noise_level = st.sidebar.slider("Rauschen (Noise)", 0.0, 1.0, 0.3, 0.05)
+# Platzhalter: welche Größen angeboten werden, hängt vom Modell-Typ darunter ab
+samples_slot = st.sidebar.container()
 
 st.sidebar.header("2. Algorithmus")
-algo_type = st.sidebar.selectbox(
-    "Modell-Typ",
-    ["Decision Tree (Single)", "Random Forest (Bagging)", "Gradient Boosting (Boosting)", "Voting Classifier (Stacking-Light)"]
-)
+algo_type = st.sidebar.selectbox("Modell-Typ", ALGORITHMS)
+
+sizes = sample_sizes(algo_type)
+n_samples = samples_slot.select_slider("Anzahl Samples", sizes, value=sizes[0])
+if algo_type in MAX_SAMPLES:
+    samples_slot.caption(f"Für dieses Modell höchstens {MAX_SAMPLES[algo_type]:,} Samples "
+                         "(SVC mit Wahrscheinlichkeiten skaliert quadratisch).")
 
 # Dynamische Hyperparameter basierend auf Auswahl
 params = {}
-if algo_type in ["Decision Tree (Single)", "Random Forest (Bagging)", "Gradient Boosting (Boosting)"]:
+boosting = ["Gradient Boosting (Boosting)", "Histogram Gradient Boosting (Boosting)"]
+if algo_type in ["Decision Tree (Single)", "Random Forest (Bagging)"] + boosting:
     params["max_depth"] = st.sidebar.slider("Max Depth (Baumtiefe)", 1, 15, 5)
 
-if algo_type in ["Random Forest (Bagging)", "Gradient Boosting (Boosting)"]:
+if algo_type in ["Random Forest (Bagging)"] + boosting:
     params["n_estimators"] = st.sidebar.slider("Anzahl Bäume (Estimators)", 10, 500, 100, 10)
 
-if algo_type == "Gradient Boosting (Boosting)":
+if algo_type in boosting:
     params["learning_rate"] = st.sidebar.slider("Learning Rate", 0.01, 1.0, 0.1, 0.01)
 
+# --- Caches: Reruns (Slider, Fenstergröße) trainieren nicht neu ---
+
+@st.cache_data(max_entries=32)
+def load_dataset(name, noise, n_samples):
+    return get_dataset(name, n_samples=n_samples, noise=noise)
+
+
+@st.cache_resource(max_entries=16)
+def fit_model(dataset_name, noise, n_samples, algo_type, params):
+    """Trainiertes Modell + Test-Metriken pro (Datensatz, Noise, Algorithmus, Hyperparameter).
+
+    Die Entscheidungsfläche hängt über `decision_surface` am Modellobjekt und
+    wird zusammen mit ihm aus dem Cache verdrängt.
+    """
+    X_train, X_test, y_train, y_test = load_dataset(dataset_name, noise, n_samples)
+    clf = get_classifier(algo_type, params)
+    clf.fit(X_train, y_train)
+    return clf, calculate_metrics(clf, X_test, y_test)
+
+
+@st.cache_data(max_entries=16)
+def staged_curves(dataset_name, noise, n_samples, algo_type, params):
+    """Train-/Test-Accuracy nach 1..n Bäumen aus dem einen, bereits angepassten Modell."""
+    X_train, X_test, y_train, y_test = load_dataset(dataset_name, noise, n_samples)
+    clf, _ = fit_model(dataset_name, noise, n_samples, algo_type, params)
+    return staged_accuracy(clf, X_train, y_train), staged_accuracy(clf, X_test, y_test)
+
+
+@st.cache_resource(max_entries=64)
+def partial_model(dataset_name, noise, n_samples, algo_type, params, k):
+    # Eigenes Objekt pro k, damit `decision_surface` jede Zwischenstufe separat cacht
+    clf, _ = fit_model(dataset_name, noise, n_samples, algo_type, params)
+    return PartialEnsemble(clf, k)
+
+
+def plot_boundary(model, title):
+    """Entscheidungsfläche (adaptiv berechnet) mit Trainings- und Testpunkten."""
+    fig, ax = plt.subplots(figsize=(10, 6))
+    
+    # Entscheidungsfläche adaptiv: grobes Gitter, verfeinert nur entlang der Grenze
+    h = .02
+    x_min, x_max = X_train[:, 0].min() - .5, X_train[:, 0].max() + .5
+    y_min, y_max = X_train[:, 1].min() - .5, X_train[:, 1].max() + .5
+    xs, ys, Z, n_evaluated = decision_surface(model, (x_min, x_max), (y_min, y_max), h)
+    
+    # Contour Plot
+    cm = plt.cm.RdBu
+    cm_bright = ListedColormap(['#FF0000', '#0000FF'])
+    
+    ax.contourf(xs, ys, Z, cmap=cm, alpha=.8)
+    
+    # Bei großen Datensätzen nur eine Stichprobe der Punkte zeigen
+    show_train = np.random.default_rng(0).permutation(len(X_train))[:1500]
+    show_test = np.random.default_rng(1).permutation(len(X_test))[:500]
+    
+    # Trainingspunkte plotten
+    ax.scatter(X_train[show_train, 0], X_train[show_train, 1], c=y_train[show_train], cmap=cm_bright,
+               edgecolors='k', alpha=0.6, s=40, label="Train")
+    # Testpunkte plotten
+    ax.scatter(X_test[show_test, 0], X_test[show_test, 1], c=y_test[show_test], cmap=cm_bright,
+               edgecolors='k', alpha=1.0, s=80, marker='*', label="Test")
+    
+    ax.set_xlim(xs[0], xs[-1])
+    ax.set_ylim(ys[0], ys[-1])
+    ax.set_xticks(())
+    ax.set_yticks(())
+    ax.legend()
+    ax.set_title(title)
+    
+    st.pyplot(fig)
+    st.caption(f"{n_evaluated:,} von {Z.size:,} Rasterpunkten vorhergesagt")
+
+
 # --- Main: Training & Plotting ---
 
 # 1. Daten laden
-X_train, X_test, y_train, y_test = get_dataset(dataset_name, noise=noise_level)
-
-# 2. Modell trainieren
-clf = get_classifier(algo_type, params)
-clf.fit(X_train, y_train)
+X_train, X_test, y_train, y_test = load_dataset(dataset_name, noise_level, n_samples)
 
-# 3. Metriken
-metrics = calculate_metrics(clf, X_test, y_test)
+# 2. Modell trainieren (bzw. aus dem Cache holen) und 3. Metriken
+with st.spinner("Trainiere Modell..."):
+    clf, metrics = fit_model(dataset_name, noise_level, n_samples, algo_type, params)
 
 # Layout Spalten
 col1, col2 = st.columns([1, 2])
@@ -68,46 +146,38 @@ with col1:
         st.success("Random Forest glättet die Grenzen durch Mittelwertbildung vieler Bäume (Reduzierte Varianz).")
     elif algo_type == "Gradient Boosting (Boosting)":
         st.success("Boosting fokussiert sich auf schwer klassifizierbare Punkte (Reduzierter Bias).")
+    elif algo_type == "Histogram Gradient Boosting (Boosting)":
+        st.success("Wie Gradient Boosting, aber mit gebinnten Features – bei vielen Samples um ein Vielfaches schneller.")
 
 with col2:
     st.subheader("Entscheidungsgrenze (Decision Boundary)")
     
-    # Plotting Logic
-    fig, ax = plt.subplots(figsize=(10, 6))
-    
-    # Meshgrid für Hintergrundfarbe
-    h = .02
-    x_min, x_max = X_train[:, 0].min() - .5, X_train[:, 0].max() + .5
-    y_min, y_max = X_train[:, 1].min() - .5, X_train[:, 1].max() + .5
-    xx, yy = np.meshgrid(np.arange(x_min, x_max, h),
-                         np.arange(y_min, y_max, h))
-    
-    # Vorhersage für jeden Punkt im Grid
-    if hasattr(clf, "decision_function"):
-        Z = clf.decision_function(np.c_[xx.ravel(), yy.ravel()])
-    else:
-        Z = clf.predict_proba(np.c_[xx.ravel(), yy.ravel()])[:, 1]
-        
-    Z = Z.reshape(xx.shape)
-    
-    # Contour Plot
-    cm = plt.cm.RdBu
-    cm_bright = ListedColormap(['#FF0000', '#0000FF'])
-    
-    ax.contourf(xx, yy, Z, cmap=cm, alpha=.8)
-    
-    # Trainingspunkte plotten
-    ax.scatter(X_train[:, 0], X_train[:, 1], c=y_train, cmap=cm_bright,
-               edgecolors='k', alpha=0.6, s=40, label="Train")
-    # Testpunkte plotten
-    ax.scatter(X_test[:, 0], X_test[:, 1], c=y_test, cmap=cm_bright,
-               edgecolors='k', alpha=1.0, s=80, marker='*', label="Test")
+    plot_boundary(clf, f"Decision Boundary: {algo_type}")
+
+# --- Verlauf über die Anzahl der Bäume: ein Fit, gestaffelte Vorhersagen ---
+if supports_stages(clf):
+    st.markdown("---")
+    st.subheader("📈 Accuracy vs. Anzahl Bäume")
+    st.markdown("Das Ensemble wird **einmal** mit der vollen Baumzahl trainiert; "
+                "Zwischenstände ergeben sich aus den ersten *k* Bäumen.")
     
-    ax.set_xlim(xx.min(), xx.max())
-    ax.set_ylim(yy.min(), yy.max())
-    ax.set_xticks(())
-    ax.set_yticks(())
-    ax.legend()
-    ax.set_title(f"Decision Boundary: {algo_type}")
+    train_curve, test_curve = staged_curves(dataset_name, noise_level, n_samples, algo_type, params)
+    n_trees = len(test_curve)
+    k = st.slider("Teil-Ensemble: erste k Bäume", 1, n_trees, n_trees)
     
-    st.pyplot(fig)
\ No newline at end of file
+    col3, col4 = st.columns(2)
+    with col3:
+        fig, ax = plt.subplots(figsize=(8, 5))
+        stages = np.arange(1, n_trees + 1)
+        ax.plot(stages, train_curve, label="Train")
+        ax.plot(stages, test_curve, label="Test")
+        ax.axvline(k, color="gray", linestyle="--")
+        ax.set_xlabel("Anzahl Bäume")
+        ax.set_ylabel("Accuracy")
+        ax.legend()
+        ax.set_title(f"Test-Accuracy mit {k} Bäumen: {test_curve[k - 1]:.2%}")
+        st.pyplot(fig)
+    with col4:
+        stage_model = clf if k == n_trees else partial_model(dataset_name, noise_level, n_samples,
+                                                             algo_type, params, k)
+        plot_boundary(stage_model, f"Erste {k} von {n_trees} Bäumen")
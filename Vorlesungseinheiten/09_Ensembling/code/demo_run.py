@@ -1,76 +1,234 @@
 #!/usr/bin/env python3
+"""
+Headless-Demo zu Ensembles: Test-Accuracy, 5-fold CV, Feature Importances
+und Lernkurve für Random Forest und Gradient Boosting.
+
+Jeder Fit (Holdout, CV-Fold, Lernkurven-Punkt) ist ein eigener Job. Die Jobs
+laufen parallel (joblib) und ihre Ergebnisse landen in einem
+inhaltsadressierten Cache: Der Schlüssel ist ein Hash aus Daten, Modell-
+Parametern und Fold-Indizes. Unveränderte Experimente werden übersprungen,
+und `results.txt` bzw. die PNGs werden nur neu geschrieben, wenn sich ihr
+Inhalt ändert.
+
+    python demo_run.py              # parallel, mit Cache
+    python demo_run.py --no-cache   # alles neu rechnen
+"""
+import argparse
+import hashlib
+import json
 import os
+import time
+from contextlib import contextmanager
+
 import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import seaborn as sns
+from joblib import Parallel, delayed
+from sklearn.base import clone
 from sklearn.datasets import load_iris
-from sklearn.model_selection import train_test_split, cross_val_score, learning_curve
+from sklearn.model_selection import train_test_split, StratifiedKFold
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.metrics import accuracy_score
 
-BASE = os.path.dirname(__file__)
+BASE = os.path.dirname(os.path.abspath(__file__))
 ASSETS = os.path.abspath(os.path.join(BASE, '..', 'assets'))
-os.makedirs(ASSETS, exist_ok=True)
+CACHE_DIR = os.environ.get('ENSEMBLE_DEMO_CACHE', os.path.join(BASE, '.cache'))
+
+parser = argparse.ArgumentParser(description="Ensemble-Demo (headless)")
+parser.add_argument('--n-jobs', type=int, default=-1, help="parallele Jobs (-1 = alle Kerne)")
+parser.add_argument('--no-cache', action='store_true', help="Cache ignorieren und neu rechnen")
+args = parser.parse_args()
+
+timings = []
+
+
+@contextmanager
+def stage(name):
+    """Misst die Laufzeit eines Abschnitts; die Übersicht steht am Ende der Ausgabe."""
+    t0 = time.perf_counter()
+    yield
+    timings.append((name, time.perf_counter() - t0))
+    print(f"⏱  {name}: {timings[-1][1]:.2f} s")
+
+
+# ---------------------------------------------------------------------------
+# Inhaltsadressierter Cache
+# ---------------------------------------------------------------------------
+
+def digest(*parts):
+    h = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            h.update(str(part.dtype).encode())
+            h.update(np.ascontiguousarray(part).tobytes())
+        else:
+            h.update(json.dumps(part, sort_keys=True, default=str).encode())
+        h.update(b'|')
+    return h.hexdigest()
+
+
+def model_spec(model):
+    return {'class': type(model).__name__, 'params': model.get_params()}
+
 
-data = load_iris()
-X = data.data
-y = data.target
-feature_names = data.feature_names
+def fit_and_score(model, X, y, train_idx, test_idx):
+    """Ein Job: Fit auf train_idx, Accuracy auf Train- und Test-Indizes."""
+    fitted = clone(model).fit(X[train_idx], y[train_idx])
+    result = {
+        'train_score': accuracy_score(y[train_idx], fitted.predict(X[train_idx])),
+        'test_score': accuracy_score(y[test_idx], fitted.predict(X[test_idx])),
+    }
+    if hasattr(fitted, 'feature_importances_'):
+        result['feature_importances'] = fitted.feature_importances_.tolist()
+    return result
 
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=0, stratify=y)
+
+def run_jobs(jobs):
+    """
+    Führt (model, train_idx, test_idx)-Jobs aus; bereits gecachte werden
+    übersprungen, der Rest läuft parallel. Gibt (Ergebnisse, Anzahl Cache-Treffer) zurück.
+    """
+    keys = [digest(data_hash, model_spec(m), tr, te) for m, tr, te in jobs]
+    results = [None] * len(jobs)
+    if not args.no_cache:
+        for i, key in enumerate(keys):
+            path = os.path.join(CACHE_DIR, key + '.json')
+            if os.path.exists(path):
+                with open(path) as f:
+                    results[i] = json.load(f)
+    todo = [i for i, r in enumerate(results) if r is None]
+    computed = Parallel(n_jobs=args.n_jobs)(
+        delayed(fit_and_score)(jobs[i][0], X, y, jobs[i][1], jobs[i][2]) for i in todo)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    for i, result in zip(todo, computed):
+        results[i] = result
+        with open(os.path.join(CACHE_DIR, keys[i] + '.json'), 'w') as f:
+            json.dump(result, f)
+    return results, len(jobs) - len(todo)
+
+
+def write_if_changed(path, content_key, write):
+    """Ruft `write(path)` nur auf, wenn sich der Inhalt (content_key) seit dem letzten Lauf geändert hat."""
+    stamp_path = os.path.join(CACHE_DIR, 'outputs.json')
+    stamps = {}
+    if os.path.exists(stamp_path):
+        with open(stamp_path) as f:
+            stamps = json.load(f)
+    if not args.no_cache and stamps.get(path) == content_key and os.path.exists(path):
+        return False
+    write(path)
+    stamps[path] = content_key
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(stamp_path, 'w') as f:
+        json.dump(stamps, f, indent=1)
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Experimente
+# ---------------------------------------------------------------------------
+
+t_total = time.perf_counter()
+os.makedirs(ASSETS, exist_ok=True)
+
+with stage("Daten laden"):
+    data = load_iris()
+    X = data.data
+    y = data.target
+    feature_names = data.feature_names
+    data_hash = digest(X, y)
+    idx_train, idx_test = train_test_split(np.arange(len(y)), test_size=0.3, random_state=0, stratify=y)
 
 rf = RandomForestClassifier(n_estimators=200, random_state=0)
 gb = GradientBoostingClassifier(n_estimators=200, learning_rate=0.05, random_state=0)
+models = [("RandomForest", rf), ("GradientBoosting", gb)]
+
+# Gleiche Folds wie cross_val_score(..., cv=5) für Klassifikatoren
+folds = list(StratifiedKFold(n_splits=5).split(X, y))
 
-rf.fit(X_train, y_train)
-gb.fit(X_train, y_train)
+with stage("Holdout + 5-fold CV (parallel)"):
+    jobs = []
+    for _, model in models:
+        jobs.append((model, idx_train, idx_test))
+        jobs += [(model, tr, te) for tr, te in folds]
+    results, hits = run_jobs(jobs)
+    print(f"   {len(jobs)} Jobs, davon {hits} aus dem Cache")
 
 out_lines = []
-for name, model in [("RandomForest", rf), ("GradientBoosting", gb)]:
-    preds = model.predict(X_test)
-    acc = accuracy_score(y_test, preds)
-    cv = cross_val_score(model, X, y, cv=5, scoring='accuracy')
-    out_lines.append(f"{name} accuracy (test): {acc:.3f}")
+importances = {}
+for m, (name, _) in enumerate(models):
+    holdout, cv_results = results[m * (len(folds) + 1)], results[m * (len(folds) + 1) + 1:(m + 1) * (len(folds) + 1)]
+    cv = np.array([r['test_score'] for r in cv_results])
+    importances[name] = holdout['feature_importances']
+    out_lines.append(f"{name} accuracy (test): {holdout['test_score']:.3f}")
     out_lines.append(f"{name} accuracy (5-fold CV mean): {cv.mean():.3f} (std {cv.std():.3f})")
 
 importances = pd.DataFrame({
     'feature': feature_names,
-    'rf_importance': rf.feature_importances_,
-    'gb_importance': gb.feature_importances_
+    'rf_importance': importances['RandomForest'],
+    'gb_importance': importances['GradientBoosting']
 })
 out_lines.append('\nFeature importances (RF sorted):')
 out_lines += list(importances.sort_values('rf_importance', ascending=False).to_string(index=False).splitlines())
 
-# plot and save feature importances
-fig, ax = plt.subplots(figsize=(6,4))
-sns.barplot(data=importances.melt(id_vars='feature', value_vars=['rf_importance','gb_importance'], var_name='model', value_name='importance'), x='feature', y='importance', hue='model', ax=ax)
-plt.xticks(rotation=20)
-plt.tight_layout()
-png_path = os.path.join(ASSETS, 'feature_importances.png')
-fig.savefig(png_path, dpi=200)
-plt.close(fig)
-out_lines.append(f"\nSaved plot: {png_path}")
-
-# learning curve for RandomForest (example)
-train_sizes, train_scores, test_scores = learning_curve(rf, X, y, cv=5, train_sizes=[0.2,0.4,0.6,0.8,1.0], scoring='accuracy')
-train_mean = train_scores.mean(axis=1)
-test_mean = test_scores.mean(axis=1)
-fig2, ax2 = plt.subplots()
-ax2.plot(train_sizes, train_mean, 'o-', label='Train')
-ax2.plot(train_sizes, test_mean, 'o-', label='Validation')
-ax2.set_xlabel('Training set size')
-ax2.set_ylabel('Accuracy')
-ax2.legend()
-ax2.grid(True)
-lc_path = os.path.join(ASSETS, 'learning_curve_rf.png')
-fig2.savefig(lc_path, dpi=200)
-plt.close(fig2)
-out_lines.append(f"Saved learning curve: {lc_path}")
+with stage("Lernkurve (parallel)"):
+    # Wie sklearn.learning_curve: jeweils die ersten n Trainingsindizes jedes Folds
+    n_max = len(folds[0][0])
+    train_sizes = np.unique((np.array([0.2, 0.4, 0.6, 0.8, 1.0]) * n_max).astype(int))
+    jobs = [(rf, tr[:n], te) for n in train_sizes for tr, te in folds]
+    lc_results, hits = run_jobs(jobs)
+    print(f"   {len(jobs)} Jobs, davon {hits} aus dem Cache")
+    lc_train = np.array([r['train_score'] for r in lc_results]).reshape(len(train_sizes), len(folds))
+    lc_test = np.array([r['test_score'] for r in lc_results]).reshape(len(train_sizes), len(folds))
+    train_mean = lc_train.mean(axis=1)
+    test_mean = lc_test.mean(axis=1)
+
+with stage("Plots schreiben"):
+    def plot_importances(path):
+        fig, ax = plt.subplots(figsize=(6,4))
+        sns.barplot(data=importances.melt(id_vars='feature', value_vars=['rf_importance','gb_importance'], var_name='model', value_name='importance'), x='feature', y='importance', hue='model', ax=ax)
+        plt.xticks(rotation=20)
+        plt.tight_layout()
+        fig.savefig(path, dpi=200)
+        plt.close(fig)
+
+    def plot_learning_curve(path):
+        fig2, ax2 = plt.subplots()
+        ax2.plot(train_sizes, train_mean, 'o-', label='Train')
+        ax2.plot(train_sizes, test_mean, 'o-', label='Validation')
+        ax2.set_xlabel('Training set size')
+        ax2.set_ylabel('Accuracy')
+        ax2.legend()
+        ax2.grid(True)
+        fig2.savefig(path, dpi=200)
+        plt.close(fig2)
+
+    png_path = os.path.join(ASSETS, 'feature_importances.png')
+    lc_path = os.path.join(ASSETS, 'learning_curve_rf.png')
+    for path, key, plot in [(png_path, digest(importances.to_dict('list')), plot_importances),
+                            (lc_path, digest(train_sizes, train_mean, test_mean), plot_learning_curve)]:
+        if not write_if_changed(path, key, plot):
+            print(f"   unverändert: {os.path.basename(path)}")
+    out_lines.append(f"\nSaved plot: {png_path}")
+    out_lines.append(f"Saved learning curve: {lc_path}")
 
 results_file = os.path.join(BASE, 'results.txt')
-with open(results_file, 'w') as f:
-    f.write('\n'.join(out_lines))
+text = '\n'.join(out_lines)
+old_text = None
+if os.path.exists(results_file):
+    with open(results_file) as f:
+        old_text = f.read()
+if text != old_text:
+    with open(results_file, 'w') as f:
+        f.write(text)
 
 print('\n'.join(out_lines))
-print('\nWrote results to', results_file)
+print('\nWrote results to' if text != old_text else '\nUnchanged:', results_file)
+
+print('\nLaufzeit pro Abschnitt:')
+for name, seconds in timings:
+    print(f"  {name:<32} {seconds:6.2f} s")
+print(f"  {'Gesamt':<32} {time.perf_counter() - t_total:6.2f} s")
@@ -1,11 +1,37 @@
+import argparse
+import time
+from itertools import islice
+
 import numpy as np
 from sklearn.tree import DecisionTreeClassifier
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, VotingClassifier
+from sklearn.ensemble import (RandomForestClassifier, GradientBoostingClassifier, HistGradientBoostingClassifier,
+                              VotingClassifier)
 from sklearn.linear_model import LogisticRegression
 from sklearn.svm import SVC
 from sklearn.datasets import make_moons, make_circles, make_classification
 from sklearn.model_selection import train_test_split
 
+ALGORITHMS = [
+    "Decision Tree (Single)",
+    "Random Forest (Bagging)",
+    "Gradient Boosting (Boosting)",
+    "Histogram Gradient Boosting (Boosting)",
+    "Voting Classifier (Stacking-Light)",
+]
+
+# Stichprobengrößen, für die die App und der Benchmark ausgelegt sind
+SAMPLE_SIZES = [500, 2000, 10000, 50000]
+
+# Obergrenzen je Modell: SVC mit probability=True skaliert etwa quadratisch in den Samples
+MAX_SAMPLES = {"Voting Classifier (Stacking-Light)": 10000}
+
+
+def sample_sizes(type_name):
+    """Die Stichprobengrößen aus `SAMPLE_SIZES`, die für dieses Modell in vertretbarer Zeit trainieren."""
+    limit = MAX_SAMPLES.get(type_name)
+    return [n for n in SAMPLE_SIZES if limit is None or n <= limit]
+
+
 def get_dataset(name, n_samples=500, noise=0.3):
     """Erzeugt synthetische Datensätze für Klassifikation."""
     if name == "Moons":
@@ -20,8 +46,12 @@ def get_dataset(name, n_samples=500, noise=0.3):
         
     return train_test_split(X, y, test_size=0.3, random_state=42)
 
-def get_classifier(type_name, params):
-    """Factory für verschiedene Classifier-Typen."""
+def get_classifier(type_name, params, n_jobs=-1):
+    """Factory für verschiedene Classifier-Typen.
+
+    `n_jobs` steuert, auf wie vielen Kernen Random Forest und Voting Classifier
+    ihre Teilmodelle bauen (-1 = alle Kerne).
+    """
     if type_name == "Decision Tree (Single)":
         return DecisionTreeClassifier(
             max_depth=params.get("max_depth", 5),
@@ -32,6 +62,7 @@ def get_classifier(type_name, params):
         return RandomForestClassifier(
             n_estimators=params.get("n_estimators", 100),
             max_depth=params.get("max_depth", 5),
+            n_jobs=n_jobs,
             random_state=42
         )
         
@@ -43,15 +74,27 @@ def get_classifier(type_name, params):
             random_state=42
         )
         
+    elif type_name == "Histogram Gradient Boosting (Boosting)":
+        # Features werden in höchstens 255 Bins einsortiert: Splits kosten dann
+        # O(Bins) statt O(Samples), das skaliert auf zehntausende Samples
+        return HistGradientBoostingClassifier(
+            max_iter=params.get("n_estimators", 100),
+            learning_rate=params.get("learning_rate", 0.1),
+            max_depth=params.get("max_depth", 3),
+            early_stopping=False,
+            random_state=42
+        )
+        
     elif type_name == "Voting Classifier (Stacking-Light)":
         # Heterogenes Ensemble
         clf1 = LogisticRegression(random_state=1)
-        clf2 = RandomForestClassifier(n_estimators=50, random_state=1)
+        clf2 = RandomForestClassifier(n_estimators=50, n_jobs=n_jobs, random_state=1)
         clf3 = SVC(probability=True, random_state=1)
         
         return VotingClassifier(
             estimators=[('lr', clf1), ('rf', clf2), ('svc', clf3)],
-            voting='soft'
+            voting='soft',
+            n_jobs=n_jobs
         )
     
     return DecisionTreeClassifier()
@@ -62,4 +105,92 @@ def calculate_metrics(model, X_test, y_test):
     return {
         "accuracy": score,
         "error_rate": 1 - score
-    }
\ No newline at end of file
+    }
+
+
+def supports_stages(model):
+    """True, wenn sich Zwischenstände des Ensembles ohne Neu-Training berechnen lassen."""
+    return isinstance(model, RandomForestClassifier) or hasattr(model, "staged_predict_proba")
+
+
+def staged_accuracy(model, X, y):
+    """
+    Accuracy nach 1, 2, ..., n Bäumen aus *einem* angepassten Ensemble.
+
+    Boosting: `staged_predict` addiert die Bäume nacheinander auf. Random
+    Forest: die Wahrscheinlichkeiten der einzelnen Bäume werden kumulativ
+    aufsummiert (Soft Voting wie in `predict_proba`). Beides kostet so viel
+    wie eine einzige Vorhersage mit dem vollen Ensemble.
+    """
+    y = np.asarray(y)
+    if isinstance(model, RandomForestClassifier):
+        X32 = np.asarray(X, dtype=np.float32)
+        votes = np.zeros((len(X32), len(model.classes_)))
+        scores = np.empty(len(model.estimators_))
+        for i, tree in enumerate(model.estimators_):
+            votes += tree.predict_proba(X32, check_input=False)
+            scores[i] = np.mean(model.classes_[votes.argmax(axis=1)] == y)
+        return scores
+    return np.array([np.mean(pred == y) for pred in model.staged_predict(X)])
+
+
+class PartialEnsemble:
+    """
+    Sicht auf die ersten `k` Bäume eines angepassten Ensembles (für Zwischen-Entscheidungsgrenzen).
+
+    Bietet `decision_function` genau dann, wenn das volle Modell sie hat
+    (Boosting): So zeichnet `decision_surface(method="auto")` Zwischenstände
+    und volles Modell auf derselben Skala (Log-Odds, Grenze bei 0).
+    """
+
+    def __init__(self, model, k):
+        self.model = model
+        self.k = k
+
+    @property
+    def decision_function(self):
+        if not hasattr(self.model, "staged_decision_function"):
+            raise AttributeError("decision_function")
+        return self._staged_decision_function
+
+    def _staged_decision_function(self, X):
+        return np.ravel(next(islice(self.model.staged_decision_function(X), self.k - 1, None)))
+
+    def predict_proba(self, X):
+        if isinstance(self.model, RandomForestClassifier):
+            X32 = np.asarray(X, dtype=np.float32)
+            trees = self.model.estimators_[:self.k]
+            return sum(tree.predict_proba(X32, check_input=False) for tree in trees) / len(trees)
+        return next(islice(self.model.staged_predict_proba(X), self.k - 1, None))
+
+    def predict(self, X):
+        return self.model.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def benchmark(sizes=SAMPLE_SIZES, n_estimators=200, algorithms=ALGORITHMS, n_jobs=-1):
+    """Fit- und Predict-Zeiten je Ensemble-Typ über verschiedene Stichprobengrößen."""
+    params = {"n_estimators": n_estimators, "max_depth": 5, "learning_rate": 0.1}
+    print(f"{'Modell':<40} {'Samples':>8} {'Fit (s)':>9} {'Predict (s)':>12} {'Accuracy':>9}")
+    for n_samples in sizes:
+        X_train, X_test, y_train, y_test = get_dataset("Moons", n_samples=n_samples)
+        for name in algorithms:
+            if n_samples > MAX_SAMPLES.get(name, n_samples):
+                continue  # siehe MAX_SAMPLES
+            clf = get_classifier(name, params, n_jobs=n_jobs)
+            t0 = time.perf_counter()
+            clf.fit(X_train, y_train)
+            t_fit = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            accuracy = clf.score(X_test, y_test)
+            t_predict = time.perf_counter() - t0
+            print(f"{name:<40} {n_samples:>8} {t_fit:>9.2f} {t_predict:>12.3f} {accuracy:>9.3f}")
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit-/Predict-Zeiten der Ensemble-Modelle")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SAMPLE_SIZES)
+    parser.add_argument("--n-estimators", type=int, default=200)
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Kerne für Random Forest/Voting (1 = seriell)")
+    args = parser.parse_args()
+    benchmark(args.sizes, args.n_estimators, n_jobs=args.n_jobs)
@@ -16,18 +16,19 @@ class TestDeepLearningUnits(unittest.TestCase):
     def tearDown(self):
         self.patcher.stop()
 
-    def _import_lab(self, unit_path):
+    def _import_lab(self, unit_path, relative_path=os.path.join("code", "lab.py")):
         """
-        Hilfsfunktion zum Importieren von lab.py aus einem Unit-Ordner.
+        Hilfsfunktion zum Importieren von lab.py (oder einem anderen Modul) aus einem Unit-Ordner.
         Notwendig, da Ordnernamen mit Zahlen beginnen und nicht direkt importierbar sind.
         """
         base_dir = os.path.dirname(os.path.abspath(__file__))
-        file_path = os.path.join(base_dir, unit_path, "code", "lab.py")
+        file_path = os.path.join(base_dir, unit_path, relative_path)
         
         if not os.path.exists(file_path):
             self.skipTest(f"Lab file not found: {file_path}")
 
-        spec = importlib.util.spec_from_file_location("lab", file_path)
+        module_name = os.path.splitext(os.path.basename(file_path))[0]
+        spec = importlib.util.spec_from_file_location(module_name, file_path)
         module = importlib.util.module_from_spec(spec)
         # Achtung: Dies führt Top-Level Code im Modul aus (Prints etc.)
         spec.loader.exec_module(module)
@@ -93,6 +94,20 @@ class TestDeepLearningUnits(unittest.TestCase):
         self.assertEqual(grad[0], 4.0)  # 2 * 2
         self.assertEqual(grad[1], 20.0) # 20 * 1
 
+    def test_unit_05_batched_optimizer(self):
+        """Ein Batch aus vielen Läufen muss dieselben Pfade liefern wie einzelne Läufe."""
+        lab = self._import_lab("05_Optimierung")
+        engine = self._import_lab("05_Optimierung", os.path.join("code", "optim_engine.py"))
+
+        lrs = np.array([0.005, 0.01, 0.02])
+        gammas = np.array([0.0, 0.5, 0.9])
+        start = np.array([-9.0, 3.0])
+        path = engine.run_batch(lab.grad_batch, np.tile(start, (3, 1)), "momentum", lrs, gammas, steps=30)
+
+        self.assertEqual(path.shape, (31, 3, 2))
+        for i in range(3):
+            np.testing.assert_allclose(path[:, i], lab.run_momentum(start, lrs[i], gammas[i], steps=30))
+
     def test_unit_06_convolution_shape(self):
         """Testet, ob die Convolution die Bildgröße korrekt reduziert (Valid Padding)."""
         try:
@@ -105,6 +120,39 @@ class TestDeepLearningUnits(unittest.TestCase):
             # Input 10x10, Kernel 3x3, Valid Padding -> Output 8x8
             self.assertEqual(lab.feature_map_v.shape, (8, 8))
 
+    def test_unit_06_conv_engine(self):
+        """im2col-Convolution muss mit scipy übereinstimmen; Backward-Pass per Finite Differenzen prüfen."""
+        from scipy.signal import correlate2d
+
+        engine = self._import_lab("06_CNN_Basics", os.path.join("code", "conv_engine.py"))
+        rng = np.random.default_rng(0)
+        x = rng.standard_normal((2, 3, 9, 8))
+        w = rng.standard_normal((4, 3, 3, 3))
+
+        out = engine.conv2d(x, w, padding=1)
+        expected = [[sum(correlate2d(np.pad(x[n, c], 1), w[f, c], mode="valid") for c in range(3))
+                     for f in range(4)] for n in range(2)]
+        np.testing.assert_allclose(out, expected, atol=1e-10)
+        self.assertEqual(engine.conv2d(x, w, stride=2, padding=1, dilation=2).shape, (2, 4, 4, 3))
+        # Alle Methoden (direkt, im2col, FFT/Overlap-Add) müssen dasselbe liefern
+        for method in ("direct", "fft"):
+            np.testing.assert_allclose(engine.conv2d(x, w, padding=1, method=method), out, atol=1e-10)
+
+        dout = rng.standard_normal((2, 4, 4, 3))
+        dx, dw, _ = engine.conv2d_backward(dout, x, w, stride=2, padding=1, dilation=2)
+        eps = 1e-6
+        x_shift = x.copy()
+        x_shift[1, 2, 4, 3] += eps
+        numeric = np.sum((engine.conv2d(x_shift, w, stride=2, padding=1, dilation=2)
+                          - engine.conv2d(x, w, stride=2, padding=1, dilation=2)) * dout) / eps
+        self.assertAlmostEqual(dx[1, 2, 4, 3], numeric, places=4)
+        self.assertEqual(dw.shape, w.shape)
+
+        # Max-Pooling leitet jeden Gradienten an genau ein Pixel weiter
+        pooled = engine.max_pool2d(x, 2)
+        self.assertEqual(pooled.shape, (2, 3, 4, 4))
+        self.assertAlmostEqual(engine.max_pool2d_backward(np.ones_like(pooled), x, 2).sum(), pooled.size)
+
     def test_unit_07_attention(self):
         """Testet den Attention-Mechanismus (Unit 07)."""
         try:
@@ -122,5 +170,103 @@ class TestDeepLearningUnits(unittest.TestCase):
             # Attention Weights müssen sich zu 1 summieren (letzte Achse)
             self.assertAlmostEqual(np.sum(weights[0]), 1.0)
 
+    def test_unit_07_batched_attention(self):
+        """Batched Multi-Head Attention muss pro Kopf mit der Einzelmatrix-Version übereinstimmen; Masken prüfen."""
+        lab = self._import_lab("07_Attention")
+        engine = self._import_lab("07_Attention", os.path.join("code", "attention_engine.py"))
+        rng = np.random.default_rng(0)
+        Q, K, V = (rng.standard_normal((2, 3, 5, 4)) for _ in range(3))
+
+        out, weights = engine.scaled_dot_product_attention(Q, K, V)
+        for b in range(2):
+            for h in range(3):
+                expected, expected_weights = lab.scaled_dot_product_attention(Q[b, h], K[b, h], V[b, h])
+                np.testing.assert_allclose(out[b, h], expected, atol=1e-12)
+                np.testing.assert_allclose(weights[b, h], expected_weights, atol=1e-12)
+
+        # Kausal + Padding: keine Gewichte auf Zukunft oder Padding, Zeilen summieren trotzdem zu 1
+        _, weights = engine.scaled_dot_product_attention(Q, K, V, causal=True, key_lengths=[5, 3])
+        self.assertTrue(np.all(np.triu(weights, k=1) == 0))
+        self.assertTrue(np.all(weights[1, :, :, 3:] == 0))
+        np.testing.assert_allclose(weights.sum(axis=-1), 1.0)
+
+        # Blockweise (Online-Softmax) muss dasselbe liefern, auch mit Randblöcken und Masken
+        for causal in (False, True):
+            np.testing.assert_allclose(
+                engine.blockwise_attention(Q, K, V, causal=causal, key_lengths=[5, 3], block_size=2),
+                engine.scaled_dot_product_attention(Q, K, V, causal=causal, key_lengths=[5, 3])[0], atol=1e-12)
+
+        # float32 bleibt float32, vorallokierte Puffer werden genutzt
+        Q32 = Q.astype(np.float32)
+        out_buffer = np.empty((2, 3, 5, 4), np.float32)
+        result, _ = engine.scaled_dot_product_attention(Q32, Q32, Q32, out=out_buffer)
+        self.assertIs(result, out_buffer)
+        mha = engine.MultiHeadAttention(d_model=8, num_heads=2)
+        self.assertEqual(mha(rng.standard_normal((2, 6, 8)), causal=True).dtype, np.float32)
+
+        # KV-Cache: Prompt + Token für Token muss der kausalen Gesamtrechnung entsprechen, Cache wächst bei Bedarf
+        mha = engine.MultiHeadAttention(d_model=8, num_heads=2, dtype=np.float64)
+        X = rng.standard_normal((2, 12, 8))
+        cache = mha.new_cache(batch=2, capacity=4)
+        steps = [mha.step(X[:, :5], cache)] + [mha.step(X[:, i:i + 1], cache) for i in range(5, 12)]
+        np.testing.assert_allclose(np.concatenate(steps, axis=1), mha(X, causal=True), atol=1e-12)
+        self.assertEqual(len(cache), 12)
+        self.assertGreaterEqual(cache.capacity, 12)
+
+    def test_unit_08_bias_variance_engine(self):
+        """Gestapelte Least-Squares-Fits müssen der sklearn-Pipeline entsprechen; Zerlegung muss den Testfehler treffen."""
+        engine = self._import_lab("08_Bias_Variance", os.path.join("code", "bias_variance_engine.py"))
+        X, y = engine.simulate(n_sim=20, n_samples=20, noise=0.1)
+        X_eval = np.linspace(0, 1, 50)
+        for degree in (1, 3, 6):
+            np.testing.assert_allclose(engine.predict(engine.fit_polynomials(X, y, degree), X_eval),
+                                       engine.pipeline_loop(X, y, degree, X_eval), atol=1e-8)
+
+        # Bias² + Varianz + Rauschen = mittlerer Fehler gegen frische, verrauschte Testdaten
+        X, y = engine.simulate(n_sim=4000, n_samples=20, noise=0.3)
+        predictions = engine.predict(engine.fit_polynomials(X, y, 4), X_eval)
+        parts = engine.decompose(predictions, engine.true_fun(X_eval), noise=0.3)
+        y_test = engine.true_fun(X_eval) + 0.3 * np.random.default_rng(1).standard_normal(predictions.shape)
+        self.assertAlmostEqual(np.mean((predictions - y_test) ** 2), parts["error"], delta=0.02 * parts["error"])
+
+        curves = engine.bias_variance_curves(range(1, 16), n_sim=500)
+        self.assertEqual(curves["bias2"].shape, (15,))
+        self.assertGreater(curves["bias2"][0], curves["bias2"][5])
+
+    def test_unit_09_adaptive_boundary(self):
+        """Die adaptive Entscheidungsfläche muss dieselben Klassen liefern wie das dichte Raster."""
+        from sklearn.datasets import make_moons
+        from sklearn.tree import DecisionTreeClassifier
+
+        boundary = self._import_lab("..", os.path.join("amalea_viz", "boundary.py"))
+        X, y = make_moons(n_samples=200, noise=0.2, random_state=0)
+        clf = DecisionTreeClassifier(max_depth=4, random_state=0).fit(X, y)
+        xlim, ylim = (-2.0, 3.0), (-1.5, 2.0)
+
+        xs, ys, Z, n_evaluated = boundary.decision_surface(clf, xlim, ylim, h=0.05, method="predict")
+        _, _, Z_dense, n_dense = boundary.dense_surface(clf, xlim, ylim, h=0.05, method="predict")
+
+        self.assertEqual(Z.shape, (len(ys), len(xs)))
+        self.assertGreater(np.mean(Z == Z_dense), 0.99)
+        self.assertLess(n_evaluated, n_dense / 2)
+        # Zweiter Aufruf kommt aus dem Cache (gleiches Ergebnisobjekt)
+        self.assertIs(boundary.decision_surface(clf, xlim, ylim, h=0.05, method="predict")[2], Z)
+
+    def test_unit_09_partial_ensemble_scale(self):
+        """Zwischenstufen eines Boosting-Modells nutzen dieselbe Skala wie das volle Modell."""
+        from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+        from sklearn.datasets import make_moons
+
+        models = self._import_lab("09_Ensembling", "models.py")
+        X, y = make_moons(n_samples=200, noise=0.2, random_state=0)
+        gb = GradientBoostingClassifier(n_estimators=20, random_state=0).fit(X, y)
+        rf = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+
+        full = models.PartialEnsemble(gb, 20)
+        self.assertTrue(np.allclose(full.decision_function(X), gb.decision_function(X)))
+        self.assertEqual(models.PartialEnsemble(gb, 5).decision_function(X).shape, (len(X),))
+        # Random Forest hat keine decision_function -> decision_surface fällt auf predict_proba zurück
+        self.assertFalse(hasattr(models.PartialEnsemble(rf, 3), "decision_function"))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
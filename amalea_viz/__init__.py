@@ -0,0 +1,13 @@
+"""
+Gemeinsame Visualisierungs-Bausteine für die Kurs-Apps.
+
+Das Paket liegt im Repository-Wurzelverzeichnis; Apps aus Unterordnern
+importieren es, wenn die Wurzel auf dem Python-Pfad liegt::
+
+    PYTHONPATH=. streamlit run Vorlesungseinheiten/09_Ensembling/app.py
+    python -m streamlit run 05_Neural_Networks/neural_network_playground.py
+"""
+
+from .boundary import adaptive_grid, decision_surface, dense_surface
+
+__all__ = ["adaptive_grid", "decision_surface", "dense_surface"]
@@ -0,0 +1,208 @@
+"""
+Adaptive Berechnung von Entscheidungsgrenzen für 2D-Klassifikatoren.
+
+Statt jeden Punkt eines feinen Rasters (z.B. h = 0.02) vorherzusagen, wird
+zuerst ein grobes Gitter ausgewertet. Nur Zellen, in deren Ecken sich die
+vorhergesagte Klasse ändert, werden geviertelt und erneut ausgewertet
+(Quadtree) — bis hinunter auf die volle Auflösung. Zellen mit einheitlicher
+Klasse und ähnlichen Eckwerten werden bilinear aus ihren Ecken aufgefüllt.
+Das Ergebnis ist optisch gleich, braucht aber nur einen Bruchteil der
+Vorhersagen.
+
+Ergebnisse werden pro angepasstem Modell gecacht (schwache Referenz: wird
+das Modell verworfen, verschwindet auch sein Eintrag).
+
+Genutzt von der Ensembling-App (Vorlesungseinheiten/09_Ensembling) und
+dem Neural Network Playground (05_Neural_Networks).
+
+Vergleich dichtes Raster vs. adaptiv (aus dem Repository-Wurzelverzeichnis)::
+
+    python -m amalea_viz.boundary
+"""
+
+import argparse
+import time
+import weakref
+
+import numpy as np
+
+_SURFACES = weakref.WeakKeyDictionary()
+
+
+def _score_function(model, method, transform):
+    """Gibt (f, threshold) zurück; threshold None heißt: f liefert Klassenlabels."""
+    if method == "auto":
+        method = "decision_function" if hasattr(model, "decision_function") else "predict_proba"
+
+    def prepare(points):
+        return transform(points) if transform is not None else points
+
+    if method == "decision_function":
+        return (lambda p: model.decision_function(prepare(p))), 0.0
+    if method == "predict_proba":
+        return (lambda p: model.predict_proba(prepare(p))[:, 1]), 0.5
+    return (lambda p: model.predict(prepare(p))), None
+
+
+def grid_axes(xlim, ylim, h=0.02, coarse_step=16):
+    """Rasterachsen mit Weite `h`, Punktzahl je Achse auf ein Vielfaches von `coarse_step` (+1) aufgerundet."""
+    nx = int(np.ceil(np.ceil((xlim[1] - xlim[0]) / h) / coarse_step)) * coarse_step + 1
+    ny = int(np.ceil(np.ceil((ylim[1] - ylim[0]) / h) / coarse_step)) * coarse_step + 1
+    return xlim[0] + h * np.arange(nx), ylim[0] + h * np.arange(ny)
+
+
+def adaptive_grid(f, xlim, ylim, h=0.02, coarse_step=16, threshold=0.0, tol=0.05):
+    """
+    Wertet `f` (Punkte (n, 2) -> Werte (n,)) adaptiv auf einem Raster mit Weite `h` aus.
+
+    Ist `threshold` None, liefert `f` Klassenlabels (auch mehr als zwei
+    Klassen) und einheitliche Zellen werden konstant gefüllt. Sonst ist
+    die Klasse `f(p) > threshold` und einheitliche Zellen werden bilinear
+    interpoliert; zusätzlich wird jede Zelle verfeinert, deren Eckwerte um
+    mehr als `tol` (relativ zur Wertespanne des Grobgitters) auseinander
+    liegen, damit auch die Farbverläufe stimmen. `coarse_step` muss eine
+    Zweierpotenz sein.
+
+    Gibt (xs, ys, Z, n_evaluated) zurück; Z hat die Form (len(ys), len(xs)).
+    """
+    s0 = int(coarse_step)
+    if s0 < 1 or s0 & (s0 - 1):
+        raise ValueError("coarse_step muss eine Zweierpotenz sein")
+    xs, ys = grid_axes(xlim, ylim, h, s0)
+    nx, ny = len(xs), len(ys)
+    Z = np.zeros((ny, nx))
+    known = np.zeros((ny, nx), dtype=bool)
+    n_evaluated = 0
+
+    def evaluate(rows, cols):
+        nonlocal n_evaluated
+        flat = np.unique(rows * nx + cols)
+        flat = flat[~known.ravel()[flat]]
+        if len(flat) == 0:
+            return
+        r, c = np.divmod(flat, nx)
+        # Labels werden als float abgelegt (Contour-Plots brauchen ohnehin Zahlen)
+        Z[r, c] = np.asarray(f(np.c_[xs[c], ys[r]]), dtype=float)
+        known[r, c] = True
+        n_evaluated += len(flat)
+
+    # Grobes Gitter
+    rr, cc = np.meshgrid(np.arange(0, ny, s0), np.arange(0, nx, s0), indexing="ij")
+    evaluate(rr.ravel(), cc.ravel())
+    r0, c0 = (a.ravel() for a in np.meshgrid(np.arange(0, ny - 1, s0), np.arange(0, nx - 1, s0), indexing="ij"))
+    coarse = Z[::s0, ::s0]
+    max_spread = tol * (coarse.max() - coarse.min()) if threshold is not None else np.inf
+
+    s = s0
+    while len(r0):
+        corners = np.stack([Z[r0, c0], Z[r0, c0 + s], Z[r0 + s, c0], Z[r0 + s, c0 + s]], axis=1)
+        classes = corners if threshold is None else corners > threshold
+        mixed = np.any(classes != classes[:, :1], axis=1)
+        mixed |= np.ptp(corners, axis=1) > max_spread
+        if s == s0:
+            # Auf dem Grobgitter auch die Nachbarn gemischter Zellen verfeinern:
+            # schmale Strukturen, die zwischen zwei Gitterpunkten liegen, gehen so seltener verloren
+            grid = mixed.reshape((ny - 1) // s0, (nx - 1) // s0)
+            padded = np.pad(grid, 1)
+            grid = np.zeros_like(grid)
+            for dy in range(3):
+                for dx in range(3):
+                    grid |= padded[dy:dy + grid.shape[0], dx:dx + grid.shape[1]]
+            mixed = grid.ravel()
+
+        uniform = ~mixed
+        if s > 1 and uniform.any():
+            t = np.arange(s + 1) / s
+            a, b, c, d = (corners[uniform, i][:, None, None] for i in range(4))
+            if threshold is None:
+                block = np.broadcast_to(a, (len(a), s + 1, s + 1))
+            else:
+                ty, tx = t[None, :, None], t[None, None, :]
+                block = (1 - ty) * ((1 - tx) * a + tx * b) + ty * ((1 - tx) * c + tx * d)
+            rows = r0[uniform][:, None, None] + np.arange(s + 1)[None, :, None]
+            cols = c0[uniform][:, None, None] + np.arange(s + 1)[None, None, :]
+            rows, cols = np.broadcast_arrays(rows, cols)
+            fill = ~known[rows, cols]
+            Z[rows[fill], cols[fill]] = np.broadcast_to(block, rows.shape)[fill]
+
+        if s == 1:
+            break
+        # Gemischte Zellen vierteln: Kantenmitten und Zentrum auswerten
+        half = s // 2
+        r0, c0 = r0[mixed], c0[mixed]
+        offsets = np.array([0, half, s])
+        rows, cols = np.broadcast_arrays(r0[:, None, None] + offsets[None, :, None],
+                                         c0[:, None, None] + offsets[None, None, :])
+        evaluate(rows.ravel(), cols.ravel())
+        r0 = np.concatenate([r0, r0, r0 + half, r0 + half])
+        c0 = np.concatenate([c0, c0 + half, c0, c0 + half])
+        s = half
+
+    return xs, ys, Z, n_evaluated
+
+
+def decision_surface(model, xlim, ylim, h=0.02, method="auto", transform=None, coarse_step=16):
+    """
+    Entscheidungsfläche eines angepassten Modells, gecacht pro Modellobjekt.
+
+    `method` ist "auto" (decision_function, sonst predict_proba[:, 1]),
+    "decision_function", "predict_proba" oder "predict" (Klassenlabels,
+    z.B. für mehr als zwei Klassen). `transform` wird vor der Vorhersage
+    auf die Punkte angewendet (z.B. `scaler.transform`) und gilt als fester
+    Teil des Modells. Gibt (xs, ys, Z, n_evaluated) zurück.
+    """
+    key = (tuple(np.round(xlim, 9)), tuple(np.round(ylim, 9)), h, method, coarse_step)
+    try:
+        per_model = _SURFACES.setdefault(model, {})
+    except TypeError:  # Objekt ohne schwache Referenzen: ohne Cache rechnen
+        per_model = {}
+    if key not in per_model:
+        f, threshold = _score_function(model, method, transform)
+        per_model[key] = adaptive_grid(f, xlim, ylim, h, coarse_step, threshold)
+    return per_model[key]
+
+
+def dense_surface(model, xlim, ylim, h=0.02, method="auto", transform=None, coarse_step=16):
+    """Referenz: Vorhersage auf jedem Rasterpunkt (gleiches Raster wie `adaptive_grid`)."""
+    f, _ = _score_function(model, method, transform)
+    xs, ys = grid_axes(xlim, ylim, h, coarse_step)
+    xx, yy = np.meshgrid(xs, ys)
+    return xs, ys, np.asarray(f(np.c_[xx.ravel(), yy.ravel()])).reshape(xx.shape), xx.size
+
+
+def benchmark(n_estimators=500, h=0.02):
+    from sklearn.datasets import make_moons
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.neighbors import KNeighborsClassifier
+
+    X, y = make_moons(n_samples=500, noise=0.3, random_state=42)
+    xlim = (X[:, 0].min() - .5, X[:, 0].max() + .5)
+    ylim = (X[:, 1].min() - .5, X[:, 1].max() + .5)
+    models = {
+        f"Random Forest ({n_estimators} Bäume)": RandomForestClassifier(n_estimators=n_estimators, max_depth=5,
+                                                                         random_state=42),
+        "kNN (k=1, sehr zackig)": KNeighborsClassifier(n_neighbors=1),
+    }
+    for name, model in models.items():
+        model.fit(X, y)
+        t0 = time.perf_counter()
+        _, _, Z_dense, n_dense = dense_surface(model, xlim, ylim, h)
+        t_dense = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        _, _, Z, n_adaptive = adaptive_grid(lambda p: model.predict_proba(p)[:, 1], xlim, ylim, h, 16, 0.5)
+        t_adaptive = time.perf_counter() - t0
+        agree = np.mean((Z > 0.5) == (Z_dense > 0.5))
+        max_diff = np.abs(Z - Z_dense).max()
+        print(f"{name}")
+        print(f"  dicht    {n_dense:>8,} Vorhersagen {1000 * t_dense:8.0f} ms")
+        print(f"  adaptiv  {n_adaptive:>8,} Vorhersagen {1000 * t_adaptive:8.0f} ms "
+              f"({n_adaptive / n_dense:.1%}), gleiche Klasse in {agree:.2%} der Pixel, "
+              f"max. Abweichung {max_diff:.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Adaptive Entscheidungsgrenzen vs. dichtes Raster")
+    parser.add_argument("--n-estimators", type=int, default=500)
+    parser.add_argument("--h", type=float, default=0.02)
+    args = parser.parse_args()
+    benchmark(args.n_estimators, args.h)
@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Ensure the traffic project is importable
+TRAFFIC_ROOT = Path(__file__).resolve().parents[1] / " Traffic Prediction & Optimization"
+sys.path.insert(0, str(TRAFFIC_ROOT))
+
+import lag_models  # noqa: E402
+from forecasting import SeasonalBaseline  # noqa: E402
+
+
+def hourly(n):
+    ds = pd.date_range("2024-01-01", periods=n, freq="h")
+    return pd.DataFrame({"ds": ds, "y": 50 + 30 * np.sin(np.arange(n) * 2 * np.pi / 24)})
+
+
+@pytest.mark.parametrize("n", [19, 24, 25, 47])
+def test_short_history_raises_clear_error(n):
+    df = hourly(n)
+    with pytest.raises(ValueError, match="zu wenig"):
+        lag_models.RidgeLags().fit(pd.DatetimeIndex(df["ds"]), df["y"].to_numpy())
+
+
+def test_minimum_history_fits_and_predicts():
+    model = lag_models.RidgeLags()
+    df = hourly(model.min_history)
+    model.fit(pd.DatetimeIndex(df["ds"]), df["y"].to_numpy())
+    assert len(model.predict(48)) == 48
+
+
+def test_compare_models_marks_models_with_too_short_first_fold():
+    table = lag_models.compare_models(hourly(96), 19, {"Baseline": SeasonalBaseline,
+                                                       "Ridge": lag_models.RidgeLags})
+    baseline, ridge = table.to_dict("records")
+    assert baseline["Folds"] == 4 and baseline["Hinweis"] == ""
+    assert ridge["Folds"] == 0 and np.isnan(ridge["MAE"]) and "braucht 48" in ridge["Hinweis"]
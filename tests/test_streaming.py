@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# Ensure the traffic project is importable
+TRAFFIC_ROOT = Path(__file__).resolve().parents[1] / " Traffic Prediction & Optimization"
+sys.path.insert(0, str(TRAFFIC_ROOT))
+
+from streaming import StreamingForecaster  # noqa: E402
+from traffic_data import generate_sensor_data  # noqa: E402
+
+
+def test_earlier_window_restarts_the_sensor():
+    df = generate_sensor_data(["S0000"], start="2024-01-01", end="2024-01-31 23:00")
+    stream = StreamingForecaster(refit_model="Saisonal (schnell)")
+    stream.ingest_frame("S0000", df[df["ds"] >= "2024-01-20"])
+
+    earlier = df[(df["ds"] >= "2024-01-03") & (df["ds"] < "2024-01-10")]
+    assert stream.ingest_frame("S0000", earlier) == len(earlier)
+    forecast, _ = stream.forecast("S0000", 24)
+    assert forecast["ds"].iloc[0] == pd.Timestamp("2024-01-10")
+    # Same window again: nothing new, forecast comes from the cache
+    assert stream.ingest_frame("S0000", earlier) == 0
+    assert stream.forecast("S0000", 24)[1]
@@ -0,0 +1,69 @@
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Ensure the traffic project is importable
+TRAFFIC_ROOT = Path(__file__).resolve().parents[1] / " Traffic Prediction & Optimization"
+sys.path.insert(0, str(TRAFFIC_ROOT))
+
+import tracking  # noqa: E402
+
+
+def test_unwritable_fallback_does_not_kill_worker():
+    tracker = tracking.ExperimentTracker(fallback_path="/proc/no-such-dir/fallback.jsonl", flush_interval=0.01)
+    tracker.fallback_active = True
+    run = tracker.start_run({"alpha": 1})
+    run.log_metric("loss", 0.5)
+    run.end()
+
+    assert tracker.flush(timeout=5)
+    assert tracker._thread.is_alive()
+    assert tracker.last_error and "Error" in tracker.last_error
+    assert tracker.dropped == 4
+    assert tracker.pending == 0
+
+    tracker.close(timeout=5)
+    assert not tracker._thread.is_alive()
+
+
+class FlakyClient:
+    """Fake MlflowClient: the second run fails on its first log_batch."""
+
+    def __init__(self):
+        self.created = 0
+        self.terminated = {}
+
+    def create_run(self, experiment_id, run_name=None):
+        self.created += 1
+        return SimpleNamespace(info=SimpleNamespace(run_id=f"mlflow-{self.created}"))
+
+    def log_batch(self, run_id, metrics=(), params=()):
+        if run_id == "mlflow-2":
+            raise ConnectionError("server gone")
+
+    def set_terminated(self, run_id, status="FINISHED"):
+        self.terminated[run_id] = status
+
+
+def test_partial_mlflow_failure_falls_back_without_duplicates(tmp_path):
+    fallback = tmp_path / "fallback.jsonl"
+    tracker = tracking.ExperimentTracker(fallback_path=str(fallback), flush_interval=0.5)
+    tracker.fallback_active = False
+    tracker._client = FlakyClient()
+    tracker._experiment_id = "0"
+
+    first = tracker.start_run({"alpha": 1})
+    first.log_metric("loss", 0.5)
+    first.end()
+    second = tracker.start_run({"alpha": 2})
+    second.log_metric("loss", 0.7)
+    second.end()
+    assert tracker.flush(timeout=5)
+    tracker.close(timeout=5)
+
+    assert tracker.fallback_active
+    assert tracker._client.terminated == {"mlflow-1": "FINISHED", "mlflow-2": "FAILED"}
+    lines = [json.loads(line) for line in fallback.read_text().splitlines()]
+    assert {line["run"] for line in lines} == {second.run_id}
+    assert tracker.written == 8